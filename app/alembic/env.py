@@ -22,9 +22,22 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 from models.vid_chat import VidChat
 from models.message import Message
+from models.ingest_job import IngestJob
+from models.response_cache import ResponseCacheEntry
+from models.section_summary import SectionSummary
 target_metadata = SQLModel.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Tables such as `chunk` and `embedding_cache` are declared in the service
+    modules and not imported here; keep autogenerate from emitting drops for them.
+    """
+    if type_ == "table" and reflected and compare_to is None:
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -49,6 +62,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -66,7 +80,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
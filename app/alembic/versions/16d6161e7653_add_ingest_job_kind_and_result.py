@@ -0,0 +1,34 @@
+"""add_ingest_job_kind_and_result
+
+Revision ID: 16d6161e7653
+Revises: 7f945f015a20
+Create Date: 2025-06-09 15:41:07.532981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '16d6161e7653'
+down_revision: Union[str, None] = '7f945f015a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    jobkind = sa.Enum('VIDEO', 'PLAYLIST', name='jobkind')
+    jobkind.create(op.get_bind(), checkfirst=True)
+    op.add_column('ingest_job', sa.Column('kind', jobkind, server_default='VIDEO', nullable=False))
+    op.add_column('ingest_job', sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('ingest_job', 'result')
+    op.drop_column('ingest_job', 'kind')
+    sa.Enum(name='jobkind').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,50 @@
+"""add_vid_chat_timestamps
+
+Revision ID: 3ee2ad1a3ea1
+Revises: 90a39bd4de0e
+Create Date: 2025-07-22 16:20:41.903518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3ee2ad1a3ea1'
+down_revision: Union[str, None] = '90a39bd4de0e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('vid_chat', sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+    op.add_column('vid_chat', sa.Column('last_activity_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+    # Existing rooms: created with their first message, active until their last one
+    op.execute("""
+        UPDATE vid_chat v
+        SET created_at = m.first_at, last_activity_at = m.last_at
+        FROM (
+            SELECT vid_id, MIN(created_at) AS first_at, MAX(created_at) AS last_at
+            FROM message
+            GROUP BY vid_id
+        ) m
+        WHERE m.vid_id = v.id
+    """)
+    op.alter_column('vid_chat', 'created_at', server_default=None)
+    op.alter_column('vid_chat', 'last_activity_at', server_default=None)
+    op.create_index('ix_vid_chat_created_at_id', 'vid_chat', ['created_at', 'id'], unique=False)
+    op.create_index('ix_vid_chat_last_activity_at_id', 'vid_chat', ['last_activity_at', 'id'], unique=False)
+    op.create_index('ix_vid_chat_title_lower_prefix', 'vid_chat', [sa.text('lower(title) text_pattern_ops')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_vid_chat_title_lower_prefix', table_name='vid_chat')
+    op.drop_index('ix_vid_chat_last_activity_at_id', table_name='vid_chat')
+    op.drop_index('ix_vid_chat_created_at_id', table_name='vid_chat')
+    op.drop_column('vid_chat', 'last_activity_at')
+    op.drop_column('vid_chat', 'created_at')
@@ -0,0 +1,122 @@
+"""compact_transcript_segments
+
+Replaces vid_chat.transcript_wts (JSONB, one object per caption line) with
+vid_chat.segments_blob, the compressed columnar encoding of
+services/segment_codec.py. Existing rows are converted in batches, with a
+copy of the codec frozen in this revision as of its "SEG1" layout.
+
+Revision ID: 841dd5ae0316
+Revises: 3ee2ad1a3ea1
+Create Date: 2025-07-25 10:42:18.660394
+
+"""
+import struct
+import zlib
+from typing import Any, Dict, List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '841dd5ae0316'
+down_revision: Union[str, None] = '3ee2ad1a3ea1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 100
+
+# Frozen copy of the segment codec at this revision. Later changes to
+# services/segment_codec.py must not change what this migration writes or reads.
+#   header b"SEG1", uint32 n; float32[n] starts; float32[n] durations;
+#   uint32[n+1] text offsets; UTF-8 texts. Little-endian, zlib-compressed.
+SEGMENT_MAGIC = b"SEG1"
+SEGMENT_HEADER = struct.Struct("<4sI")
+SEGMENT_COMPRESSION_LEVEL = 6
+
+
+def encode_segments(segments: List[Dict[str, Any]]) -> bytes:
+    n = len(segments)
+    texts = [s["text"].encode("utf-8") for s in segments]
+    offsets = [0]
+    for t in texts:
+        offsets.append(offsets[-1] + len(t))
+    payload = b"".join([
+        SEGMENT_HEADER.pack(SEGMENT_MAGIC, n),
+        struct.pack(f"<{n}f", *(s["start"] for s in segments)),
+        struct.pack(f"<{n}f", *(s.get("duration", 0.0) for s in segments)),
+        struct.pack(f"<{n + 1}I", *offsets),
+        *texts,
+    ])
+    return zlib.compress(payload, SEGMENT_COMPRESSION_LEVEL)
+
+
+def decode_segments(data: bytes) -> List[Dict[str, Any]]:
+    buffer = zlib.decompress(data)
+    magic, n = SEGMENT_HEADER.unpack_from(buffer)
+    if magic != SEGMENT_MAGIC:
+        raise ValueError(f"Not an encoded segment list: unknown header {magic!r}")
+    pos = SEGMENT_HEADER.size
+    starts = struct.unpack_from(f"<{n}f", buffer, pos)
+    pos += 4 * n
+    durations = struct.unpack_from(f"<{n}f", buffer, pos)
+    pos += 4 * n
+    offsets = struct.unpack_from(f"<{n + 1}I", buffer, pos)
+    pos += 4 * (n + 1)
+    return [
+        {
+            "text": buffer[pos + offsets[i]:pos + offsets[i + 1]].decode("utf-8"),
+            # Rounded to hide float32 noise
+            "start": round(starts[i], 3),
+            "duration": round(durations[i], 3),
+        }
+        for i in range(n)
+    ]
+
+vid_chat = sa.table(
+    'vid_chat',
+    sa.column('id', sa.String()),
+    sa.column('transcript_wts', postgresql.JSONB()),
+    sa.column('segments_blob', sa.LargeBinary()),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('vid_chat', sa.Column('segments_blob', sa.LargeBinary(), nullable=True))
+    # segments_blob is already compressed; keep Postgres from trying again
+    op.execute("ALTER TABLE vid_chat ALTER COLUMN segments_blob SET STORAGE EXTERNAL")
+    conn = op.get_bind()
+    converted = 0
+    while True:
+        rows = conn.execute(
+            sa.select(vid_chat.c.id, vid_chat.c.transcript_wts)
+            .where(vid_chat.c.segments_blob.is_(None))
+            .where(vid_chat.c.transcript_wts.isnot(None))
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for vid_id, segments in rows:
+            conn.execute(
+                vid_chat.update().where(vid_chat.c.id == vid_id).values(segments_blob=encode_segments(segments or []))
+            )
+        converted += len(rows)
+    print(f"Encoded the segments of {converted} chatroom(s).")
+    op.drop_column('vid_chat', 'transcript_wts')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('vid_chat', sa.Column('transcript_wts', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(vid_chat.c.id).where(vid_chat.c.segments_blob.isnot(None))
+    ).scalars().all()
+    for vid_id in rows:
+        blob = conn.execute(sa.select(vid_chat.c.segments_blob).where(vid_chat.c.id == vid_id)).scalar_one()
+        conn.execute(
+            vid_chat.update().where(vid_chat.c.id == vid_id).values(transcript_wts=decode_segments(blob))
+        )
+    op.drop_column('vid_chat', 'segments_blob')
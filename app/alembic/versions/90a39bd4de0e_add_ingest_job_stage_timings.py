@@ -0,0 +1,29 @@
+"""add_ingest_job_stage_timings
+
+Revision ID: 90a39bd4de0e
+Revises: a6695d41974b
+Create Date: 2025-07-18 11:06:52.184730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '90a39bd4de0e'
+down_revision: Union[str, None] = 'a6695d41974b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ingest_job', sa.Column('stage_timings', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('ingest_job', 'stage_timings')
@@ -0,0 +1,40 @@
+"""add_chunk_text_search
+
+Adds a generated tsvector column over chunk text and a GIN index on it for the
+lexical side of hybrid retrieval. The column is STORED, so Postgres fills it
+on every insert, COPY included; existing rows are computed by the ALTER.
+
+Revision ID: b85a7230e58f
+Revises: cc335e40cfd2
+Create Date: 2025-06-30 10:12:41.553018
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b85a7230e58f'
+down_revision: Union[str, None] = 'cc335e40cfd2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chunk', sa.Column(
+        'text_tsv',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('english', text)", persisted=True),
+        nullable=True
+    ))
+    op.create_index('ix_chunk_text_tsv', 'chunk', ['text_tsv'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chunk_text_tsv', table_name='chunk', postgresql_using='gin')
+    op.drop_column('chunk', 'text_tsv')
@@ -0,0 +1,68 @@
+"""configurable_hnsw_index
+
+Rebuilds the chunk HNSW index with a configurable operator class and build
+parameters. Reads the same environment variables as the VectorStore:
+HNSW_OPCLASS (default vector_ip_ops), HNSW_M (16) and HNSW_EF_CONSTRUCTION (64).
+To change them later, set the variables and run a downgrade/upgrade of this
+revision, or add a new revision calling `_create_index`.
+
+Revision ID: cc335e40cfd2
+Revises: 779f8c4ca17e
+Create Date: 2025-06-23 09:47:15.204661
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+import pgvector.sqlalchemy
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'cc335e40cfd2'
+down_revision: Union[str, None] = '779f8c4ca17e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'embeddings_index_basic'
+OPCLASSES = ('vector_l2_ops', 'vector_ip_ops', 'vector_cosine_ops')
+
+
+def _create_index(opclass: str, m: int, ef_construction: int) -> None:
+    assert opclass in OPCLASSES, f"Unsupported HNSW opclass '{opclass}'"
+    op.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+    op.execute(
+        f"CREATE INDEX {INDEX_NAME} ON chunk "
+        f"USING hnsw (embedding {opclass}) "
+        f"WITH (m = {int(m)}, ef_construction = {int(ef_construction)})"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    # The chunk table used to be created at boot only (and was dropped by the first revision)
+    if not sa.inspect(op.get_bind()).has_table('chunk'):
+        op.create_table('chunk',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('text', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('vid_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('embedding', pgvector.sqlalchemy.Vector(768), nullable=True),
+        sa.Column('meta', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_chunk_vid_id', 'chunk', ['vid_id'], unique=False)
+    _create_index(
+        os.getenv("HNSW_OPCLASS", "vector_ip_ops"),
+        int(os.getenv("HNSW_M", "16")),
+        int(os.getenv("HNSW_EF_CONSTRUCTION", "64")),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Back to the index previously created at boot time
+    op.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+    op.execute(f"CREATE INDEX {INDEX_NAME} ON chunk USING hnsw (embedding vector_l2_ops)")
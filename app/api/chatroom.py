@@ -1,20 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session, select
-from sqlalchemy import delete
+from sqlalchemy import delete, func, tuple_
 from pydantic import BaseModel
-from typing import List, Dict, Any, AsyncGenerator
-from app.services.transcript import load_pipeline, get_video_content, Transcript
-from app.services.intent_classifier import classify_intent 
+from typing import List, Dict, Any, AsyncGenerator, Literal, Optional
+from app.services.transcript import get_video_id, LIST_PREFIX, MALFORMED_ERROR
+from app.services.ingestion import IngestionWorkerPool
+from app.services.intent_classifier import LocalIntentClassifier
+from app.services.embedding_batcher import EmbeddingBatcher
 from app.services.vector_store import VectorStore
-from app.services.responder import generate_qa_response, generate_quiz_full, generate_summary, generate_chat_response, generate_summary_full, generate_summary_specific
+from app.services.response_cache import ResponseCache
+from app.services.segment_codec import decode_segments
+from app.services.message_writer import MessageWriter
+from app.services.chatroom_listing import list_chatrooms, invalidate_chatroom_listing, CHATROOM_PAGE_SIZE, CHATROOM_PAGE_MAX_SIZE
+from app.services.responder import generate_qa_response, generate_quiz_full, generate_chat_response, generate_summary_full, generate_summary_specific, start_speculative_retrieval, RAG_INTENTS
 from app.models.vid_chat import VidChat
 from app.models.message import Message, MessageSender
-from app.schemas.chatroom_schemas import ChatroomPayload, ChatroomQueryPayload, VidChatWithMessages
+from app.models.ingest_job import IngestJob, JobKind
+from app.models.response_cache import ResponseCacheEntry
+from app.models.section_summary import SectionSummary
+from app.schemas.chatroom_schemas import ChatroomPayload, ChatroomQueryPayload, PlaylistPayload, ChatroomDetail, ChatroomPage, MessagePage, TranscriptResponse, TranscriptSegmentsResponse
 from app.db.session import get_session
-from app.db.dependencies import get_vector_store
-from app.utils.yt_utils import get_description
+from app.utils.http import json_response, make_etag, etag_matches, etag_headers, not_modified, encode_cursor, decode_cursor
+from app.db.dependencies import get_vector_store, get_ingestion_pool, get_embedding_batcher, get_intent_classifier, get_response_cache, get_message_writer
 from fastapi.responses import StreamingResponse
+import asyncio
 import logging
+import os
+import uuid
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Configuration of the chatroom detail endpoints ---
+MESSAGE_PAGE_SIZE = int(os.getenv("MESSAGE_PAGE_SIZE", "50"))
+MESSAGE_PAGE_MAX_SIZE = 200
 
 # --- Router Definition ---
 router = APIRouter(
@@ -32,82 +51,191 @@ async def _string_to_async_generator(text: str, intent: str) -> AsyncGenerator[s
 
 # --- API Endpoints ---
 
-@router.post("/", response_model=VidChat)
-def create_chatroom(payload: ChatroomPayload, session: Session = Depends(get_session), vector_store: VectorStore = Depends(get_vector_store)):
+@router.post("/", response_model=IngestJob, status_code=202)
+async def create_chatroom(payload: ChatroomPayload, session: Session = Depends(get_session), ingestion_pool: IngestionWorkerPool = Depends(get_ingestion_pool)):
     """
-    Creates a new chatroom entry by processing a YouTube URL.
-    Fetches metadata, transcript, and stores it.
-    Returns the created VidChat object.
+    Queues a background job that creates a chatroom from a YouTube URL.
+    Fetching metadata and transcript, summarizing, embedding and storing all
+    happen in the ingestion workers.
+    Returns the IngestJob; poll GET /api/chatrooms/jobs/{job_id} for its status.
     """
     url_str = str(payload.url) # Convert HttpUrl back to string if needed by helpers
-    transcript_obj: Transcript = load_pipeline(url_str, False) # Assuming it takes vid_id now
-    vid_id = transcript_obj.vid_id
+    try:
+        vid_id = get_video_id(url_str)
+    except (AssertionError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     existing_chat = session.get(VidChat, vid_id)
     if existing_chat:
-        print(f"Chatroom for {vid_id} already exists. Returning existing.")
-        return existing_chat # Return existing data
+        print(f"Chatroom for {vid_id} already exists. Returning its latest job.")
+        return await ingestion_pool.submit(url_str, vid_id, done=True)
 
-    print(f"Creating new chatroom for video ID: {vid_id}")
+    print(f"Queueing chatroom creation for video ID: {vid_id}")
+    job = await ingestion_pool.submit(url_str, vid_id)
+    print(f"Ingestion job {job.id} queued for {vid_id}")
+    return job
 
-    # 2. Fetch Metadata (consider doing this in parallel if using async)
-    title = transcript_obj.vid_title
-    description = get_description(url_str)
-    # 3. Fetch Transcripts (handle potential errors from services)
-    try:
-        # Get timestamped transcript
-        transcript_wts_list: List[Dict[str, Any]] = get_video_content(vid_id)
-    except Exception as e:
-        print(f"Error getting transcript for {vid_id}: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to process transcript for video {vid_id}.")
-
-    # 4. Create VidChat Object
-    new_vid_chat = VidChat(
-        id=vid_id,
-        title=title,
-        url=url_str,
-        description=description,
-        summary=generate_summary(transcript_obj.content),
-        transcript=transcript_obj.content,
-        transcript_wts=transcript_wts_list
-    )
-    # 5. Add to DB and Commit
-    try:
-        session.add(new_vid_chat)
-        chunks = transcript_obj.chunks
-        vector_store.insert_chunks(chunks, vid_id, [{}] * len(chunks))
-        session.commit()
-        session.refresh(new_vid_chat)
-        print(f"Successfully created chatroom for {vid_id}")
-        return new_vid_chat
-    except Exception as e:
-        session.rollback()
-        print(f"Database error creating chatroom for {vid_id}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to save chatroom data.")
+@router.post("/playlist", response_model=IngestJob, status_code=202)
+async def create_chatrooms_from_playlist(payload: PlaylistPayload, ingestion_pool: IngestionWorkerPool = Depends(get_ingestion_pool)):
+    """
+    Queues a background job that creates a chatroom for every video of a YouTube playlist.
+    Transcripts are fetched with bounded concurrency, chunks of all videos are embedded
+    in shared batches, and all rows are written in one transaction.
+    Videos that already have a chatroom are skipped; the per-video outcome is
+    reported in the job's `result`.
+    """
+    url_str = str(payload.url)
+    if not (url_str.startswith(LIST_PREFIX) and len(url_str) > len(LIST_PREFIX)):
+        raise HTTPException(status_code=400, detail=MALFORMED_ERROR)
+    job = await ingestion_pool.submit(url_str, kind=JobKind.PLAYLIST)
+    print(f"Playlist ingestion job {job.id} queued for {url_str}")
+    return job
 
-@router.get("/{vid_id}", response_model=VidChatWithMessages)
-def get_chatroom_by_id(vid_id: str, session: Session = Depends(get_session)):
+@router.get("/jobs/{job_id}", response_model=IngestJob)
+def get_ingest_job(job_id: uuid.UUID, session: Session = Depends(get_session)):
     """
-    Retrieves VidChat details for a given video ID.
+    Retrieves the status, current stage and progress of an ingestion job.
     """
-    print(f"Fetching chatroom for video ID: {vid_id}")
-    vid_chat = session.get(VidChat, vid_id)
-    if not vid_chat:
+    job = session.get(IngestJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Ingestion job '{job_id}' not found.")
+    return job
+
+def _load_chatroom_detail(session: Session, vid_id: str) -> Dict[str, Any]:
+    """The chatroom row without the transcript columns."""
+    room = session.exec(
+        select(VidChat.id, VidChat.title, VidChat.url, VidChat.description, VidChat.summary)
+        .where(VidChat.id == vid_id)
+    ).mappings().first()
+    if not room:
         print(f"Chatroom not found for video ID: {vid_id}")
         raise HTTPException(status_code=404, detail=f"Chatroom for video ID '{vid_id}' not found.")
-    # fetch messages for this video chat
-    messages_stm = select(Message).where(Message.vid_id == vid_id).order_by(Message.created_at)
-    messages = session.exec(messages_stm).all()
+    return dict(room)
+
+def _latest_message_key(session: Session, vid_id: str) -> Optional[tuple]:
+    # Messages are only ever appended, so the newest one identifies the whole history
+    return session.exec(
+        select(Message.created_at, Message.id)
+        .where(Message.vid_id == vid_id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(1)
+    ).first()
+
+def _load_message_page(session: Session, vid_id: str, before: Optional[str], limit: int) -> Dict[str, Any]:
+    """
+    One page of a chatroom's messages, walking back from the newest one by
+    keyset on (created_at, id), which the ix_message_vid_id_created_at index serves.
+    """
+    stmt = select(
+        Message.id, Message.vid_id, Message.content, Message.created_at, Message.sent_by
+    ).where(Message.vid_id == vid_id)
+    if before:
+        try:
+            created_at, message_id = decode_cursor(before)
+            message_id = uuid.UUID(message_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        stmt = stmt.where(tuple_(Message.created_at, Message.id) < tuple_(created_at, message_id))
+    rows = session.exec(
+        stmt.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1)
+    ).mappings().all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"]) if has_more else None
     return {
-        "vid_chat": vid_chat,
-        "messages": messages
+        "messages": [dict(row) for row in reversed(rows)],
+        "next_cursor": next_cursor,
     }
 
+@router.get("/{vid_id}", response_model=ChatroomDetail)
+def get_chatroom_by_id(
+    vid_id: str,
+    request: Request,
+    before: Optional[str] = None,
+    limit: int = Query(MESSAGE_PAGE_SIZE, ge=1, le=MESSAGE_PAGE_MAX_SIZE),
+    session: Session = Depends(get_session)
+):
+    """
+    Retrieves a chatroom and its latest messages, newest page first.
+
+    The transcript is served by GET /{vid_id}/transcript and the timestamped
+    segments by GET /{vid_id}/transcript/segments. Older messages are paged with
+    GET /{vid_id}/messages?before=<next_cursor>. Responds 304 when the
+    If-None-Match header carries the current ETag.
+    """
+    print(f"Fetching chatroom for video ID: {vid_id}")
+    room = _load_chatroom_detail(session, vid_id)
+    etag = make_etag("room", *room.values(), _latest_message_key(session, vid_id), before, limit)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    page = _load_message_page(session, vid_id, before, limit)
+    return json_response({"vid_chat": room, **page}, headers=etag_headers(etag))
+
+@router.get("/{vid_id}/messages", response_model=MessagePage)
+def get_chatroom_messages(
+    vid_id: str,
+    request: Request,
+    before: Optional[str] = None,
+    limit: int = Query(MESSAGE_PAGE_SIZE, ge=1, le=MESSAGE_PAGE_MAX_SIZE),
+    session: Session = Depends(get_session)
+):
+    """
+    Retrieves one page of a chatroom's messages, oldest first within the page.
+    Pass the previous page's `next_cursor` as `before` to continue further back.
+    """
+    if session.exec(select(VidChat.id).where(VidChat.id == vid_id)).first() is None:
+        raise HTTPException(status_code=404, detail=f"Chatroom for video ID '{vid_id}' not found.")
+    etag = make_etag("messages", vid_id, _latest_message_key(session, vid_id), before, limit)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return json_response(_load_message_page(session, vid_id, before, limit), headers=etag_headers(etag))
+
+@router.get("/{vid_id}/transcript", response_model=TranscriptResponse)
+def get_chatroom_transcript(vid_id: str, request: Request, session: Session = Depends(get_session)):
+    """
+    Retrieves the plain-text transcript of a chatroom.
+    """
+    # The digest is computed in the database, so a 304 never transfers the text
+    digest = session.exec(select(func.md5(VidChat.transcript)).where(VidChat.id == vid_id)).first()
+    if digest is None:
+        raise HTTPException(status_code=404, detail=f"Chatroom for video ID '{vid_id}' not found.")
+    etag = make_etag("transcript", vid_id, digest)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    transcript = session.exec(select(VidChat.transcript).where(VidChat.id == vid_id)).first()
+    return json_response({"vid_id": vid_id, "transcript": transcript}, headers=etag_headers(etag))
+
+@router.get("/{vid_id}/transcript/segments", response_model=TranscriptSegmentsResponse)
+def get_chatroom_transcript_segments(
+    vid_id: str,
+    request: Request,
+    start: Optional[float] = Query(None, ge=0, description="Only segments running at or after this second"),
+    end: Optional[float] = Query(None, ge=0, description="Only segments starting before this second"),
+    session: Session = Depends(get_session)
+):
+    """
+    Retrieves the timestamped transcript segments of a chatroom, optionally
+    only those overlapping the [start, end) time range.
+    """
+    row = session.exec(
+        select(VidChat.id, func.md5(VidChat.segments_blob)).where(VidChat.id == vid_id)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Chatroom for video ID '{vid_id}' not found.")
+    etag = make_etag("segments", vid_id, row[1], start, end)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    blob = session.exec(select(VidChat.segments_blob).where(VidChat.id == vid_id)).first()
+    segments = decode_segments(blob).slice_time(start, end).to_list() if blob else []
+    return json_response({"vid_id": vid_id, "segments": segments}, headers=etag_headers(etag))
+
 @router.delete("/{vid_id}", status_code=204)
 async def delete_chatroom_by_id(
     vid_id: str,
     session: Session = Depends(get_session),
-    vector_store: VectorStore = Depends(get_vector_store)
+    vector_store: VectorStore = Depends(get_vector_store),
+    response_cache: ResponseCache = Depends(get_response_cache),
+    message_writer: MessageWriter = Depends(get_message_writer)
 ):
     """
     Deletes a chatroom and all associated messages by video ID.
@@ -116,6 +244,8 @@ async def delete_chatroom_by_id(
     - vid_id (str): The ID of the video, which is also used as the ID for the VidChat.
     - session (Session): The database session.
     - vector_store (VectorStore): The vector store client.
+    - response_cache (ResponseCache): Cached LLM responses, dropped for the video.
+    - message_writer (MessageWriter): Queued messages of the video are dropped.
 
     Returns:
     - 204 No Content on success.
@@ -125,7 +255,8 @@ async def delete_chatroom_by_id(
     try:
         # 1. Attempt to find the chatroom (VidChat) first.
         #    This allows us to fail fast with a 404 if it doesn't exist.
-        chatroom_statement = select(VidChat).where(VidChat.id == vid_id)
+        #    Locked, so a concurrent message flush either finishes first or sees it gone.
+        chatroom_statement = select(VidChat).where(VidChat.id == vid_id).with_for_update()
         chatroom_to_delete = session.exec(chatroom_statement).first()
 
         if not chatroom_to_delete:
@@ -134,8 +265,10 @@ async def delete_chatroom_by_id(
                 detail=f"Chatroom with vid_id '{vid_id}' not found."
             )
 
-        # 2. Delete associated messages
+        # 2. Delete associated messages, cached responses and section summaries
         session.exec(delete(Message).where(Message.vid_id == vid_id))
+        session.exec(delete(ResponseCacheEntry).where(ResponseCacheEntry.vid_id == vid_id))
+        session.exec(delete(SectionSummary).where(SectionSummary.vid_id == vid_id))
 
         # 3. Delete the chatroom (VidChat) itself
         print(f"Marking chatroom '{vid_id}' for deletion.")
@@ -143,12 +276,15 @@ async def delete_chatroom_by_id(
 
         # 4. Delete associated chunks from the vector store
         print(f"Requesting deletion of chunks for vid_id '{vid_id}' from vector store.")
-        vector_store.delete_chunks(vid_id)
+        await vector_store.adelete_chunks(vid_id)
         print(f"Successfully requested deletion of chunks for vid_id '{vid_id}'.")
 
         # 5. Commit the database transaction
         session.commit()
         print(f"Successfully deleted chatroom and messages for vid_id '{vid_id}' and committed to DB.")
+        response_cache.forget_video(vid_id)
+        message_writer.forget_video(vid_id)
+        invalidate_chatroom_listing()
 
         return Response(status_code=204)
 
@@ -165,32 +301,40 @@ async def delete_chatroom_by_id(
             detail=f"Failed to delete chatroom for vid_id '{vid_id}': {str(e)}"
         )
 
-@router.get("/", response_model=List[VidChat])
-def get_chatrooms(session: Session = Depends(get_session)):
+@router.get("/", response_model=ChatroomPage)
+def get_chatrooms(
+    sort: Literal["created", "last_activity"] = "last_activity",
+    before: Optional[str] = None,
+    limit: int = Query(CHATROOM_PAGE_SIZE, ge=1, le=CHATROOM_PAGE_MAX_SIZE),
+    q: Optional[str] = Query(None, max_length=200, description="Title prefix, case-insensitive"),
+    session: Session = Depends(get_session)
+):
     """
-    Retrieves all the current created chatrooms.
+    Retrieves one page of chatrooms, newest first by creation or last activity.
+    Pass the previous page's `next_cursor` as `before` to get the next page.
     """
-    print("Fetching all the chatrooms for the user.")
-    results = session.exec(
-        select(
-            VidChat.id,
-            VidChat.title
-        )
-    ).mappings().all()
-    return [dict(row) for row in results]
+    print("Fetching the chatrooms for the user.")
+    try:
+        page = list_chatrooms(session, sort=sort, before=before, limit=limit, title_prefix=q)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(page)
 
-def get_content_stream_generator(intent: str, vid_chat, vid_id: str, user_query: str, session) -> AsyncGenerator:
+def get_content_stream_generator(intent: str, vid_chat, vid_id: str, user_query: str, session, retrieval: Optional[asyncio.Task] = None) -> AsyncGenerator:
     match intent:
         # Summarization
         case "summarize_full":
-            return generate_summary_full(vid_chat.transcript, user_query)
+            return generate_summary_full(
+                vid_chat.transcript, user_query, vid_id,
+                decode_segments(vid_chat.segments_blob) if vid_chat.segments_blob else None
+            )
         
         case "summarize_specific":
-            return generate_summary_specific(vid_id, user_query)
+            return generate_summary_specific(vid_id, user_query, retrieval)
         
         # Q&A
         case "qa_specific":
-            return generate_qa_response(user_query, vid_id)
+            return generate_qa_response(user_query, vid_id, retrieval)
         
         # Conversational
         case "general_chat":
@@ -204,7 +348,7 @@ def get_content_stream_generator(intent: str, vid_chat, vid_id: str, user_query:
         
         # Learning Tools
         case "quiz_full":
-            return generate_quiz_full(vid_chat.transcript)
+            return generate_quiz_full(vid_chat.transcript, vid_id)
         case "flashcards_full":
             response_content = f"{intent.split('_')[0].title()} generation for full video is not implemented yet."
             return _string_to_async_generator(response_content, intent)
@@ -221,7 +365,14 @@ def get_content_stream_generator(intent: str, vid_chat, vid_id: str, user_query:
 
 
 @router.post("/{vid_id}/query", response_model=Dict[str, Any])
-async def query_chatroom(vid_id: str, payload: ChatroomQueryPayload, session: Session = Depends(get_session)):
+async def query_chatroom(
+    vid_id: str,
+    payload: ChatroomQueryPayload,
+    session: Session = Depends(get_session),
+    embedding_batcher: EmbeddingBatcher = Depends(get_embedding_batcher),
+    intent_classifier: LocalIntentClassifier = Depends(get_intent_classifier),
+    message_writer: MessageWriter = Depends(get_message_writer)
+):
     """
     Processes a user query against a specific chatroom (video).
     Classifies intent and routes to the appropriate backend service (QA, Summary, etc.).
@@ -237,47 +388,52 @@ async def query_chatroom(vid_id: str, payload: ChatroomQueryPayload, session: Se
     if not vid_chat.transcript:
          raise HTTPException(status_code=400, detail=f"Transcript is not available for video ID '{vid_id}'. Cannot process query.")
 
-    # 2. Classify Intent
+    # 2. Classify Intent, with retrieval running speculatively alongside
+    # since most queries end up in a RAG intent
+    retrieval: Optional[asyncio.Task] = None
     try:
-        # Assuming classify_intent takes the user query string
-        intent = classify_intent(user_query)
+        query_embedding = await embedding_batcher.embed(user_query)
+        retrieval = start_speculative_retrieval(user_query, vid_id, query_embedding)
+        intent = await intent_classifier.classify(user_query, query_embedding)
         print(f"Classified Intent: {intent}")
     except Exception as e:
+        if retrieval is not None:
+            retrieval.cancel()
         print(f"Error classifying intent for query '{user_query}': {e}")
         raise HTTPException(status_code=500, detail="Failed to classify query intent.")
+    if intent not in RAG_INTENTS:
+        retrieval.cancel()
+        retrieval = None
 
     # 3. Route based on Intent and prepare the stream generator
     content_stream_generator: AsyncGenerator[str, None]
 
     try:
         # Summarization
-        content_stream_generator = get_content_stream_generator(intent, vid_chat, vid_id, user_query, session)
+        content_stream_generator = get_content_stream_generator(intent, vid_chat, vid_id, user_query, session, retrieval)
         # Create an async generator that preserves streaming and saves messages
         async def message_stream_generator():
-            # Save user message
             user_message = Message(
                 vid_id=vid_id,
                 content=user_query,
                 sent_by=MessageSender.USER
             )
-            session.add(user_message)
 
             # Collect bot response while streaming
-            bot_response = ""
+            parts: List[str] = []
             try:
                 async for chunk in content_stream_generator:
-                    bot_response += chunk
+                    parts.append(chunk)
                     yield chunk
             except:
-                bot_response = "We've encountered an ERROR while generating the content."
-            # Save bot message after stream is complete
+                parts = ["We've encountered an ERROR while generating the content."]
             bot_message = Message(
                 vid_id=vid_id,
-                content=bot_response,
+                content="".join(parts),
                 sent_by=MessageSender.BOT
             )
-            session.add(bot_message)
-            session.commit()
+            # Written in the background, batched with other requests' messages
+            message_writer.enqueue(user_message, bot_message)
 
         return StreamingResponse(message_stream_generator(), media_type="text/plain")
 
@@ -0,0 +1,38 @@
+from fastapi import APIRouter
+from typing import Dict, Any
+from app.db.life_span import shared_resources
+from app.services.chatroom_listing import listing_cache_stats
+
+# --- Router Definition ---
+router = APIRouter(
+    prefix="/api/metrics",
+    tags=["Metrics"]
+)
+
+@router.get("/", response_model=Dict[str, Any])
+def get_metrics():
+    """
+    Reports runtime metrics of the shared services (caches, batching) for tuning.
+    """
+    metrics: Dict[str, Any] = {}
+    vector_store = shared_resources.get("vector_store")
+    if vector_store is not None:
+        metrics["embedding_cache"] = vector_store.embedding_model.stats()
+        metrics["vector_matrix_cache"] = vector_store.matrix_cache.stats()
+    embedding_batcher = shared_resources.get("embedding_batcher")
+    if embedding_batcher is not None:
+        metrics["embedding_batcher"] = embedding_batcher.stats()
+    llm_registry = shared_resources.get("llm_registry")
+    if llm_registry is not None:
+        metrics["llm"] = llm_registry.stats()
+    response_cache = shared_resources.get("response_cache")
+    if response_cache is not None:
+        metrics["response_cache"] = response_cache.stats()
+    intent_classifier = shared_resources.get("intent_classifier")
+    if intent_classifier is not None:
+        metrics["intent_classifier"] = intent_classifier.stats()
+    metrics["chatroom_listing_cache"] = listing_cache_stats()
+    message_writer = shared_resources.get("message_writer")
+    if message_writer is not None:
+        metrics["message_writer"] = message_writer.stats()
+    return metrics
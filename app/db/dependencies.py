@@ -12,4 +12,59 @@ def get_vector_store() -> VectorStore:
              status_code=500,
              detail="Internal server error: Vector Store unavailable."
          )
-    return vector_store
\ No newline at end of file
+    return vector_store
+
+def get_ingestion_pool():
+    """FastAPI dependency to get the running IngestionWorkerPool instance."""
+    ingestion_pool = shared_resources.get("ingestion_pool")
+    if ingestion_pool is None:
+         print("CRITICAL: Ingestion worker pool not found or not initialized in shared resources.")
+         raise HTTPException(
+             status_code=500,
+             detail="Internal server error: Ingestion workers unavailable."
+         )
+    return ingestion_pool
+
+def get_embedding_batcher():
+    """FastAPI dependency to get the running EmbeddingBatcher instance."""
+    embedding_batcher = shared_resources.get("embedding_batcher")
+    if embedding_batcher is None:
+         print("CRITICAL: Embedding batcher not found or not initialized in shared resources.")
+         raise HTTPException(
+             status_code=500,
+             detail="Internal server error: Embedding service unavailable."
+         )
+    return embedding_batcher
+
+def get_intent_classifier():
+    """FastAPI dependency to get the LocalIntentClassifier instance."""
+    intent_classifier = shared_resources.get("intent_classifier")
+    if intent_classifier is None:
+         print("CRITICAL: Intent classifier not found or not initialized in shared resources.")
+         raise HTTPException(
+             status_code=500,
+             detail="Internal server error: Intent classifier unavailable."
+         )
+    return intent_classifier
+
+def get_response_cache():
+    """FastAPI dependency to get the ResponseCache instance."""
+    response_cache = shared_resources.get("response_cache")
+    if response_cache is None:
+         print("CRITICAL: Response cache not found or not initialized in shared resources.")
+         raise HTTPException(
+             status_code=500,
+             detail="Internal server error: Response cache unavailable."
+         )
+    return response_cache
+
+def get_message_writer():
+    """FastAPI dependency to get the running MessageWriter instance."""
+    message_writer = shared_resources.get("message_writer")
+    if message_writer is None:
+         print("CRITICAL: Message writer not found or not initialized in shared resources.")
+         raise HTTPException(
+             status_code=500,
+             detail="Internal server error: Message persistence unavailable."
+         )
+    return message_writer
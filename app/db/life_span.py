@@ -26,7 +26,11 @@ async def lifespan_manager(app: FastAPI):
         # This example assumes models are implicitly known via SQLModel base.
         from app.models.vid_chat import VidChat # Ensure models are defined
         from app.models.message import Message # Ensure models are defined
+        from app.models.ingest_job import IngestJob # Ensure models are defined
         from app.services.vector_store import TextChunk
+        from app.services.embedding_cache import EmbeddingCacheEntry
+        from app.models.response_cache import ResponseCacheEntry
+        from app.models.section_summary import SectionSummary
         SQLModel.metadata.create_all(engine)
         print("Lifespan: Database tables checked/created.")
     except Exception as e:
@@ -45,8 +49,60 @@ async def lifespan_manager(app: FastAPI):
         print(f"Lifespan: FATAL - Vector Store initialization failed: {e}")
         raise RuntimeError(f"Vector Store initialization failed: {e}") from e
 
+    # --- Create Shared LLM Clients ---
+    from app.services.llm_registry import LLMRegistry
+    shared_resources["llm_registry"] = LLMRegistry()
+    print("Lifespan: LLM registry created.")
+
+    # --- Response Cache ---
+    from app.services.response_cache import ResponseCache
+    from app.services.responder import RESPONSE_TEMPLATE_HASHES
+    response_cache = ResponseCache(engine)
+    # Entries produced with an older version of a template must not be replayed
+    purged = response_cache.purge_stale_templates(RESPONSE_TEMPLATE_HASHES)
+    shared_resources["response_cache"] = response_cache
+    print(f"Lifespan: Response cache ready ({purged} stale entries purged).")
+
+    # --- Start Message Writer ---
+    from app.services.message_writer import MessageWriter
+    message_writer = MessageWriter()
+    await message_writer.start()
+    shared_resources["message_writer"] = message_writer
+    print("Lifespan: Message writer started.")
+
+    # --- Start Query Embedding Dispatcher ---
+    from app.services.embedding_batcher import EmbeddingBatcher
+    embedding_batcher = EmbeddingBatcher(vector_store_instance.embedding_model)
+    await embedding_batcher.start()
+    shared_resources["embedding_batcher"] = embedding_batcher
+    print("Lifespan: Query embedding dispatcher started.")
+
+    # --- Build Local Intent Classifier ---
+    from app.services.intent_classifier import LocalIntentClassifier
+    # The uncached backend: example embeddings don't belong in the chunk embedding store
+    intent_classifier = LocalIntentClassifier(vector_store_instance.embedding_model.backend)
+    shared_resources["intent_classifier"] = intent_classifier
+    print(f"Lifespan: Local intent classifier ready ({len(intent_classifier.labels)} examples).")
+
+    # --- Start Ingestion Workers ---
+    print("Lifespan: Starting ingestion workers...")
+    # Imported here since the ingestion pipeline pulls in modules that depend on shared_resources
+    from app.services.ingestion import IngestionWorkerPool
+    from app.services.job_queue import InProcessJobQueue
+    ingestion_pool = IngestionWorkerPool(InProcessJobQueue(), vector_store_instance)
+    await ingestion_pool.start()
+    shared_resources["ingestion_pool"] = ingestion_pool
+    print(f"Lifespan: {ingestion_pool.num_workers} ingestion worker(s) started.")
+
     yield # Application runs here
     # --- Cleanup ---
     print("Lifespan: Application shutdown...")
+    await ingestion_pool.stop()
+    # Writes every message still queued
+    await message_writer.stop()
+    await embedding_batcher.stop()
+    await vector_store_instance.aclose()
+    from app.services.video_metadata import close_clients
+    await close_clients()
     shared_resources.clear()
     print("Lifespan: Cleanup complete.")
\ No newline at end of file
@@ -11,6 +11,13 @@ if not DATABASE_URL:
 # echo=False for production, else Verbose logging is enabled
 engine = create_engine(DATABASE_URL, echo=False)
 
+def to_async_url(url: str) -> str:
+    """Rewrites a PostgreSQL URL to use the asyncpg driver."""
+    scheme, sep, rest = url.partition("://")
+    if scheme.split("+")[0] in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
 def get_session():
     with Session(engine) as session:
         yield session
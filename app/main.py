@@ -1,10 +1,10 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from app.db.life_span import lifespan_manager
-from app.api import chatroom
+from app.api import chatroom, metrics
 
-import requests
-from bs4 import BeautifulSoup
+from app.services.transcript import get_video_id
+from app.services.video_metadata import fetch_video_metadata
 
 # --- App Initialization with Lifespan ---
 app = FastAPI(
@@ -31,6 +31,7 @@ app.add_middleware(
 
 # --- Include API Routers ---
 app.include_router(chatroom.router)
+app.include_router(metrics.router)
 
 @app.get("/", tags=["Root"])
 def read_root():
@@ -40,10 +41,14 @@ def read_root():
     return {"message": "Welcome to the Youtube.AI API!"}
 
 @app.get("/get-title")
-def get_title(url: str):
-    r = requests.get(url)
-    soup = BeautifulSoup(r.text, 'html.parser')
-    title_tag = soup.find('title')
-    if title_tag:
-        return {"title": title_tag.text.split(' - YouTube')[0]}
-    return {"title": None}
\ No newline at end of file
+async def get_title(url: str):
+    try:
+        vid_id = get_video_id(url)
+    except (AssertionError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        metadata = await fetch_video_metadata(vid_id)
+    except Exception as e:
+        print(f"Failed to fetch title for {url}: {e}")
+        return {"title": None}
+    return {"title": metadata.title or None}
\ No newline at end of file
@@ -0,0 +1,67 @@
+from sqlmodel import SQLModel, Field, Index, Column, Enum
+from sqlalchemy.dialects.postgresql import JSONB
+import uuid
+from datetime import datetime
+from enum import Enum as PyEnum
+from typing import Optional, Dict, Any
+
+class JobStatus(PyEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class JobKind(PyEnum):
+    VIDEO = "video"
+    PLAYLIST = "playlist"
+
+# Statuses a job can be recovered from after a restart
+ACTIVE_JOB_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+# Used by the worker pool to find unfinished jobs on startup
+INGEST_JOB_STATUS_INDEX = "ix_ingest_job_status_created_at"
+
+class IngestJob(SQLModel, table=True):
+    __tablename__ = "ingest_job"
+    __table_args__ = (
+        Index(INGEST_JOB_STATUS_INDEX, "status", "created_at"),
+        {'extend_existing': True}
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    kind: JobKind = Field(
+        default=JobKind.VIDEO,
+        sa_column=Column(
+            "kind",
+            Enum(JobKind),
+            nullable=False,
+            server_default=JobKind.VIDEO.name
+        )
+    )
+    url: str
+    vid_id: Optional[str] = Field(default=None, index=True)
+    status: JobStatus = Field(
+        default=JobStatus.QUEUED,
+        sa_column=Column(
+            "status",
+            Enum(JobStatus),
+            nullable=False
+        )
+    )
+    stage: Optional[str] = Field(default=None) # Names of the stages currently (or last) running, comma separated
+    progress: float = Field(default=0.0) # Fraction of stages completed, 0.0 - 1.0
+    attempts: int = Field(default=0) # Attempts made on the most recently (re)started stage
+    error: Optional[str] = Field(default=None)
+    # Per-video outcome of playlist jobs, e.g. {"created": [...], "skipped": [...], "failed": {...}}
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONB))
+    # Per-stage timings in ms since the job started, e.g. {"summarize": {"start_ms": 12, "end_ms": 5310, "attempts": 1}}
+    stage_timings: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONB))
+    created_at: datetime = Field(
+        default_factory=datetime.now,
+        nullable=False
+    )
+    updated_at: datetime = Field(
+        default_factory=datetime.now,
+        nullable=False
+    )
+    finished_at: Optional[datetime] = Field(default=None)
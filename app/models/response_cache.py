@@ -0,0 +1,21 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+class ResponseCacheEntry(SQLModel, table=True):
+    __tablename__ = "response_cache"
+    __table_args__ = {
+        'extend_existing': True,
+    }
+
+    # sha256 of (vid_id, intent, normalized query, template hash, model)
+    key: str = Field(primary_key=True)
+    vid_id: str = Field(index=True, nullable=False)
+    intent: str
+    query: str # Normalized query
+    template_hash: str
+    model: str
+    response: str
+    created_at: datetime = Field(
+        default_factory=datetime.now,
+        nullable=False
+    )
@@ -0,0 +1,21 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+
+class SectionSummary(SQLModel, table=True):
+    __tablename__ = "section_summary"
+    __table_args__ = {
+        'extend_existing': True,
+    }
+
+    vid_id: str = Field(primary_key=True)
+    section_index: int = Field(primary_key=True) # Position of the section in the transcript
+    start: Optional[float] = Field(default=None) # seconds
+    end: Optional[float] = Field(default=None) # seconds
+    summary: str
+    template_hash: str # Hash of the map template the summary was written with
+    model: str
+    created_at: datetime = Field(
+        default_factory=datetime.now,
+        nullable=False
+    )
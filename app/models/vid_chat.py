@@ -1,18 +1,46 @@
-from sqlmodel import SQLModel, Field, Column
-from sqlalchemy.dialects.postgresql import JSONB
-from typing import List, Dict, Any, Optional
+from sqlmodel import SQLModel, Field, Column, Index, func
+from sqlalchemy import LargeBinary
+from datetime import datetime
+from typing import Optional
+
+# Keyset pagination of the chatroom listing, newest first by either timestamp
+VID_CHAT_CREATED_INDEX = "ix_vid_chat_created_at_id"
+VID_CHAT_ACTIVITY_INDEX = "ix_vid_chat_last_activity_at_id"
+# Case-insensitive title prefix search (lower(title) LIKE 'prefix%')
+VID_CHAT_TITLE_PREFIX_INDEX = "ix_vid_chat_title_lower_prefix"
 
 # --- SQLModel Definition ---
 class VidChat(SQLModel, table=True):
     __tablename__ = "vid_chat"
+    __table_args__ = (
+        Index(VID_CHAT_CREATED_INDEX, "created_at", "id"),
+        Index(VID_CHAT_ACTIVITY_INDEX, "last_activity_at", "id"),
+        {'extend_existing': True}
+    )
     id: str = Field(primary_key=True)
     title: str
     url: str
     description: str = Field(default="")
     summary: str = Field(default="", nullable=True)
     transcript: str # Plain text transcript
-    # Store list of timestamped segments as JSONB
-    transcript_wts: Optional[List[Dict[str, Any]]] = Field(default=None, sa_column=Column(JSONB))
+    # Timestamped segments, compressed with app.services.segment_codec (see decode_segments)
+    segments_blob: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary))
+    created_at: datetime = Field(
+        default_factory=datetime.now,
+        nullable=False
+    )
+    # Time of the latest message, kept up to date by the MessageWriter
+    last_activity_at: datetime = Field(
+        default_factory=datetime.now,
+        nullable=False
+    )
 
     class Config:
         from_attributes = True
+
+# Expression index, so it is declared once the table exists
+Index(
+    VID_CHAT_TITLE_PREFIX_INDEX,
+    func.lower(VidChat.__table__.c.title).label("title_lower"),
+    postgresql_ops={"title_lower": "text_pattern_ops"}
+)
@@ -1,17 +1,49 @@
 # schemas/chatroom_schemas.py
+from datetime import datetime
 from pydantic import BaseModel, HttpUrl
-from typing import List
-from app.models.vid_chat import VidChat
+from typing import Any, Dict, List, Optional
 from app.models.message import Message
 
 # --- Request Payloads ---
 class ChatroomPayload(BaseModel):
     url: HttpUrl
 
+class PlaylistPayload(BaseModel):
+    url: HttpUrl
+
 class ChatroomQueryPayload(BaseModel):
     query: str
 
 # --- Response ---
-class VidChatWithMessages(BaseModel):
-    vid_chat: VidChat
-    messages: List[Message]
+class VidChatDetail(BaseModel):
+    """A chatroom without its transcript columns, which have their own routes."""
+    id: str
+    title: str
+    url: str
+    description: str
+    summary: Optional[str] = None
+
+class MessagePage(BaseModel):
+    messages: List[Message] # Oldest first
+    next_cursor: Optional[str] = None # Pass as `before` to get the next older page
+
+class ChatroomDetail(MessagePage):
+    vid_chat: VidChatDetail
+
+class TranscriptResponse(BaseModel):
+    vid_id: str
+    transcript: str
+
+class TranscriptSegmentsResponse(BaseModel):
+    vid_id: str
+    segments: List[Dict[str, Any]]
+
+class ChatroomListItem(BaseModel):
+    id: str
+    title: str
+    created_at: datetime
+    last_activity_at: datetime
+
+class ChatroomPage(BaseModel):
+    chatrooms: List[ChatroomListItem]
+    next_cursor: Optional[str] = None # Pass as `before` to get the next page
@@ -0,0 +1,55 @@
+import json
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Column order of the records produced by `build_chunk_records`
+CHUNK_COPY_COLUMNS = ["id", "text", "vid_id", "embedding", "meta"]
+
+ChunkRecord = Tuple[uuid.UUID, str, str, np.ndarray, Optional[str]]
+
+def build_chunk_records(
+    owners: Sequence[Tuple[str, Optional[Dict[str, Any]]]],
+    texts: Sequence[str],
+    embeddings: np.ndarray,
+) -> List[ChunkRecord]:
+    """
+    Builds COPY records for the `chunk` table.
+
+    Args:
+        owners: (vid_id, meta) for each text.
+        texts: The chunk texts.
+        embeddings: 2D array with one embedding row per text.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    return [
+        (
+            uuid.uuid4(),
+            texts[i],
+            owners[i][0],
+            embeddings[i],
+            json.dumps(owners[i][1]) if owners[i][1] is not None else None,
+        ) for i in range(len(texts))
+    ]
+
+async def copy_chunk_records(conn: AsyncConnection, table_name: str, records: Iterable[ChunkRecord]) -> int:
+    """
+    Streams chunk records into `table_name` with binary `COPY ... FROM STDIN`.
+
+    Runs on the connection's current transaction, so it commits or rolls back
+    together with whatever else the caller wrote on `conn`. Vectors go over the
+    wire in pgvector's binary format through the codec registered on connect.
+
+    Returns:
+        Number of rows copied.
+    """
+    raw = await conn.get_raw_connection()
+    driver_connection = raw.driver_connection # asyncpg.Connection
+    status = await driver_connection.copy_records_to_table(
+        table_name,
+        records=records,
+        columns=CHUNK_COPY_COLUMNS,
+    )
+    # asyncpg returns the command tag, e.g. 'COPY 1200'
+    return int(status.split()[-1])
@@ -0,0 +1,95 @@
+import itertools
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy import func, tuple_
+from sqlmodel import Session, select
+from app.models.vid_chat import VidChat
+from app.utils.cache import TTLCache
+from app.utils.http import decode_cursor, encode_cursor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Configuration of the chatroom listing ---
+CHATROOM_PAGE_SIZE = int(os.getenv("CHATROOM_PAGE_SIZE", "50"))
+CHATROOM_PAGE_MAX_SIZE = 200
+CHATROOM_LISTING_CACHE_TTL = float(os.getenv("CHATROOM_LISTING_CACHE_TTL", "5")) # seconds
+CHATROOM_LISTING_CACHE_SIZE = int(os.getenv("CHATROOM_LISTING_CACHE_SIZE", "512"))
+
+# Sort key -> timestamp column; every order is newest first with id as tie-breaker
+SORT_COLUMNS = {
+    "created": VidChat.created_at,
+    "last_activity": VidChat.last_activity_at,
+}
+
+_cache = TTLCache(maxsize=CHATROOM_LISTING_CACHE_SIZE, ttl=CHATROOM_LISTING_CACHE_TTL)
+# Part of every cache key: pages computed before an invalidation can't be served after it
+_generation = itertools.count()
+_current_generation = next(_generation)
+
+def invalidate_chatroom_listing() -> None:
+    """Drops cached listing pages; call after chatrooms are created or deleted."""
+    global _current_generation
+    _current_generation = next(_generation)
+    _cache.clear()
+
+def _escape_like(prefix: str) -> str:
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def list_chatrooms(
+    session: Session,
+    sort: str = "last_activity",
+    before: Optional[str] = None,
+    limit: int = CHATROOM_PAGE_SIZE,
+    title_prefix: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    One page of chatrooms, newest first by creation or last activity.
+
+    Pages are keyset-paginated on (timestamp, id), which the
+    ix_vid_chat_created_at_id / ix_vid_chat_last_activity_at_id indexes serve,
+    and cached for CHATROOM_LISTING_CACHE_TTL seconds. Last-activity order can
+    therefore lag new messages by up to the TTL.
+
+    Args:
+        session: The database session.
+        sort: "created" or "last_activity".
+        before: The `next_cursor` of the previous page.
+        limit: Maximum number of chatrooms in the page.
+        title_prefix: Only chatrooms whose title starts with this (case-insensitive).
+
+    Returns:
+        {"chatrooms": [...], "next_cursor": str | None}
+
+    Raises:
+        ValueError: If `sort` or `before` is invalid.
+    """
+    column = SORT_COLUMNS.get(sort)
+    if column is None:
+        raise ValueError(f"Unknown sort order '{sort}'. Expected one of {sorted(SORT_COLUMNS)}.")
+    title_prefix = title_prefix.strip().lower() if title_prefix else None
+    key = (_current_generation, sort, before, limit, title_prefix)
+    page = _cache.get(key)
+    if page is not None:
+        return page
+
+    stmt = select(VidChat.id, VidChat.title, VidChat.created_at, VidChat.last_activity_at)
+    if title_prefix:
+        stmt = stmt.where(func.lower(VidChat.title).like(f"{_escape_like(title_prefix)}%", escape="\\"))
+    if before:
+        at, vid_id = decode_cursor(before)
+        stmt = stmt.where(tuple_(column, VidChat.id) < tuple_(at, vid_id))
+    rows = session.exec(stmt.order_by(column.desc(), VidChat.id.desc()).limit(limit + 1)).mappings().all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    last_at: Optional[datetime] = rows[-1][column.key] if rows else None
+    page = {
+        "chatrooms": [dict(row) for row in rows],
+        "next_cursor": encode_cursor(last_at, rows[-1]["id"]) if has_more else None,
+    }
+    _cache.set(key, page)
+    return page
+
+def listing_cache_stats() -> Dict[str, Any]:
+    return {"hits": _cache.hits, "misses": _cache.misses, "entries": len(_cache)}
@@ -0,0 +1,91 @@
+import math
+from typing import Any, Dict, List, Optional
+from app.services.transcript import CHUNK_OVERLAP
+
+# Rough token estimate for Gemini-style tokenizers on English transcripts
+CHARS_PER_TOKEN = 4
+# Shorter suffix/prefix matches between neighbours are treated as coincidence, not chunker overlap
+MIN_OVERLAP_CHARS = 8
+
+class ContextSpan:
+    """A contiguous piece of transcript built from one or more adjacent chunks."""
+    def __init__(self, first_index: Optional[int], last_index: Optional[int], text: str):
+        self.first_index = first_index
+        self.last_index = last_index
+        self.text = text
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def _chunk_index(result: Dict[str, Any]) -> Optional[int]:
+    meta = result.get("meta") or {}
+    index = meta.get("chunk_index")
+    return int(index) if index is not None else None
+
+def _overlap(left: str, right: str, max_chars: int) -> int:
+    """Length of the longest suffix of `left` that is also a prefix of `right`, capped at `max_chars`."""
+    for size in range(min(len(left), len(right), max_chars), MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+def merge_spans(results: List[Dict[str, Any]], max_overlap: int = 2 * CHUNK_OVERLAP) -> List[ContextSpan]:
+    """
+    Orders chunks by their position in the transcript and joins runs of
+    consecutive chunks into single spans, dropping the text they share.
+
+    Chunks without a 'chunk_index' in their meta (stored before it was
+    recorded) are kept as standalone spans after the ordered ones.
+    Exact duplicate texts are dropped.
+    """
+    seen_texts = set()
+    indexed, unindexed = {}, []
+    for r in results:
+        text = str(r["text"]).strip()
+        if not text or text in seen_texts:
+            continue
+        seen_texts.add(text)
+        index = _chunk_index(r)
+        if index is None:
+            unindexed.append(ContextSpan(None, None, text))
+        else:
+            indexed.setdefault(index, text)
+
+    spans: List[ContextSpan] = []
+    for index in sorted(indexed):
+        text = indexed[index]
+        if spans and spans[-1].last_index == index - 1:
+            span = spans[-1]
+            shared = _overlap(span.text, text, max_overlap)
+            span.text += text[shared:] if shared else " " + text
+            span.last_index = index
+        else:
+            spans.append(ContextSpan(index, index, text))
+    return spans + unindexed
+
+def pack_context(results: List[Dict[str, Any]], token_budget: int, max_overlap: int = 2 * CHUNK_OVERLAP) -> List[str]:
+    """
+    Assembles retrieved chunks into prompt context within a token budget.
+
+    Chunks are admitted in relevance order until the merged, de-duplicated
+    context would exceed `token_budget`; the admitted ones are then returned as
+    contiguous spans in transcript order. The most relevant chunk is always
+    kept, even if it alone exceeds the budget.
+
+    Args:
+        results: Retrieval results, most relevant first, with 'text' and optionally 'meta'.
+        token_budget: Maximum estimated tokens of the returned context.
+        max_overlap: Longest overlap (in characters) looked for between neighbouring chunks.
+
+    Returns:
+        The span texts, in transcript order.
+    """
+    admitted: List[Dict[str, Any]] = []
+    spans: List[ContextSpan] = []
+    for r in results:
+        candidate = merge_spans(admitted + [r], max_overlap)
+        if admitted and sum(estimate_tokens(s.text) for s in candidate) > token_budget:
+            break
+        admitted.append(r)
+        spans = candidate
+    return [s.text for s in spans]
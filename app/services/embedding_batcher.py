@@ -0,0 +1,107 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.services.embedding_cache import CachedEmbedding
+from app.utils.metrics import Histogram
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Configuration of the query embedding dispatcher ---
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))
+EMBED_MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH_SIZE", "32"))
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+QUEUE_WAIT_BUCKETS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 250]
+
+class EmbeddingBatcher:
+    """
+    Collects concurrent query-embedding requests and runs them through the
+    model as one batched forward pass.
+
+    A batch is dispatched once `max_batch_size` requests are waiting or
+    `window_ms` has passed since the first one arrived, whichever comes first.
+    Forward passes run one at a time on a dedicated thread, off the event loop.
+    """
+    def __init__(
+        self,
+        model: CachedEmbedding,
+        window_ms: float = EMBED_BATCH_WINDOW_MS,
+        max_batch_size: int = EMBED_MAX_BATCH_SIZE,
+    ):
+        self.model = model
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_BUCKETS_MS)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-batcher")
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Returns the embedding of a single query, batched with concurrent callers."""
+        cached = self.model.cached_query(text)
+        if cached is not None:
+            return cached
+        if self._task is None:
+            # Not started (e.g. scripts): embed directly without batching
+            embeddings = await asyncio.get_running_loop().run_in_executor(self._executor, self.model.embed_queries, [text], True)
+            return embeddings[0]
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future, time.perf_counter()))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[str, asyncio.Future, float]] = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            dispatched_at = time.perf_counter()
+            self.batch_sizes.observe(len(batch))
+            for _, _, enqueued_at in batch:
+                self.queue_wait_ms.observe((dispatched_at - enqueued_at) * 1000)
+
+            texts = [text for text, _, _ in batch]
+            try:
+                # The texts already missed in `embed`, so the batch must not count them again
+                embeddings = await loop.run_in_executor(self._executor, self.model.embed_queries, texts, True)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for i, (_, future, _) in enumerate(batch):
+                # The caller may have been cancelled while waiting
+                if not future.done():
+                    future.set_result(embeddings[i])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+        }
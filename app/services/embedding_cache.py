@@ -0,0 +1,276 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel, Field, Column, Session, text
+from pgvector.sqlalchemy import Vector
+from app.services.embeddings import EmbeddingBackend
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Configuration of the embedding cache ---
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CHUNK_STORE_MAX_BYTES = int(os.getenv("CHUNK_EMBEDDING_STORE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+CHUNK_STORE_INSERT_BATCH = 1000
+CHUNK_STORE_PRUNE_EVERY = int(os.getenv("CHUNK_EMBEDDING_STORE_PRUNE_EVERY", "5000")) # inserted rows between prunes
+
+# --- SQLModel Definition ---
+class EmbeddingCacheEntry(SQLModel, table=True):
+    __tablename__ = "embedding_cache"
+    __table_args__ = {
+        'extend_existing': True,
+    }
+    key: str = Field(primary_key=True) # sha256 of (model name, backend variant, text)
+    model_name: str
+    # No fixed dimension so entries of different models can share the table
+    embedding: List[float] = Field(sa_column=Column(Vector(), nullable=False))
+    last_used_at: datetime = Field(default_factory=datetime.now, nullable=False, index=True)
+
+def embedding_key(model_name: str, variant: str, text: str) -> str:
+    """
+    Cache key of a text's embedding. `variant` names the backend and precision
+    (e.g. "onnx-int8"), so vectors of different backends for the same model are
+    never served in place of each other.
+    """
+    return hashlib.sha256(f"{model_name}\x00{variant}\x00{text}".encode("utf-8")).hexdigest()
+
+class QueryEmbeddingLRU:
+    """
+    In-memory LRU of query embeddings, bounded by the bytes the vectors occupy.
+
+    Cached vectors are read-only copies, so callers cannot alter what later
+    lookups return.
+    """
+    def __init__(self, max_bytes: int = QUERY_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: str) -> Optional[np.ndarray]:
+        """Like `get`, but neither counted in the hit rate nor refreshing the entry."""
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key: str, value: np.ndarray) -> np.ndarray:
+        """Stores a read-only copy of `value` and returns it."""
+        value = np.array(value, dtype=np.float32)
+        value.setflags(write=False)
+        size = value.nbytes + len(key)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old.nbytes + len(key)
+            self._data[key] = value
+            self.bytes += size
+            while self.bytes > self.max_bytes and self._data:
+                old_key, old_value = self._data.popitem(last=False)
+                self.bytes -= old_value.nbytes + len(old_key)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+class ChunkEmbeddingStore:
+    """
+    Persistent chunk-embedding store in the `embedding_cache` table.
+
+    Reads refresh `last_used_at`; once the table outgrows `max_bytes` worth of
+    vectors the least recently used rows are deleted.
+    """
+    def __init__(self, engine: Engine, dimension: int, max_bytes: int = CHUNK_STORE_MAX_BYTES):
+        self.engine = engine
+        self.max_rows = max(1, max_bytes // (dimension * 4))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._inserted_since_prune = 0
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        if not keys:
+            return {}
+        table = EmbeddingCacheEntry.__table__
+        stmt = (
+            update(table)
+            .where(table.c.key.in_(keys))
+            .values(last_used_at=func.now())
+            .returning(table.c.key, table.c.embedding)
+        )
+        with Session(self.engine) as session:
+            rows = session.execute(stmt).all()
+            session.commit()
+        found = {row.key: np.asarray(row.embedding, dtype=np.float32) for row in rows}
+        self.hits += len(found)
+        self.misses += len(set(keys)) - len(found)
+        return found
+
+    def put_many(self, model_name: str, entries: Dict[str, np.ndarray]) -> None:
+        if not entries:
+            return
+        table = EmbeddingCacheEntry.__table__
+        rows = [
+            {"key": k, "model_name": model_name, "embedding": v, "last_used_at": datetime.now()}
+            for k, v in entries.items()
+        ]
+        with Session(self.engine) as session:
+            # Multi-row INSERTs, batched to stay well under the bind parameter limit
+            for start in range(0, len(rows), CHUNK_STORE_INSERT_BATCH):
+                stmt = insert(table).values(rows[start:start + CHUNK_STORE_INSERT_BATCH])
+                session.execute(stmt.on_conflict_do_nothing(index_elements=["key"]))
+            session.commit()
+        with self._lock:
+            self._inserted_since_prune += len(entries)
+            prune = self._inserted_since_prune >= CHUNK_STORE_PRUNE_EVERY
+            if prune:
+                self._inserted_since_prune = 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """Deletes the least recently used rows beyond `max_rows`. Returns the number deleted."""
+        stmt = text(f"""
+            DELETE FROM {EmbeddingCacheEntry.__tablename__}
+            WHERE key IN (
+                SELECT key FROM {EmbeddingCacheEntry.__tablename__}
+                ORDER BY last_used_at DESC
+                OFFSET :max_rows
+            )
+        """)
+        with Session(self.engine) as session:
+            deleted = session.exec(statement=stmt, params={"max_rows": self.max_rows}).rowcount
+            session.commit()
+        self.evictions += deleted
+        if deleted:
+            print(f"Embedding cache: evicted {deleted} chunk embedding(s).")
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "max_rows": self.max_rows,
+        }
+
+class CachedEmbedding(EmbeddingBackend):
+    """
+    Wraps an embedding backend with two cache tiers:
+
+    - single strings (queries) go through an in-memory LRU;
+    - lists of strings (chunks) go through the persistent store in Postgres.
+
+    Only the texts missing from the cache reach the model.
+    """
+    def __init__(self, backend: EmbeddingBackend, engine: Engine):
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.name = f"cached-{backend.name}"
+        self.precision = backend.precision
+        self.variant = f"{backend.name}-{backend.precision}"
+        self.query_cache = QueryEmbeddingLRU()
+        self.chunk_store = ChunkEmbeddingStore(engine, backend.get_embedding_dimension())
+
+    def create_embeddings(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
+        if isinstance(texts, str):
+            key = embedding_key(self.model_name, self.variant, texts)
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                return cached
+            return self.query_cache.set(key, self.backend.create_embeddings(texts, batch_size=batch_size))
+
+        texts = list(texts)
+        if not texts:
+            return self.backend.create_embeddings(texts, batch_size=batch_size)
+        keys = [embedding_key(self.model_name, self.variant, t) for t in texts]
+        try:
+            found = self.chunk_store.get_many(keys)
+        except Exception as e:
+            print(f"Embedding cache lookup failed, embedding all chunks: {e}")
+            found = {}
+
+        missing: Dict[str, str] = {}
+        for k, t in zip(keys, texts):
+            if k not in found and k not in missing:
+                missing[k] = t
+        if missing:
+            computed = self.backend.create_embeddings(list(missing.values()), batch_size=batch_size)
+            new_entries = {k: np.asarray(computed[i], dtype=np.float32) for i, k in enumerate(missing)}
+            found.update(new_entries)
+            try:
+                self.chunk_store.put_many(self.model_name, new_entries)
+            except Exception as e:
+                print(f"Failed to store chunk embeddings in cache: {e}")
+        return np.stack([found[k] for k in keys])
+
+    def cached_query(self, text: str) -> Optional[np.ndarray]:
+        """Returns the query embedding if it is in the in-memory tier, without touching the model."""
+        return self.query_cache.get(embedding_key(self.model_name, self.variant, text))
+
+    def embed_queries(self, texts: List[str], looked_up: bool = False) -> np.ndarray:
+        """
+        Embeds several queries through the query tier, running all misses in a single
+        forward pass. Returns a 2D array in the order of `texts`.
+
+        Args:
+            texts: The queries.
+            looked_up: The texts already missed in `cached_query`. The tier is then only
+                re-checked with `peek`, so each miss is counted once.
+        """
+        lookup = self.query_cache.peek if looked_up else self.query_cache.get
+        keys = [embedding_key(self.model_name, self.variant, t) for t in texts]
+        found: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+        for k, t in zip(keys, texts):
+            cached = lookup(k)
+            if cached is not None:
+                found[k] = cached
+            elif k not in missing:
+                missing[k] = t
+        if missing:
+            computed = self.backend.create_embeddings(list(missing.values()), batch_size=len(missing))
+            for i, k in enumerate(missing):
+                found[k] = self.query_cache.set(k, computed[i])
+        return np.stack([found[k] for k in keys])
+
+    def get_embedding_dimension(self) -> int:
+        return self.backend.get_embedding_dimension()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "query": self.query_cache.stats(),
+            "chunk": self.chunk_store.stats(),
+        }
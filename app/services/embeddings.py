@@ -1,12 +1,68 @@
+import os
+import platform
+from abc import ABC, abstractmethod
+from pathlib import Path
 import numpy as np
 from sentence_transformers import SentenceTransformer
-from typing import List, Union
+from typing import List, Optional, Sequence, Union
+from dotenv import load_dotenv
 
-class SentenceTransformerEmbedding():
+load_dotenv()
+
+# --- Configuration of the embedding backend ---
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "auto") # auto | torch | onnx
+EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE") # Overrides device auto-detection for the torch backend
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0")) # 0 lets ONNX Runtime decide
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", ".cache/onnx")
+ONNX_MAX_SEQ_LENGTH = int(os.getenv("ONNX_MAX_SEQ_LENGTH", "384")) # Matches all-mpnet-base-v2's max_seq_length
+# When set, the ONNX backend is compared against the torch one at startup and
+# rejected if any sample's cosine similarity falls below 1 - tolerance.
+EMBEDDING_VERIFY_PARITY = os.getenv("EMBEDDING_VERIFY_PARITY", "false").lower() == "true"
+EMBEDDING_PARITY_TOLERANCE = float(os.getenv("EMBEDDING_PARITY_TOLERANCE", "0.01"))
+
+PARITY_SAMPLE_TEXTS = [
+    "What is the main point of the video?",
+    "The derivative of x squared is two x, which we get from the power rule.",
+    "In this lecture we cover TCP congestion control, slow start and AIMD.",
+    "Photosynthesis converts light energy into chemical energy stored in glucose.",
+]
+
+def detect_device() -> str:
+    """Returns the best available torch device: 'cuda', then 'mps', then 'cpu'."""
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return "cuda"
+        if getattr(torch.backends, "mps", None) and torch.backends.mps.is_available():
+            return "mps"
+    except ImportError:
+        pass
+    return "cpu"
+
+class EmbeddingBackend(ABC):
+    """
+    Interface shared by the embedding backends. Every backend returns
+    L2-normalized float32 embeddings so results are interchangeable.
+    """
+    model_name: str
+    name: str
+    precision: str = "fp32" # Weight precision; embeddings of different precisions differ slightly
+
+    @abstractmethod
+    def create_embeddings(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def get_embedding_dimension(self) -> int:
+        ...
+
+class SentenceTransformerEmbedding(EmbeddingBackend):
     """
     A class for generating sentence embeddings using the sentence-transformers library.
     """
-    def __init__(self, model_name: str):
+    name = "torch"
+
+    def __init__(self, model_name: str, device: Optional[str] = None):
         """
         Initializes the embedding model.
 
@@ -14,17 +70,21 @@ class SentenceTransformerEmbedding():
             model_name (str): The name of the pre-trained sentence-transformer model to use
                               (e.g., 'all-MiniLM-L6-v2', 'paraphrase-MiniLM-L6-v2').
                               See https://www.sbert.net/docs/pretrained_models.html
+            device (Optional[str]): Torch device to run on. Auto-detected when not given.
         """
+        self.model_name = model_name
+        self.device = device or EMBEDDING_DEVICE or detect_device()
         # Load the specified Sentence Transformer model
         # This might download the model if it's not cached locally.
-        self.model = SentenceTransformer(model_name, device='cuda')
+        self.model = SentenceTransformer(model_name, device=self.device)
 
-    def create_embeddings(self, texts: Union[str, List[str]]) -> np.ndarray:
+    def create_embeddings(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
         """
         Generates embeddings for the given text(s).
 
         Args:
             texts (Union[str, List[str]]): A single string or a list of strings to embed.
+            batch_size (int): Number of texts run through the model per forward pass.
 
         Returns:
             np.ndarray: A numpy array containing the embedding(s).
@@ -32,7 +92,7 @@ class SentenceTransformerEmbedding():
                         If input is a list of strings, returns a 2D array where each row
                         is an embedding for the corresponding input string.
         """
-        embeddings = self.model.encode(texts, batch_size=32, normalize_embeddings=True)
+        embeddings = self.model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
         return embeddings
 
     def get_embedding_dimension(self) -> int:
@@ -43,4 +103,162 @@ class SentenceTransformerEmbedding():
             int: The dimensionality of the embedding vectors.
         """
         # Retrieve the embedding dimension from the model
-        return self.model.get_sentence_embedding_dimension()
\ No newline at end of file
+        return self.model.get_sentence_embedding_dimension()
+
+class OnnxEmbedding(EmbeddingBackend):
+    """
+    CPU embedding backend running an int8 dynamically-quantized ONNX export of
+    the model through ONNX Runtime, with mean pooling and normalization done in NumPy.
+    """
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = True,
+        intra_op_threads: int = ONNX_INTRA_OP_THREADS,
+        model_dir: str = ONNX_MODEL_DIR,
+        max_seq_length: int = ONNX_MAX_SEQ_LENGTH,
+    ):
+        """
+        Exports (once, cached under `model_dir`) and loads the ONNX model.
+
+        Args:
+            model_name (str): Hugging Face model id, same as for SentenceTransformerEmbedding.
+            quantize (bool): Use the int8 dynamically-quantized model instead of fp32.
+            intra_op_threads (int): ONNX Runtime intra-op thread count; 0 lets ONNX Runtime decide.
+            model_dir (str): Directory the exported models are cached in.
+            max_seq_length (int): Inputs are truncated to this many tokens.
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.quantize = quantize
+        self.precision = "int8" if quantize else "fp32"
+        self.max_seq_length = max_seq_length
+        model_path = self._export(model_name, Path(model_dir), quantize)
+
+        options = ort.SessionOptions()
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(str(model_path), sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self._dimension = int(self.create_embeddings(["dimension probe"]).shape[1])
+
+    @staticmethod
+    def _export(model_name: str, model_dir: Path, quantize: bool) -> Path:
+        """Exports the model to ONNX (and quantizes it) unless already cached. Returns the .onnx path."""
+        base_dir = model_dir / model_name.replace("/", "__")
+        fp32_path = base_dir / "model.onnx"
+        int8_dir = base_dir / "int8"
+        int8_path = int8_dir / "model_quantized.onnx"
+        if not fp32_path.exists():
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            print(f"Exporting '{model_name}' to ONNX at {base_dir}...")
+            ORTModelForFeatureExtraction.from_pretrained(model_name, export=True).save_pretrained(base_dir)
+        if not quantize:
+            return fp32_path
+        if not int8_path.exists():
+            from optimum.onnxruntime import ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+            print(f"Quantizing '{model_name}' to int8 at {int8_dir}...")
+            if platform.machine().lower() in ("arm64", "aarch64"):
+                qconfig = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+            else:
+                qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+            ORTQuantizer.from_pretrained(base_dir, file_name="model.onnx").quantize(
+                save_dir=int8_dir, quantization_config=qconfig
+            )
+        return int8_path
+
+    def create_embeddings(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
+        """
+        Generates embeddings for the given text(s). Same contract as
+        `SentenceTransformerEmbedding.create_embeddings`.
+        """
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        if not batch:
+            return np.zeros((0, getattr(self, "_dimension", 0)), dtype=np.float32)
+
+        # Sorting by length keeps padding small within each batch
+        order = np.argsort([-len(t) for t in batch], kind="stable")
+        out = [None] * len(batch)
+        for start in range(0, len(batch), batch_size):
+            idx = order[start:start + batch_size]
+            encoded = self.tokenizer(
+                [batch[i] for i in idx],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feeds = {k: v.astype(np.int64) for k, v in encoded.items() if k in self.input_names}
+            hidden = self.session.run(None, feeds)[0] # (batch, seq, dim) last_hidden_state
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            for row, i in enumerate(idx):
+                out[i] = pooled[row]
+        embeddings = np.stack(out).astype(np.float32)
+        return embeddings[0] if single else embeddings
+
+    def get_embedding_dimension(self) -> int:
+        return self._dimension
+
+def embedding_parity(reference: EmbeddingBackend, candidate: EmbeddingBackend, texts: Sequence[str] = PARITY_SAMPLE_TEXTS) -> float:
+    """
+    Returns the smallest cosine similarity between the two backends' embeddings
+    of `texts`; 1.0 means identical output.
+    """
+    ref = reference.create_embeddings(list(texts))
+    cand = candidate.create_embeddings(list(texts))
+    return float(np.min(np.sum(ref * cand, axis=1)))
+
+def _onnx_available() -> bool:
+    try:
+        import onnxruntime # noqa: F401
+        import optimum.onnxruntime # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def create_embedding_backend(model_name: str, backend: str = EMBEDDING_BACKEND) -> EmbeddingBackend:
+    """
+    Builds the configured embedding backend.
+
+    Args:
+        model_name (str): The model to load.
+        backend (str): 'torch', 'onnx', or 'auto' - torch on a GPU when one is
+                       available, otherwise the quantized ONNX path if ONNX Runtime
+                       is installed, otherwise torch on CPU.
+
+    Returns:
+        EmbeddingBackend: The loaded backend.
+    """
+    if backend == "auto":
+        device = EMBEDDING_DEVICE or detect_device()
+        backend = "torch" if device != "cpu" or not _onnx_available() else "onnx"
+    if backend == "torch":
+        model = SentenceTransformerEmbedding(model_name)
+        print(f"Embeddings: using torch backend on '{model.device}'.")
+        return model
+    if backend != "onnx":
+        raise ValueError(f"Unknown embedding backend '{backend}'. Expected 'auto', 'torch' or 'onnx'.")
+
+    model = OnnxEmbedding(model_name)
+    print(f"Embeddings: using ONNX Runtime backend (int8={model.quantize}).")
+    if EMBEDDING_VERIFY_PARITY:
+        reference = SentenceTransformerEmbedding(model_name, device="cpu")
+        similarity = embedding_parity(reference, model)
+        if similarity < 1.0 - EMBEDDING_PARITY_TOLERANCE:
+            print(
+                f"Embeddings: ONNX parity check failed (min cosine {similarity:.4f} < "
+                f"{1.0 - EMBEDDING_PARITY_TOLERANCE:.4f}). Falling back to torch."
+            )
+            return reference
+        print(f"Embeddings: ONNX parity check passed (min cosine {similarity:.4f}).")
+    return model
@@ -0,0 +1,497 @@
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlmodel import Session, select
+from app.db.session import engine
+from app.models.ingest_job import IngestJob, JobKind, JobStatus, ACTIVE_JOB_STATUSES
+from app.models.vid_chat import VidChat
+from app.services.chatroom_listing import invalidate_chatroom_listing
+from app.services.job_queue import JobQueue
+from app.services.responder import generate_summary
+from app.services.segment_codec import encode_segments
+from app.services.transcript import (
+    CHUNK_OVERLAP, CHUNK_SIZE, chunk_segments, get_video_content, get_video_id, load_playlist, Transcript
+)
+from app.services.vector_store import VectorStore
+from app.services.video_metadata import fetch_video_metadata
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Configuration of the ingestion workers ---
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+STAGE_MAX_ATTEMPTS = int(os.getenv("INGEST_STAGE_MAX_ATTEMPTS", "3"))
+STAGE_RETRY_BACKOFF = float(os.getenv("INGEST_STAGE_RETRY_BACKOFF", "2.0")) # seconds, doubled per retry
+PLAYLIST_FETCH_CONCURRENCY = int(os.getenv("PLAYLIST_FETCH_CONCURRENCY", "12"))
+PLAYLIST_SUMMARY_CONCURRENCY = int(os.getenv("PLAYLIST_SUMMARY_CONCURRENCY", "4"))
+
+class IngestContext:
+    """State shared by the stages of one ingestion job."""
+    def __init__(self, job_id: uuid.UUID, url: str):
+        self.job_id = job_id
+        self.url = url
+        self.vid_id: Optional[str] = None
+        self.transcript: Optional[Transcript] = None
+        self.title: str = ""
+        self.description: str = ""
+        self.summary: Optional[str] = None
+        self.already_exists: bool = False
+        # Chunk embeddings per vid_id, computed ahead of the store stage
+        self.embeddings: Dict[str, np.ndarray] = {}
+        # Playlist jobs only
+        self.transcripts: List[Transcript] = []
+        self.descriptions: Dict[str, str] = {}
+        self.summaries: Dict[str, Optional[str]] = {}
+        self.skipped: List[str] = []
+        self.failed: Dict[str, str] = {}
+
+StageFn = Callable[[IngestContext, VectorStore], Awaitable[None]]
+
+class Stage:
+    """An ingestion stage; it starts as soon as every stage named in `after` has finished."""
+    def __init__(self, name: str, fn: StageFn, after: Sequence[str] = ()):
+        self.name = name
+        self.fn = fn
+        self.after = tuple(after)
+
+class StageFailed(Exception):
+    """Raised when a stage still fails after STAGE_MAX_ATTEMPTS attempts."""
+    def __init__(self, name: str, error: Exception):
+        super().__init__(f"Stage '{name}' failed: {error}")
+        self.name = name
+
+def critical_path(stages: List[Stage], timings: Dict[str, Dict[str, Any]]) -> List[str]:
+    """
+    Returns the chain of stages that decided the job's duration: the last stage
+    to finish, preceded by the dependency it waited on longest, and so on.
+    """
+    after = {stage.name: stage.after for stage in stages}
+    ended = {name: t["end_ms"] for name, t in timings.items() if t.get("end_ms") is not None}
+    if not ended:
+        return []
+    name = max(ended, key=ended.get)
+    path = [name]
+    while after[name]:
+        name = max(after[name], key=lambda dep: ended.get(dep, 0.0))
+        path.append(name)
+    return path[::-1]
+
+def _check_graph(stages: List[Stage]) -> None:
+    # Dependencies must be listed before their dependents, which also rules out cycles
+    seen = set()
+    for stage in stages:
+        missing = [name for name in stage.after if name not in seen]
+        assert not missing, f"Stage '{stage.name}' depends on unknown or later stages {missing}"
+        seen.add(stage.name)
+
+# --- Video Stages ---
+# Every stage must be safe to re-run: a stage is retried on failure, and a job
+# interrupted by a restart starts again from its first stage.
+#
+#   resolve -+-> fetch_metadata ------------------------------+-> store
+#            +-> fetch_transcript -+-> summarize -------------+
+#                                  +-> chunk -> embed ---------+
+
+async def _stage_resolve(ctx: IngestContext, vector_store: VectorStore):
+    ctx.vid_id = get_video_id(ctx.url)
+    await asyncio.to_thread(_update_job, ctx.job_id, vid_id=ctx.vid_id)
+    ctx.already_exists = await asyncio.to_thread(_chatroom_exists, ctx.vid_id)
+
+async def _stage_fetch_metadata(ctx: IngestContext, vector_store: VectorStore):
+    if ctx.already_exists:
+        return
+    try:
+        # Title and description come from the same watch page
+        metadata = await fetch_video_metadata(ctx.vid_id)
+        ctx.title, ctx.description = metadata.title, metadata.description
+    except Exception as e:
+        print(f"Error fetching metadata for {ctx.url}: {e}")
+        ctx.title, ctx.description = "", ""
+
+async def _stage_fetch_transcript(ctx: IngestContext, vector_store: VectorStore):
+    if ctx.already_exists:
+        return
+    segments = await asyncio.to_thread(get_video_content, ctx.vid_id)
+    content = ' '.join(seg['text'] for seg in segments)
+    # Chunks are filled in by the chunk stage; the title is stored from ctx.title
+    ctx.transcript = Transcript(ctx.url, ctx.vid_id, "", content, [], segments)
+
+async def _stage_chunk(ctx: IngestContext, vector_store: VectorStore):
+    if ctx.already_exists:
+        return
+    transcript = ctx.transcript
+    transcript.chunks, transcript.chunk_meta = await asyncio.to_thread(
+        chunk_segments, transcript.segments, CHUNK_SIZE, CHUNK_OVERLAP
+    )
+
+async def _stage_embed(ctx: IngestContext, vector_store: VectorStore):
+    if ctx.already_exists or not ctx.transcript.chunks:
+        return
+    ctx.embeddings[ctx.vid_id] = await vector_store.aembed_chunks(ctx.transcript.chunks)
+
+async def _stage_summarize(ctx: IngestContext, vector_store: VectorStore):
+    if ctx.already_exists:
+        return
+    ctx.summary = await generate_summary(ctx.transcript.content, ctx.vid_id, ctx.transcript.segments)
+
+async def _stage_store(ctx: IngestContext, vector_store: VectorStore):
+    transcript = ctx.transcript
+    vid_id = ctx.vid_id
+    if ctx.already_exists or await asyncio.to_thread(_chatroom_exists, vid_id):
+        print(f"Chatroom for {vid_id} already exists. Skipping store.")
+        return
+    new_vid_chat = VidChat(
+        id=vid_id,
+        title=ctx.title,
+        url=ctx.url,
+        description=ctx.description,
+        summary=ctx.summary,
+        transcript=transcript.content,
+        segments_blob=encode_segments(transcript.segments)
+    )
+    embeddings = [ctx.embeddings[vid_id]] if vid_id in ctx.embeddings else None
+    # The VidChat row and its chunks are written in one transaction
+    await vector_store.ainsert_chunk_groups(
+        [(vid_id, transcript.chunks, transcript.chunk_meta)], [new_vid_chat], embeddings=embeddings
+    )
+    invalidate_chatroom_listing()
+    print(f"Successfully created chatroom for {vid_id}")
+
+VIDEO_STAGES: List[Stage] = [
+    Stage("resolve", _stage_resolve),
+    Stage("fetch_metadata", _stage_fetch_metadata, after=["resolve"]),
+    Stage("fetch_transcript", _stage_fetch_transcript, after=["resolve"]),
+    Stage("chunk", _stage_chunk, after=["fetch_transcript"]),
+    Stage("embed", _stage_embed, after=["chunk"]),
+    Stage("summarize", _stage_summarize, after=["fetch_transcript"]),
+    Stage("store", _stage_store, after=["fetch_metadata", "embed", "summarize"]),
+]
+
+# --- Playlist Stages ---
+#
+#   fetch_transcripts -+-> fetch_descriptions -+-> store
+#                      +-> summarize ----------+
+#                      +-> embed --------------+
+
+async def _stage_fetch_playlist(ctx: IngestContext, vector_store: VectorStore):
+    transcripts, ctx.failed = await asyncio.to_thread(load_playlist, ctx.url, PLAYLIST_FETCH_CONCURRENCY)
+    existing = await asyncio.to_thread(_existing_chatrooms, [t.vid_id for t in transcripts])
+    ctx.skipped = sorted(existing)
+    # Playlists may list a video twice; keep the first occurrence only
+    unique: Dict[str, Transcript] = {}
+    for t in transcripts:
+        if t.vid_id not in existing and t.vid_id not in unique:
+            unique[t.vid_id] = t
+    ctx.transcripts = list(unique.values())
+    print(f"Playlist {ctx.url}: {len(ctx.transcripts)} new, {len(ctx.skipped)} existing, {len(ctx.failed)} failed.")
+
+async def _stage_fetch_playlist_descriptions(ctx: IngestContext, vector_store: VectorStore):
+    async def fetch(t: Transcript):
+        try:
+            ctx.descriptions[t.vid_id] = (await fetch_video_metadata(t.vid_id)).description
+        except Exception as e:
+            print(f"Error fetching description for {t.url}: {e}")
+            ctx.descriptions[t.vid_id] = ""
+    await asyncio.gather(*(fetch(t) for t in ctx.transcripts if t.vid_id not in ctx.descriptions))
+
+async def _stage_summarize_playlist(ctx: IngestContext, vector_store: VectorStore):
+    semaphore = asyncio.Semaphore(PLAYLIST_SUMMARY_CONCURRENCY)
+    async def summarize(t: Transcript):
+        async with semaphore:
+            ctx.summaries[t.vid_id] = await generate_summary(t.content, t.vid_id, t.segments)
+    # Summaries from an earlier attempt are kept, only the missing ones are retried
+    await asyncio.gather(*(summarize(t) for t in ctx.transcripts if ctx.summaries.get(t.vid_id) is None))
+
+async def _stage_embed_playlist(ctx: IngestContext, vector_store: VectorStore):
+    transcripts = [t for t in ctx.transcripts if t.vid_id not in ctx.embeddings and t.chunks]
+    if not transcripts:
+        return
+    # One pass over the chunks of all videos keeps the embedding batches large
+    texts = [text for t in transcripts for text in t.chunks]
+    print(f"Generating embeddings for {len(texts)} chunks across {len(transcripts)} videos...")
+    embeddings = await vector_store.aembed_chunks(texts)
+    offset = 0
+    for t in transcripts:
+        ctx.embeddings[t.vid_id] = embeddings[offset:offset + len(t.chunks)]
+        offset += len(t.chunks)
+
+async def _stage_store_playlist(ctx: IngestContext, vector_store: VectorStore):
+    """Writes every new VidChat and all of their chunks in a single transaction."""
+    existing = await asyncio.to_thread(_existing_chatrooms, [t.vid_id for t in ctx.transcripts])
+    transcripts = [t for t in ctx.transcripts if t.vid_id not in existing]
+    rows = [
+        VidChat(
+            id=t.vid_id,
+            title=t.vid_title,
+            url=t.url,
+            description=ctx.descriptions.get(t.vid_id, ""),
+            summary=ctx.summaries.get(t.vid_id),
+            transcript=t.content,
+            segments_blob=encode_segments(t.segments)
+        ) for t in transcripts
+    ]
+    groups = [(t.vid_id, t.chunks, t.chunk_meta) for t in transcripts]
+    embeddings = [ctx.embeddings.get(t.vid_id, np.empty((0, 0), dtype=np.float32)) for t in transcripts]
+    if rows:
+        await vector_store.ainsert_chunk_groups(groups, rows, embeddings=embeddings)
+        invalidate_chatroom_listing()
+    ctx.skipped = sorted(set(ctx.skipped) | existing)
+    await asyncio.to_thread(_update_job, ctx.job_id, result={
+        "created": [t.vid_id for t in transcripts],
+        "skipped": ctx.skipped,
+        "failed": ctx.failed,
+    })
+
+PLAYLIST_STAGES: List[Stage] = [
+    Stage("fetch_transcripts", _stage_fetch_playlist),
+    Stage("fetch_descriptions", _stage_fetch_playlist_descriptions, after=["fetch_transcripts"]),
+    Stage("summarize", _stage_summarize_playlist, after=["fetch_transcripts"]),
+    Stage("embed", _stage_embed_playlist, after=["fetch_transcripts"]),
+    Stage("store", _stage_store_playlist, after=["fetch_descriptions", "summarize", "embed"]),
+]
+
+STAGES_BY_KIND: Dict[JobKind, List[Stage]] = {
+    JobKind.VIDEO: VIDEO_STAGES,
+    JobKind.PLAYLIST: PLAYLIST_STAGES,
+}
+
+for _stages in STAGES_BY_KIND.values():
+    _check_graph(_stages)
+
+# --- Job persistence helpers (blocking, run through asyncio.to_thread) ---
+
+def _chatroom_exists(vid_id: str) -> bool:
+    with Session(engine) as session:
+        return session.get(VidChat, vid_id) is not None
+
+def _existing_chatrooms(vid_ids: List[str]) -> set:
+    if not vid_ids:
+        return set()
+    with Session(engine) as session:
+        return set(session.exec(select(VidChat.id).where(VidChat.id.in_(vid_ids))).all())
+
+def _update_job(job_id: uuid.UUID, **fields) -> None:
+    with Session(engine) as session:
+        job = session.get(IngestJob, job_id)
+        if not job:
+            return
+        for key, value in fields.items():
+            setattr(job, key, value)
+        job.updated_at = datetime.now()
+        session.add(job)
+        session.commit()
+
+def _load_job(job_id: uuid.UUID) -> Optional[IngestJob]:
+    with Session(engine) as session:
+        return session.get(IngestJob, job_id)
+
+def _create_job(url: str, vid_id: Optional[str], kind: JobKind, done: bool) -> Tuple[IngestJob, bool]:
+    with Session(engine) as session:
+        if done:
+            # Nothing to run: report the job that built the chatroom instead of recording a new one
+            latest = session.exec(
+                select(IngestJob)
+                .where(IngestJob.vid_id == vid_id)
+                .where(IngestJob.status == JobStatus.SUCCEEDED)
+                .order_by(IngestJob.created_at.desc())
+            ).first()
+            if latest:
+                return latest, False
+            # Chatrooms ingested before jobs were tracked: an unpersisted stand-in
+            now = datetime.now()
+            return IngestJob(
+                url=url, vid_id=vid_id, kind=kind, status=JobStatus.SUCCEEDED,
+                progress=1.0, created_at=now, updated_at=now, finished_at=now
+            ), False
+        # Reuse a job that is already working on the same video or playlist
+        same_target = IngestJob.vid_id == vid_id if vid_id else IngestJob.url == url
+        active = session.exec(
+            select(IngestJob)
+            .where(IngestJob.kind == kind)
+            .where(same_target)
+            .where(IngestJob.status.in_(ACTIVE_JOB_STATUSES))
+        ).first()
+        if active:
+            return active, False
+        job = IngestJob(url=url, vid_id=vid_id, kind=kind)
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        return job, True
+
+def _recover_jobs() -> List[uuid.UUID]:
+    """Marks unfinished jobs as queued again and returns their ids in creation order."""
+    with Session(engine) as session:
+        jobs = session.exec(
+            select(IngestJob)
+            .where(IngestJob.status.in_(ACTIVE_JOB_STATUSES))
+            .order_by(IngestJob.created_at)
+        ).all()
+        for job in jobs:
+            job.status = JobStatus.QUEUED
+            job.attempts = 0
+            job.updated_at = datetime.now()
+            session.add(job)
+        session.commit()
+        return [job.id for job in jobs]
+
+# --- Worker Pool ---
+class IngestionWorkerPool:
+    def __init__(self, queue: JobQueue, vector_store: VectorStore, num_workers: int = INGEST_WORKERS):
+        """
+        Runs ingestion jobs in the background.
+
+        Args:
+            queue: Queue the job ids are pulled from.
+            vector_store: Vector store the chunks are written to.
+            num_workers: Number of jobs processed concurrently.
+        """
+        self.queue = queue
+        self.vector_store = vector_store
+        self.num_workers = num_workers
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self):
+        """Re-enqueues jobs left unfinished by a previous process and spawns the workers."""
+        recovered = await asyncio.to_thread(_recover_jobs)
+        for job_id in recovered:
+            await self.queue.put(job_id)
+        if recovered:
+            print(f"Ingestion: Re-enqueued {len(recovered)} unfinished job(s).")
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.num_workers)]
+
+    async def stop(self):
+        """Cancels the workers. Interrupted jobs stay 'running' and are recovered on next start."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(
+        self,
+        url: str,
+        vid_id: Optional[str] = None,
+        kind: JobKind = JobKind.VIDEO,
+        done: bool = False
+    ) -> IngestJob:
+        """
+        Persists a new job and enqueues it.
+
+        Args:
+            url: The YouTube video or playlist URL to ingest.
+            vid_id: The video id, if already known.
+            kind: Whether the URL is a single video or a playlist.
+            done: The video is already ingested (its chatroom exists); nothing is run or persisted.
+
+        Returns:
+            The persisted IngestJob. May be an existing active job for the same video or playlist.
+            With `done`, the latest succeeded job of the video, or an unpersisted succeeded job
+            if the chatroom predates job tracking.
+        """
+        job, enqueue = await asyncio.to_thread(_create_job, url, vid_id, kind, done)
+        if enqueue:
+            await self.queue.put(job.id)
+        return job
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                print(f"Ingestion worker {worker_id}: unexpected error on job {job_id}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _run_job(self, job_id: uuid.UUID):
+        job = await asyncio.to_thread(_load_job, job_id)
+        if not job or job.status not in ACTIVE_JOB_STATUSES:
+            return
+        ctx = IngestContext(job.id, job.url)
+
+        await asyncio.to_thread(_update_job, job_id, status=JobStatus.RUNNING, error=None, stage_timings=None)
+        stages = STAGES_BY_KIND[job.kind]
+        timings: Dict[str, Dict[str, Any]] = {}
+        try:
+            await self._run_stages(job_id, ctx, stages, timings)
+        except StageFailed as e:
+            await asyncio.to_thread(
+                _update_job, job_id,
+                status=JobStatus.FAILED,
+                error=str(e),
+                stage_timings=timings,
+                finished_at=datetime.now()
+            )
+            return
+
+        path = critical_path(stages, timings)
+        total_ms = max(t["end_ms"] for t in timings.values())
+        stage_sum_ms = sum(t["end_ms"] - t["start_ms"] for t in timings.values())
+        path_desc = " -> ".join(f"{name} ({timings[name]['end_ms'] - timings[name]['start_ms']:.0f} ms)" for name in path)
+        print(f"Ingestion: job {job_id} took {total_ms:.0f} ms (stages sum to {stage_sum_ms:.0f} ms), critical path: {path_desc}")
+        await asyncio.to_thread(
+            _update_job, job_id,
+            status=JobStatus.SUCCEEDED,
+            progress=1.0,
+            stage_timings=timings,
+            finished_at=datetime.now()
+        )
+
+    async def _run_stages(self, job_id: uuid.UUID, ctx: IngestContext, stages: List[Stage], timings: Dict[str, Dict[str, Any]]):
+        """
+        Runs the stage graph, each stage as its own task started once its
+        dependencies are done, so independent stages overlap. Every stage is
+        retried up to STAGE_MAX_ATTEMPTS times; `timings` receives its start and
+        end in ms since the job started.
+
+        Raises:
+            StageFailed: If a stage ran out of attempts. The other stages are cancelled.
+        """
+        started = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+        running: List[str] = []
+
+        def elapsed_ms() -> float:
+            return round((time.perf_counter() - started) * 1000, 1)
+
+        async def run(stage: Stage):
+            if stage.after:
+                await asyncio.gather(*(tasks[name] for name in stage.after))
+            running.append(stage.name)
+            timings[stage.name] = {"start_ms": elapsed_ms(), "end_ms": None, "attempts": 0}
+            await asyncio.to_thread(_update_job, job_id, stage=", ".join(running), attempts=1)
+            for attempt in range(1, STAGE_MAX_ATTEMPTS + 1):
+                timings[stage.name]["attempts"] = attempt
+                if attempt > 1:
+                    await asyncio.to_thread(_update_job, job_id, attempts=attempt)
+                try:
+                    await stage.fn(ctx, self.vector_store)
+                    break
+                except Exception as e:
+                    print(f"Ingestion: job {job_id} stage '{stage.name}' attempt {attempt} failed: {e}")
+                    if attempt == STAGE_MAX_ATTEMPTS:
+                        raise StageFailed(stage.name, e) from e
+                    await asyncio.sleep(STAGE_RETRY_BACKOFF * 2 ** (attempt - 1))
+            timings[stage.name]["end_ms"] = elapsed_ms()
+            running.remove(stage.name)
+            finished = sum(1 for t in timings.values() if t["end_ms"] is not None)
+            await asyncio.to_thread(
+                _update_job, job_id,
+                stage=", ".join(running) or stage.name,
+                progress=finished / len(stages),
+                stage_timings={name: dict(t) for name, t in timings.items()}
+            )
+
+        for stage in stages:
+            tasks[stage.name] = asyncio.create_task(run(stage))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            # On failure (or if the worker itself is cancelled) stop the stages still running
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
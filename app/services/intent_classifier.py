@@ -1,10 +1,23 @@
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_google_genai import ChatGoogleGenerativeAI
 import os
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from app.db.life_span import shared_resources
+from app.services.embeddings import EmbeddingBackend
+from app.services.llm_registry import FLASH_MODEL
+from app.services.intent_examples import INTENT_EXAMPLES
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# --- Configuration of the local classifier ---
+INTENT_KNN_K = int(os.getenv("INTENT_KNN_K", "5"))
+# Share of the neighbours' (similarity-weighted) vote the winning intent needs
+INTENT_MIN_CONFIDENCE = float(os.getenv("INTENT_MIN_CONFIDENCE", "0.6"))
+# Cosine similarity the nearest example must reach; below it the query is unlike anything labelled
+INTENT_MIN_SIMILARITY = float(os.getenv("INTENT_MIN_SIMILARITY", "0.45"))
+
 # --- Intent Definitions ---
 INTENT_DEFINITIONS = {
     # Summarization
@@ -74,31 +87,131 @@ def classify_intent(user_query: str) -> str | None:
     if not user_query:
         return "irrelevant" # Handle empty query
 
+    try:
+        # print(f"\n--- Invoking Classifier for: '{user_query}' ---") # Debugging
+        result = llm_classifier.invoke(_build_prompt(user_query))
+        return _validate_intent(result.content.strip())
+    except Exception as e:
+        return _classification_failed(user_query, e)
+
+async def aclassify_intent(user_query: str) -> str | None:
+    """
+    Async variant of `classify_intent`; same return values. Goes through the
+    shared LLM registry when the app is running.
+    """
+    if not user_query:
+        return "irrelevant"
+    try:
+        llm_registry = shared_resources.get("llm_registry")
+        if llm_registry is not None:
+            content = await llm_registry.ainvoke(FLASH_MODEL, 0.0, _build_prompt(user_query))
+        else:
+            content = (await llm_classifier.ainvoke(_build_prompt(user_query))).content
+        return _validate_intent(content.strip())
+    except Exception as e:
+        return _classification_failed(user_query, e)
+
+def _build_prompt(user_query: str):
     # Format intent definitions for the prompt
     intent_defs_formatted = "\n".join(f"- {name}: {desc}" for name, desc in INTENT_DEFINITIONS.items())
-
-    # Create the prompt
-    prompt = prompt_template_ic.invoke({
+    return prompt_template_ic.invoke({
         "intent_definitions_str": intent_defs_formatted,
         "user_query": user_query
     })
 
-    try:
-        # print(f"\n--- Invoking Classifier for: '{user_query}' ---") # Debugging
-        # print(f"Prompt:\n{prompt.to_string()}") # Debugging
-        result = llm_classifier.invoke(prompt)
-        classified_intent = result.content.strip()
-        # print(f"Raw LLM Output: '{classified_intent}'") # Debugging
-
-        # Validate the output
-        if classified_intent in VALID_INTENTS:
-            return classified_intent
-        else:
-            print(f"Warning: LLM returned an invalid intent '{classified_intent}'. Defaulting to 'irrelevant'.")
-            # Fallback strategy: maybe try again, or default to irrelevant/QA
-            return "irrelevant"
+def _classification_failed(user_query: str, error: Exception) -> None:
+    print("\n--- Error during Intent Classification ---")
+    print(f"An error occurred for query '{user_query}': {error}")
+    return None # Indicate failure
 
-    except Exception as e:
-        print(f"\n--- Error during Intent Classification ---")
-        print(f"An error occurred for query '{user_query}': {e}")
-        return None # Indicate failure
\ No newline at end of file
+def _validate_intent(classified_intent: str) -> str:
+    if classified_intent in VALID_INTENTS:
+        return classified_intent
+    print(f"Warning: LLM returned an invalid intent '{classified_intent}'. Defaulting to 'irrelevant'.")
+    # Fallback strategy: maybe try again, or default to irrelevant/QA
+    return "irrelevant"
+
+# --- Local Classifier ---
+class LocalIntentClassifier:
+    """
+    Classifies queries by k-nearest-neighbour search over embedded example
+    queries (INTENT_EXAMPLES), using the same model as retrieval so the query
+    embedding is shared. Only queries it is unsure about go to the LLM.
+    """
+    def __init__(
+        self,
+        model: EmbeddingBackend,
+        examples: Dict[str, List[str]] = INTENT_EXAMPLES,
+        k: int = INTENT_KNN_K,
+        min_confidence: float = INTENT_MIN_CONFIDENCE,
+        min_similarity: float = INTENT_MIN_SIMILARITY,
+    ):
+        """
+        Embeds the examples once.
+
+        Args:
+            model: Embedding model producing normalized embeddings.
+            examples: Example queries per intent; unknown intents are ignored.
+            k: Number of neighbours that vote.
+            min_confidence: Minimum share of the weighted vote for a local decision.
+            min_similarity: Minimum similarity of the nearest example for a local decision.
+        """
+        self.model = model
+        self.k = k
+        self.min_confidence = min_confidence
+        self.min_similarity = min_similarity
+        self.labels: List[str] = []
+        texts: List[str] = []
+        for intent, queries in examples.items():
+            if intent not in INTENT_DEFINITIONS:
+                print(f"Warning: Ignoring examples of unknown intent '{intent}'.")
+                continue
+            self.labels.extend([intent] * len(queries))
+            texts.extend(queries)
+        self.matrix = np.ascontiguousarray(model.create_embeddings(texts), dtype=np.float32)
+        self.local_decisions = 0
+        self.llm_fallbacks = 0
+
+    def predict(self, query_embedding: np.ndarray) -> Tuple[str, float, float]:
+        """
+        Returns the best intent, its share of the similarity-weighted vote of
+        the k nearest examples, and the similarity of the nearest example.
+        """
+        scores = self.matrix @ np.asarray(query_embedding, dtype=np.float32)
+        k = min(self.k, len(scores))
+        nearest = np.argpartition(-scores, k - 1)[:k]
+        votes: Dict[str, float] = {}
+        for i in nearest:
+            votes[self.labels[i]] = votes.get(self.labels[i], 0.0) + max(float(scores[i]), 0.0)
+        intent = max(votes, key=votes.get)
+        total = sum(votes.values())
+        confidence = votes[intent] / total if total > 0 else 0.0
+        return intent, confidence, float(scores[nearest].max())
+
+    def classify_local(self, query_embedding: np.ndarray) -> Optional[str]:
+        """Returns the intent if the local decision clears both thresholds, otherwise None."""
+        intent, confidence, similarity = self.predict(query_embedding)
+        if confidence >= self.min_confidence and similarity >= self.min_similarity:
+            return intent
+        return None
+
+    async def classify(self, user_query: str, query_embedding: np.ndarray) -> str | None:
+        """
+        Classifies locally when confident, otherwise asks the LLM classifier.
+
+        Returns:
+            Same as `classify_intent`.
+        """
+        intent = self.classify_local(query_embedding)
+        if intent is not None:
+            self.local_decisions += 1
+            return intent
+        self.llm_fallbacks += 1
+        return await aclassify_intent(user_query)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "examples": len(self.labels),
+            "local_decisions": self.local_decisions,
+            "llm_fallbacks": self.llm_fallbacks,
+        }
\ No newline at end of file
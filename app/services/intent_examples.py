@@ -0,0 +1,81 @@
+# --- Labelled example queries per intent ---
+# Used by the local intent classifier as its nearest-neighbour index. Keep the
+# keys in sync with INTENT_DEFINITIONS; add real (anonymized) user queries that
+# the local classifier got wrong or sent to the LLM.
+INTENT_EXAMPLES = {
+    "summarize_full": [
+        "Summarize this video",
+        "Give me a summary of the whole video",
+        "What is this video about?",
+        "Can you give me an overview of the entire lecture?",
+        "tl;dr",
+        "Sum up the main points of the video",
+        "Write a short recap of everything covered",
+        "What are the key takeaways from this video?",
+    ],
+    "summarize_specific": [
+        "Summarize the part about neural networks",
+        "Give me a summary of the section on photosynthesis",
+        "Can you recap what he said about interest rates?",
+        "Summarize the discussion of the second example",
+        "What was covered in the part about sorting algorithms, briefly?",
+        "Give me an overview of the segment where they talk about the budget",
+        "Sum up the explanation of recursion",
+        "Briefly recap the portion about World War 2",
+    ],
+    "qa_specific": [
+        "What is the formula for kinetic energy mentioned in the video?",
+        "Who invented the transistor according to the speaker?",
+        "What year did the event happen?",
+        "How does the speaker define entropy?",
+        "What does TCP stand for?",
+        "Why does the learning rate matter?",
+        "What example did she use to explain derivatives?",
+        "How many steps are there in the process he described?",
+        "What is the difference between mitosis and meiosis in the video?",
+        "Which library did they use for the demo?",
+    ],
+    "flashcards_full": [
+        "Make flashcards for this video",
+        "Create flashcards covering the whole lecture",
+        "Generate a set of flashcards from the video",
+        "I want flashcards to study everything in this video",
+        "Turn the video into flashcards",
+        "Flashcards for the entire video please",
+    ],
+    "flashcards_topic": [
+        "Make flashcards about the Krebs cycle part",
+        "Create flashcards on the section about linear regression",
+        "Generate flashcards for the key terms in the networking segment",
+        "Flashcards on what he said about supply and demand",
+        "I need flashcards just for the part on vectors",
+        "Make some flashcards about the French Revolution section",
+    ],
+    "quiz_full": [
+        "Quiz me on this video",
+        "Create a quiz for the whole video",
+        "Generate a test covering everything in the lecture",
+        "Give me some multiple choice questions about the video",
+        "Test my understanding of the entire video",
+        "Make a quiz from this lecture",
+    ],
+    "quiz_topic": [
+        "Quiz me on the section about cell division",
+        "Create quiz questions about the part on binary search",
+        "Test me on what she said about inflation",
+        "Give me multiple choice questions on the integration segment",
+        "Make a quiz about the second half's topic, thermodynamics",
+        "Quiz me only on the history part",
+    ],
+    "general_chat": [
+        "Hi!",
+        "Thanks, that was helpful",
+        "I didn't really like this video",
+        "Do you think the speaker is right?",
+        "That's interesting, tell me more",
+        "What do you think about this video?",
+        "lol",
+        "Can you explain that again more simply?",
+        "Cool, thanks",
+    ],
+}
@@ -0,0 +1,49 @@
+import asyncio
+import uuid
+from abc import ABC, abstractmethod
+
+class JobQueue(ABC):
+    """
+    Minimal interface the ingestion worker pool needs from a job queue.
+
+    Only job ids travel through the queue; the job state itself lives in the
+    `ingest_job` table, so a broker-backed implementation can be swapped in
+    without touching the workers.
+    """
+    @abstractmethod
+    async def put(self, job_id: uuid.UUID) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self) -> uuid.UUID:
+        ...
+
+    @abstractmethod
+    def task_done(self) -> None:
+        ...
+
+    @abstractmethod
+    def qsize(self) -> int:
+        ...
+
+class InProcessJobQueue(JobQueue):
+    """
+    In-process stand-in queue backed by `asyncio.Queue`.
+
+    Jobs queued here are lost when the process exits, but since every job is
+    persisted in Postgres the worker pool re-enqueues unfinished ones on startup.
+    """
+    def __init__(self, maxsize: int = 0):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def put(self, job_id: uuid.UUID) -> None:
+        await self._queue.put(job_id)
+
+    async def get(self) -> uuid.UUID:
+        return await self._queue.get()
+
+    def task_done(self) -> None:
+        self._queue.task_done()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
@@ -0,0 +1,137 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from langchain_google_genai import ChatGoogleGenerativeAI
+from app.utils.metrics import Histogram
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Configuration of the LLM registry ---
+FLASH_MODEL = os.getenv("LLM_FLASH_MODEL", "gemini-2.0-flash")
+PRO_MODEL = os.getenv("LLM_PRO_MODEL", "gemini-2.5-pro-exp-03-25")
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+# Per-model request timeout (seconds) and cap on concurrent calls
+MODEL_LIMITS: Dict[str, Tuple[float, int]] = {
+    FLASH_MODEL: (float(os.getenv("LLM_FLASH_TIMEOUT", "60")), int(os.getenv("LLM_FLASH_MAX_CONCURRENCY", "32"))),
+    PRO_MODEL: (float(os.getenv("LLM_PRO_TIMEOUT", "180")), int(os.getenv("LLM_PRO_MAX_CONCURRENCY", "4"))),
+}
+DEFAULT_MODEL_LIMITS = (60.0, 8)
+
+LATENCY_BUCKETS_MS = [100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000]
+
+class ModelStats:
+    def __init__(self):
+        self.in_flight = 0
+        self.queued = 0
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.queue_wait_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+            "latency_ms": self.latency_ms.snapshot(),
+        }
+
+class LLMRegistry:
+    """
+    Long-lived Gemini clients shared by all requests, one per (model, temperature).
+
+    Calls go through `ainvoke`/`astream`, which cap concurrency per model with a
+    semaphore, apply the model's timeout and record in-flight/queued counts.
+    """
+    def __init__(self, api_key: Optional[str] = None, limits: Dict[str, Tuple[float, int]] = MODEL_LIMITS):
+        self.api_key = api_key or os.getenv('GOOGLE_API_KEY')
+        self.limits = limits
+        self._clients: Dict[Tuple[str, float], ChatGoogleGenerativeAI] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats: Dict[str, ModelStats] = {}
+
+    def _limits(self, model: str) -> Tuple[float, int]:
+        return self.limits.get(model, DEFAULT_MODEL_LIMITS)
+
+    def client(self, model: str, temperature: float) -> ChatGoogleGenerativeAI:
+        """Returns the shared client for a model and temperature, creating it on first use."""
+        key = (model, float(temperature))
+        llm = self._clients.get(key)
+        if llm is None:
+            llm = ChatGoogleGenerativeAI(
+                model=model,
+                temperature=temperature,
+                max_tokens=None,
+                timeout=self._limits(model)[0],
+                max_retries=LLM_MAX_RETRIES,
+                api_key=self.api_key
+            )
+            self._clients[key] = llm
+        return llm
+
+    @asynccontextmanager
+    async def _slot(self, model: str):
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            semaphore = self._semaphores[model] = asyncio.Semaphore(self._limits(model)[1])
+        stats = self._stats.setdefault(model, ModelStats())
+        stats.queued += 1
+        queued_at = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            stats.queued -= 1
+        started = time.perf_counter()
+        stats.queue_wait_ms.observe((started - queued_at) * 1000)
+        stats.in_flight += 1
+        stats.calls += 1
+        try:
+            yield stats
+        except (asyncio.TimeoutError, TimeoutError):
+            stats.timeouts += 1
+            raise
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            stats.latency_ms.observe((time.perf_counter() - started) * 1000)
+            semaphore.release()
+
+    async def ainvoke(self, model: str, temperature: float, prompt) -> str:
+        """
+        Runs a prompt to completion.
+
+        Raises:
+            TimeoutError: If the call took longer than the model's timeout.
+        """
+        llm = self.client(model, temperature)
+        async with self._slot(model):
+            response = await asyncio.wait_for(llm.ainvoke(prompt), timeout=self._limits(model)[0])
+        return response.content
+
+    async def astream(self, model: str, temperature: float, prompt) -> AsyncIterator[str]:
+        """
+        Streams the non-empty text chunks of a response.
+
+        The model's timeout bounds the whole stream, not just each request.
+        """
+        llm = self.client(model, temperature)
+        async with self._slot(model):
+            async with asyncio.timeout(self._limits(model)[0]):
+                async for chunk in llm.astream(prompt):
+                    if chunk.content:
+                        yield chunk.content
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "models": {model: s.snapshot() for model, s in self._stats.items()},
+        }
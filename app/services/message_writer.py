@@ -0,0 +1,176 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, create_engine
+from app.db.session import DATABASE_URL
+from app.models.message import Message
+from app.models.vid_chat import VidChat
+from app.utils.metrics import Histogram
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Configuration of the message writer ---
+MESSAGE_FLUSH_INTERVAL_MS = float(os.getenv("MESSAGE_FLUSH_INTERVAL_MS", "100"))
+MESSAGE_FLUSH_MAX_BATCH = int(os.getenv("MESSAGE_FLUSH_MAX_BATCH", "500")) # Rows per INSERT statement
+MESSAGE_FLUSH_RETRY_BACKOFF = float(os.getenv("MESSAGE_FLUSH_RETRY_BACKOFF", "1.0")) # seconds
+MESSAGE_SHUTDOWN_FLUSH_ATTEMPTS = int(os.getenv("MESSAGE_SHUTDOWN_FLUSH_ATTEMPTS", "5"))
+
+FLUSH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+
+class MessageWriter:
+    """
+    Write-behind persistence of chat messages.
+
+    Requests hand finished messages to `enqueue` and return immediately. A
+    background task writes whatever has accumulated every `interval_ms` as
+    multi-row INSERTs, on a dedicated single-connection engine and thread so
+    it never competes with request sessions. Failed batches stay queued and
+    are retried; `stop` flushes everything that is left before shutdown.
+    """
+    def __init__(
+        self,
+        database_url: str = DATABASE_URL,
+        interval_ms: float = MESSAGE_FLUSH_INTERVAL_MS,
+        max_batch_size: int = MESSAGE_FLUSH_MAX_BATCH,
+    ):
+        self.engine = create_engine(database_url, pool_size=1, max_overflow=0, pool_pre_ping=True)
+        self.interval = interval_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.flush_sizes = Histogram(FLUSH_SIZE_BUCKETS)
+        self.enqueued = 0
+        self.written = 0
+        self.errors = 0
+        self.dropped = 0 # Messages of chatrooms deleted before they were written
+        self._pending: List[Dict[str, Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="message-writer")
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._closed = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops the background task and writes every queued message, retrying on errors."""
+        self._closed = True
+        if self._task:
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for attempt in range(1, MESSAGE_SHUTDOWN_FLUSH_ATTEMPTS + 1):
+            try:
+                await self.flush()
+                break
+            except Exception as e:
+                print(f"MessageWriter: shutdown flush attempt {attempt} failed: {e}")
+                await asyncio.sleep(MESSAGE_FLUSH_RETRY_BACKOFF)
+        if self._pending:
+            print(f"MessageWriter: CRITICAL - {len(self._pending)} message(s) could not be written.")
+        self._executor.shutdown(wait=True)
+        self.engine.dispose()
+
+    def enqueue(self, *messages: Message) -> None:
+        """Queues messages for writing. Never blocks; rows keep the ids and timestamps of the given models."""
+        self._pending.extend(message.model_dump() for message in messages)
+        self.enqueued += len(messages)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def forget_video(self, vid_id: str) -> None:
+        """Drops the queued messages of a deleted chatroom."""
+        kept = [row for row in self._pending if row["vid_id"] != vid_id]
+        self.dropped += len(self._pending) - len(kept)
+        self._pending[:] = kept
+
+    async def flush(self) -> int:
+        """
+        Writes all queued messages now.
+
+        Returns:
+            Number of messages written.
+
+        Raises:
+            Exception: If a batch could not be written. It stays queued.
+        """
+        loop = asyncio.get_running_loop()
+        written = 0
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:len(batch)]
+                try:
+                    inserted = await loop.run_in_executor(self._executor, self._insert, batch)
+                except BaseException:
+                    # Put the batch back in front so messages keep their order
+                    self._pending[:0] = batch
+                    raise
+                self.flush_sizes.observe(len(batch))
+                self.written += inserted
+                self.dropped += len(batch) - inserted
+                written += inserted
+        return written
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> int:
+        vid_chat = VidChat.__table__
+        with Session(self.engine) as session:
+            # Messages of chatrooms deleted meanwhile are dropped. FOR KEY SHARE
+            # makes a concurrent delete (which locks the room FOR UPDATE first)
+            # wait for this transaction, or this one wait for the delete.
+            existing = set(session.execute(
+                select(vid_chat.c.id)
+                .where(vid_chat.c.id.in_({row["vid_id"] for row in rows}))
+                .with_for_update(key_share=True)
+            ).scalars().all())
+            kept = [row for row in rows if row["vid_id"] in existing]
+            if kept:
+                # One statement with a VALUES row per message. Rows keep their ids, so a
+                # batch retried after an unclear failure cannot be written twice.
+                session.exec(insert(Message.__table__).values(kept).on_conflict_do_nothing(index_elements=["id"]))
+                # Bump each room's last activity once per batch, in the same transaction
+                latest: Dict[str, datetime] = {}
+                for row in kept:
+                    if row["created_at"] > latest.get(row["vid_id"], datetime.min):
+                        latest[row["vid_id"]] = row["created_at"]
+                activity_stmt = (
+                    update(vid_chat)
+                    .where(vid_chat.c.id == bindparam("room_id"))
+                    .values(last_activity_at=func.greatest(vid_chat.c.last_activity_at, bindparam("active_at")))
+                )
+                session.execute(activity_stmt, [{"room_id": vid_id, "active_at": at} for vid_id, at in latest.items()])
+            session.commit()
+        return len(kept)
+
+    async def _run(self):
+        while not self._closed:
+            await self._wakeup.wait()
+            if not self._closed:
+                # Let messages of concurrent requests gather into one batch
+                await asyncio.sleep(self.interval)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                self.errors += 1
+                print(f"MessageWriter: flush of {len(self._pending)} message(s) failed, retrying: {e}")
+                if not self._closed:
+                    await asyncio.sleep(MESSAGE_FLUSH_RETRY_BACKOFF)
+                    self._wakeup.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "pending": len(self._pending),
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "flush_size": self.flush_sizes.snapshot(),
+        }
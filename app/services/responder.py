@@ -1,77 +1,172 @@
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 from app.db.life_span import shared_resources
+from app.services.llm_registry import LLMRegistry, FLASH_MODEL, PRO_MODEL
+from app.services.context_packer import pack_context
+from app.services.response_cache import ResponseCache, normalize_query, replay, response_cache_key, template_hash
 from app.services.templates.qa import TEMPLATE_QA_SPECIFIC 
-from app.services.templates.summarization import TEMPLATE_FULL_SUMMARY, TEMPLATE_RAG_SUMMARY, TEMPLATE_OVERVIEW_SUMMARY
+from app.services.templates.summarization import TEMPLATE_FULL_SUMMARY, TEMPLATE_RAG_SUMMARY, TEMPLATE_OVERVIEW_SUMMARY, TEMPLATE_REDUCE_SUMMARY
+from app.services.summarizer import SECTION_TEMPLATE_HASH, map_sections, needs_map_reduce
 from app.services.templates.chat import CHAT_TEMPLATE
 from app.services.templates.learning_tools import TEMPLATE_FULL_QUIZ
-from typing import List
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+import asyncio
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def generate_summary(transcript: str):
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
-        temperature=0.5,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-        api_key=os.getenv('GOOGLE_API_KEY')
+# HNSW candidate list size per intent: specific summaries draw on more chunks
+# than a factual answer, so they search wider at some latency cost.
+EF_SEARCH_BY_INTENT = {
+    "qa_specific": int(os.getenv("EF_SEARCH_QA", "40")),
+    "summarize_specific": int(os.getenv("EF_SEARCH_SUMMARY", "100")),
+}
+# Fused (lexical + vector) chunks put in the prompt per intent
+RETRIEVAL_LIMIT_BY_INTENT = {
+    "qa_specific": int(os.getenv("RETRIEVAL_LIMIT_QA", "5")),
+    "summarize_specific": int(os.getenv("RETRIEVAL_LIMIT_SUMMARY", "8")),
+}
+# Intents answered from retrieved chunks; retrieval for them can start before classification ends
+RAG_INTENTS = tuple(RETRIEVAL_LIMIT_BY_INTENT)
+# Token budget of the retrieved context after overlap removal and merging
+CONTEXT_TOKEN_BUDGET_BY_INTENT = {
+    "qa_specific": int(os.getenv("CONTEXT_TOKEN_BUDGET_QA", "500")),
+    "summarize_specific": int(os.getenv("CONTEXT_TOKEN_BUDGET_SUMMARY", "1000")),
+}
+# Whole-video intents whose answer depends only on the transcript, template,
+# model and query: (template, model) per intent. Their responses are cached.
+CACHED_INTENTS = {
+    # Long transcripts are answered by reducing over section summaries, so both paths count
+    "summarize_full": (TEMPLATE_FULL_SUMMARY + TEMPLATE_REDUCE_SUMMARY + SECTION_TEMPLATE_HASH, PRO_MODEL),
+    "quiz_full": (TEMPLATE_FULL_QUIZ, FLASH_MODEL),
+}
+RESPONSE_TEMPLATE_HASHES = {intent: template_hash(template) for intent, (template, _) in CACHED_INTENTS.items()}
+
+def start_speculative_retrieval(query: str, vid_id: str, query_embedding) -> asyncio.Task:
+    """
+    Starts retrieval for `query` in the background, before its intent is known.
+
+    It searches with the widest settings of all RAG intents, so any of them can
+    use a prefix of the result. Cancel the task if the intent turns out not to
+    need retrieval.
+    """
+    vector_store = shared_resources.get("vector_store")
+    return asyncio.create_task(vector_store.ahybrid_search(
+        query=query, vid_id=vid_id, limit=max(RETRIEVAL_LIMIT_BY_INTENT.values()),
+        query_embedding=query_embedding, ef_search=max(EF_SEARCH_BY_INTENT[i] for i in RAG_INTENTS)
+    ))
+
+async def _retrieve(query: str, vid_id: str, intent: str, retrieval: Optional[asyncio.Task]) -> List[Dict[str, Any]]:
+    """Results for a RAG intent: the speculative retrieval's if one was started, otherwise a fresh search."""
+    limit = RETRIEVAL_LIMIT_BY_INTENT[intent]
+    if retrieval is not None:
+        return (await retrieval)[:limit]
+    vector_store = shared_resources.get("vector_store")
+    embedding_batcher = shared_resources.get("embedding_batcher")
+    query_embedding = await embedding_batcher.embed(query)
+    return await vector_store.ahybrid_search(
+        query=query, vid_id=vid_id, limit=limit,
+        query_embedding=query_embedding, ef_search=EF_SEARCH_BY_INTENT[intent]
     )
+
+def _llm() -> LLMRegistry:
+    return shared_resources.get("llm_registry")
+
+async def _stream(model: str, temperature: float, prompt, on_complete: Optional[Callable[[str], Awaitable[None]]] = None):
+    """
+    Streams a response through the shared registry, yielding an error message instead of raising.
+
+    `prompt` is either the prompt itself or an async callable building it, so
+    work needed for the prompt fails the same way the LLM call does.
+    `on_complete` receives the full response text, only if the stream finished without error.
+    """
+    parts: List[str] = []
+    try:
+        if callable(prompt):
+            prompt = await prompt()
+        print("\n--- Invoking LLM Stream---")
+        async for content in _llm().astream(model, temperature, prompt):
+            parts.append(content)
+            yield content
+        print("\n--- LLM Response Completed---")
+    except Exception as e:
+        print(f"\n--- Error during LLM Invocation ---")
+        print(f"An error occurred: {e!r}")
+        yield f"\nAn error occurred while generating the response: {e!r}"
+        return
+    if on_complete is not None:
+        try:
+            await on_complete("".join(parts))
+        except Exception as e:
+            print(f"Failed to cache response: {e!r}")
+
+async def _cached_stream(vid_id: Optional[str], intent: str, query: str, temperature: float, prompt):
+    """
+    Streams a whole-video intent's response from the response cache, or from the
+    LLM on a miss (storing the complete response afterwards).
+    """
+    template, model = CACHED_INTENTS[intent]
+    cache: Optional[ResponseCache] = shared_resources.get("response_cache")
+    if cache is None or vid_id is None:
+        async for content in _stream(model, temperature, prompt):
+            yield content
+        return
+
+    query = normalize_query(query)
+    digest = RESPONSE_TEMPLATE_HASHES[intent]
+    key = response_cache_key(vid_id, intent, query, digest, model)
+    try:
+        cached = await asyncio.to_thread(cache.get, key)
+    except Exception as e:
+        print(f"Response cache lookup failed: {e!r}")
+        cached = None
+    if cached is not None:
+        print(f"Response cache hit for '{vid_id}' ({intent}).")
+        async for piece in replay(cached):
+            yield piece
+        return
+
+    async def store(response: str):
+        await asyncio.to_thread(cache.put, key, vid_id, intent, query, digest, model, response)
+    async for content in _stream(model, temperature, prompt, on_complete=store):
+        yield content
+
+async def generate_summary(transcript: str, vid_id: Optional[str] = None, segments: Optional[Sequence[Dict[str, Any]]] = None) -> str:
+    """
+    Overview summary stored with a new chatroom. Long transcripts are summarized
+    section by section first (the section summaries are kept for later requests)
+    and the overview is written from those.
+
+    Raises:
+        Exception: If an LLM call failed or returned no text, so the ingestion
+            stage calling this is retried instead of storing a room without summary.
+    """
     prompt_template = ChatPromptTemplate.from_template(TEMPLATE_OVERVIEW_SUMMARY)
+    if needs_map_reduce(transcript):
+        transcript = "\n\n".join(await map_sections(_llm(), vid_id, transcript, segments))
     prompt = prompt_template.invoke({
             "transcript": transcript,
         })
-    try:
-        response = llm.invoke(prompt)
-        return response.content
-    except Exception as e:
-        print(f"An error occurred: {e}")
+    summary = await _llm().ainvoke(FLASH_MODEL, 0.5, prompt)
+    if not summary:
+        raise ValueError("The LLM returned an empty summary.")
+    return summary
+
+async def generate_qa_response(query: str, vid_id: str, retrieval: Optional[asyncio.Task] = None):
+    results = await _retrieve(query, vid_id, "qa_specific", retrieval)
+    retrieved_chunks = pack_context(results, CONTEXT_TOKEN_BUDGET_BY_INTENT["qa_specific"])
 
-async def generate_qa_response(query: str, vid_id: str):
-    vector_store = shared_resources.get("vector_store")
-    results = vector_store.similarity_search(query=query, vid_id=vid_id)
-    retrieved_chunks = [str(r['text']) for r in results]
-
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
-        temperature=1.0,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-        api_key=os.getenv('GOOGLE_API_KEY')
-    )
     prompt_template = ChatPromptTemplate.from_template(TEMPLATE_QA_SPECIFIC)
     prompt = prompt_template.invoke({
             "user_query": query,
             "retrieved_knowledge": str("\n-".join(retrieved_chunks)),
         })
 
-    try:
-        print("\n--- Invoking LLM Stream---")
-        async for chunk in llm.astream(prompt):
-            # chunk is typically an AIMessageChunk or similar object
-            content = chunk.content
-            if content: # Ensure content exists before yielding
-                yield content
-        print("\n--- LLM Response Completed---")
-    except Exception as e:
-        print(f"\n--- Error during LLM Invocation ---")
-        print(f"An error occurred: {e}")
-        yield f"\nAn error occurred while generating the response: {e}"
+    async for content in _stream(FLASH_MODEL, 1.0, prompt):
+        yield content
 
 async def generate_chat_response(query: str, title: str, summary: str, history: List[str]):
     """For general_chat intent"""
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
-        temperature=1,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-        api_key=os.getenv('GOOGLE_API_KEY')
-    )
     prompt_template = ChatPromptTemplate.from_template(CHAT_TEMPLATE)
     prompt = prompt_template.invoke({
             "video_title": title,
@@ -79,74 +174,39 @@ async def generate_chat_response(query: str, title: str, summary: str, history:
             "history": "\n".join(history),
             "query": query
         })
-    try:
-        print("\n--- Invoking LLM Stream---")
-        async for chunk in llm.astream(prompt):
-            content = chunk.content
-            if content: # Ensure content exists before yielding
-                yield content
-        print("\n--- LLM Response Completed---")
-    except Exception as e:
-        print(f"\n--- Error during LLM Invocation ---")
-        print(f"An error occurred: {e}")
-        yield f"\nAn error occurred while generating the response: {e}"
-
-async def generate_summary_full(transcript: str, query: str):
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-pro-exp-03-25",
-        temperature=0.5,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-        api_key=os.getenv('GOOGLE_API_KEY')
-    )
-    prompt_template = ChatPromptTemplate.from_template(TEMPLATE_FULL_SUMMARY)
-    prompt = prompt_template.invoke({
-            "transcript": transcript,
-            "user_query": query
-        })
-
-    try:
-        print("\n--- Invoking LLM Stream---")
-        async for chunk in llm.astream(prompt):
-            content = chunk.content
-            if content:
-                yield content
-        print("\n--- LLM Response Completed---")
-    except Exception as e:
-        print(f"\n--- Error during LLM Invocation ---")
-        print(f"An error occurred: {e}")
-        yield f"\nAn error occurred while generating the response: {e}"
-
-async def generate_summary_specific(vid_id: str, query: str):
-    vector_store = shared_resources.get("vector_store")
-    results = vector_store.similarity_search(query=query, vid_id=vid_id)
-    retrieved_chunks = [str(r['text']) for r in results]
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
-        temperature=0.5,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-        api_key=os.getenv('GOOGLE_API_KEY')
-    )
+    async for content in _stream(FLASH_MODEL, 1.0, prompt):
+        yield content
+
+async def generate_summary_full(transcript: str, query: str, vid_id: Optional[str] = None, segments: Optional[Sequence[Dict[str, Any]]] = None):
+    async def build_prompt():
+        if not needs_map_reduce(transcript):
+            prompt_template = ChatPromptTemplate.from_template(TEMPLATE_FULL_SUMMARY)
+            return prompt_template.invoke({
+                    "transcript": transcript,
+                    "user_query": query
+                })
+        # Reduce over the video's section summaries instead of the raw transcript
+        section_summaries = await map_sections(_llm(), vid_id, transcript, segments)
+        prompt_template = ChatPromptTemplate.from_template(TEMPLATE_REDUCE_SUMMARY)
+        return prompt_template.invoke({
+                "section_summaries": "\n\n".join(section_summaries),
+                "user_query": query
+            })
+
+    async for content in _cached_stream(vid_id, "summarize_full", query, 0.5, build_prompt):
+        yield content
+
+async def generate_summary_specific(vid_id: str, query: str, retrieval: Optional[asyncio.Task] = None):
+    results = await _retrieve(query, vid_id, "summarize_specific", retrieval)
+    retrieved_chunks = pack_context(results, CONTEXT_TOKEN_BUDGET_BY_INTENT["summarize_specific"])
     prompt_template = ChatPromptTemplate.from_template(TEMPLATE_RAG_SUMMARY)
     prompt = prompt_template.invoke({
             "retrieved_knowledge": str("\n-".join(retrieved_chunks)),
             "user_query": query
         })
 
-    try:
-        print("\n--- Invoking LLM Stream---")
-        async for chunk in llm.astream(prompt):
-            content = chunk.content
-            if content:
-                yield content
-        print("\n--- LLM Response Completed---")
-    except Exception as e:
-        print(f"\n--- Error during LLM Invocation ---")
-        print(f"An error occurred: {e}")
-        yield f"\nAn error occurred while generating the response: {e}"
+    async for content in _stream(FLASH_MODEL, 0.5, prompt):
+        yield content
 
 
 # """Not yet implemented!!!"""
@@ -159,32 +219,16 @@ async def generate_flashcards_topic(query: str, vid_id: str):
     """Handles both flashcards_full and flashcards_topic intents"""
     pass
 
-async def generate_quiz_full(transcript: str):
+async def generate_quiz_full(transcript: str, vid_id: Optional[str] = None):
     """Handles both quiz_full and quiz_topic intents"""
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
-        temperature=0.5,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-        api_key=os.getenv('GOOGLE_API_KEY')
-    )
     prompt_template = ChatPromptTemplate.from_template(TEMPLATE_FULL_QUIZ)
     prompt = prompt_template.invoke({
             "transcript": transcript,
         })
 
-    try:
-        print("\n--- Invoking LLM Stream---")
-        async for chunk in llm.astream(prompt):
-            content = chunk.content
-            if content:
-                yield content
-        print("\n--- LLM Response Completed---")
-    except Exception as e:
-        print(f"\n--- Error during LLM Invocation ---")
-        print(f"An error occurred: {e}")
-        yield f"\nAn error occurred while generating the response: {e}"
+    # The quiz prompt ignores the query, so every request for the video shares one entry
+    async for content in _cached_stream(vid_id, "quiz_full", "", 0.5, prompt):
+        yield content
 
 async def generate_quiz_topic(query: str, vid_id: str):
     """Handles both quiz_full and quiz_topic intents"""
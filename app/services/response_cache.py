@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+from sqlalchemy import and_, delete, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from app.models.response_cache import ResponseCacheEntry
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Configuration of the response cache ---
+RESPONSE_CACHE_MEMORY_ENTRIES = int(os.getenv("RESPONSE_CACHE_MEMORY_ENTRIES", "256"))
+RESPONSE_REPLAY_CHUNK_CHARS = int(os.getenv("RESPONSE_REPLAY_CHUNK_CHARS", "64"))
+
+def normalize_query(query: str) -> str:
+    """Lowercases, collapses whitespace and drops trailing punctuation so trivial variants share an entry."""
+    return " ".join(query.lower().split()).rstrip(" ?!.")
+
+def template_hash(template: str) -> str:
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+def response_cache_key(vid_id: str, intent: str, query: str, template_digest: str, model: str) -> str:
+    return hashlib.sha256("\x00".join((vid_id, intent, query, template_digest, model)).encode("utf-8")).hexdigest()
+
+async def replay(response: str, chunk_chars: int = RESPONSE_REPLAY_CHUNK_CHARS) -> AsyncIterator[str]:
+    """Streams a cached response in small pieces, like a live LLM stream."""
+    for start in range(0, len(response), chunk_chars):
+        yield response[start:start + chunk_chars]
+        await asyncio.sleep(0)
+
+class ResponseCache:
+    """
+    Exact-match cache of complete LLM responses, stored in the `response_cache`
+    table with an in-memory LRU in front of it.
+
+    Entries are keyed by `response_cache_key`. A changed template produces new
+    keys; `purge_stale_templates` deletes the rows left behind by old ones.
+    """
+    def __init__(self, engine: Engine, max_memory_entries: int = RESPONSE_CACHE_MEMORY_ENTRIES):
+        self.engine = engine
+        self.max_memory_entries = max_memory_entries
+        self._memory: "OrderedDict[str, tuple[str, str]]" = OrderedDict() # key -> (vid_id, response)
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def _remember(self, key: str, vid_id: str, response: str) -> None:
+        with self._lock:
+            self._memory[key] = (vid_id, response)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached response, or None on a miss. Blocking; call off the event loop."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+        with Session(self.engine) as session:
+            row = session.get(ResponseCacheEntry, key)
+        if row is None:
+            self.misses += 1
+            return None
+        self.db_hits += 1
+        self._remember(key, row.vid_id, row.response)
+        return row.response
+
+    def put(self, key: str, vid_id: str, intent: str, query: str, template_digest: str, model: str, response: str) -> None:
+        """Stores a complete response. Blocking; call off the event loop."""
+        stmt = insert(ResponseCacheEntry.__table__).values(
+            key=key, vid_id=vid_id, intent=intent, query=query,
+            template_hash=template_digest, model=model, response=response,
+            created_at=datetime.now()
+        ).on_conflict_do_nothing(index_elements=["key"])
+        with Session(self.engine) as session:
+            session.exec(stmt)
+            session.commit()
+        self._remember(key, vid_id, response)
+        self.stores += 1
+
+    def forget_video(self, vid_id: str) -> None:
+        """Drops a video's entries from memory. Its rows are deleted together with the chatroom."""
+        with self._lock:
+            for key in [k for k, (v, _) in self._memory.items() if v == vid_id]:
+                del self._memory[key]
+
+    def purge_stale_templates(self, current: Dict[str, str]) -> int:
+        """
+        Deletes entries of the given intents whose template hash is not the current one.
+
+        Args:
+            current: Current template hash per cached intent.
+
+        Returns:
+            The number of rows deleted.
+        """
+        if not current:
+            return 0
+        table = ResponseCacheEntry.__table__
+        stmt = delete(table).where(or_(*(
+            and_(table.c.intent == intent, table.c.template_hash != digest)
+            for intent, digest in current.items()
+        )))
+        with Session(self.engine) as session:
+            deleted = session.exec(stmt).rowcount
+            session.commit()
+        with self._lock:
+            self._memory.clear()
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "memory_entries": len(self._memory),
+        }
@@ -0,0 +1,129 @@
+import os
+import struct
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+import numpy as np
+
+# Compact storage of timestamped transcript segments (VidChat.segments_blob).
+#
+# Layout before zlib compression, little-endian:
+#   header     b"SEG1", uint32 n
+#   starts     float32[n]   seconds
+#   durations  float32[n]   seconds
+#   offsets    uint32[n+1]  byte offsets of each text in the blob
+#   blob       the UTF-8 texts, concatenated
+# float32 keeps start times to within a few milliseconds for videos up to ~10 hours.
+
+SEGMENT_COMPRESSION_LEVEL = int(os.getenv("SEGMENT_COMPRESSION_LEVEL", "6"))
+
+MAGIC = b"SEG1"
+HEADER = struct.Struct("<4sI")
+
+def encode_segments(segments: Sequence[Dict[str, Any]], level: int = SEGMENT_COMPRESSION_LEVEL) -> bytes:
+    """
+    Encodes segments as returned by `get_video_content` ({"text", "start",
+    "duration"} dicts, ordered by start).
+    """
+    n = len(segments)
+    starts = np.fromiter((s["start"] for s in segments), dtype="<f4", count=n)
+    durations = np.fromiter((s.get("duration", 0.0) for s in segments), dtype="<f4", count=n)
+    texts = [s["text"].encode("utf-8") for s in segments]
+    offsets = np.zeros(n + 1, dtype="<u4")
+    np.cumsum(np.fromiter(map(len, texts), dtype="<u4", count=n), out=offsets[1:])
+    payload = b"".join([HEADER.pack(MAGIC, n), starts.tobytes(), durations.tobytes(), offsets.tobytes(), *texts])
+    return zlib.compress(payload, level)
+
+def decode_segments(data: bytes) -> "SegmentView":
+    """
+    Decompresses an encoded blob into a `SegmentView`. This is the only copy
+    made; the arrays and texts of the view point into the decompressed buffer.
+
+    Raises:
+        ValueError: If the blob is not an encoded segment list.
+    """
+    try:
+        buffer = zlib.decompress(data)
+        magic, n = HEADER.unpack_from(buffer)
+    except (zlib.error, struct.error) as e:
+        raise ValueError(f"Not an encoded segment list: {e}") from e
+    if magic != MAGIC:
+        raise ValueError(f"Not an encoded segment list: unknown header {magic!r}")
+    pos = HEADER.size
+    starts = np.frombuffer(buffer, dtype="<f4", count=n, offset=pos)
+    pos += 4 * n
+    durations = np.frombuffer(buffer, dtype="<f4", count=n, offset=pos)
+    pos += 4 * n
+    offsets = np.frombuffer(buffer, dtype="<u4", count=n + 1, offset=pos)
+    pos += 4 * (n + 1)
+    if pos + int(offsets[-1]) != len(buffer):
+        raise ValueError("Not an encoded segment list: text blob length mismatch")
+    return SegmentView(memoryview(buffer)[pos:], starts, durations, offsets)
+
+class SegmentView:
+    """
+    Read-only sequence of {"text", "start", "duration"} dicts over a decoded
+    buffer, usable wherever the JSON segment list was.
+
+    `starts`, `durations` and the text offsets are numpy views into the buffer,
+    and texts are decoded only when an item is accessed. Slicing (by index or
+    with `slice_time`) returns another view over the same buffer.
+    """
+    __slots__ = ("_texts", "starts", "durations", "_offsets")
+
+    def __init__(self, texts: memoryview, starts: np.ndarray, durations: np.ndarray, offsets: np.ndarray):
+        self._texts = texts
+        self.starts = starts
+        self.durations = durations
+        self._offsets = offsets # len(starts) + 1 offsets into `texts`
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def text(self, i: int) -> str:
+        return str(self._texts[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Dict[str, Any], "SegmentView"]:
+        if isinstance(i, slice):
+            lo, hi, step = i.indices(len(self))
+            if step != 1:
+                raise ValueError("SegmentView slices must be contiguous.")
+            hi = max(lo, hi)
+            return SegmentView(self._texts, self.starts[lo:hi], self.durations[lo:hi], self._offsets[lo:hi + 1])
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("segment index out of range")
+        return {"text": self.text(i), "start": float(self.starts[i]), "duration": float(self.durations[i])}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def slice_time(self, start: Optional[float] = None, end: Optional[float] = None) -> "SegmentView":
+        """
+        The segments overlapping [start, end) seconds: from the first one still
+        running at `start` to the last one starting before `end`.
+        """
+        lo, hi = 0, len(self)
+        if end is not None:
+            hi = int(np.searchsorted(self.starts, end, side="left"))
+        if start is not None:
+            first_after = int(np.searchsorted(self.starts, start, side="right"))
+            # Captions may overlap, so any earlier segment can still be running
+            running = np.flatnonzero(self.starts[:first_after] + self.durations[:first_after] > start)
+            lo = int(running[0]) if len(running) else first_after
+        return self[lo:max(lo, hi)]
+
+    @property
+    def content(self) -> str:
+        """The plain-text transcript, as built at ingestion (texts joined by spaces)."""
+        return " ".join(self.text(i) for i in range(len(self)))
+
+    def to_list(self, precision: int = 3) -> List[Dict[str, Any]]:
+        """JSON-ready dicts, with times rounded to hide float32 noise."""
+        starts = np.round(self.starts.astype(np.float64), precision).tolist()
+        durations = np.round(self.durations.astype(np.float64), precision).tolist()
+        return [
+            {"text": self.text(i), "start": starts[i], "duration": durations[i]}
+            for i in range(len(self))
+        ]
@@ -0,0 +1,168 @@
+import asyncio
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from langchain_core.prompts import ChatPromptTemplate
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+from app.db.session import engine
+from app.models.section_summary import SectionSummary
+from app.services.llm_registry import LLMRegistry, FLASH_MODEL
+from app.services.response_cache import template_hash
+from app.services.templates.summarization import TEMPLATE_SECTION_SUMMARY
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Configuration of the map-reduce summarizer ---
+# Transcripts up to this size are summarized in a single prompt; longer ones are
+# split into sections of about this size that are summarized separately (map)
+# and then combined (reduce).
+SUMMARY_SECTION_CHARS = int(os.getenv("SUMMARY_SECTION_CHARS", "24000"))
+SUMMARY_MAP_CONCURRENCY = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4")) # Concurrent section calls per video
+SUMMARY_MAP_MODEL = os.getenv("SUMMARY_MAP_MODEL", FLASH_MODEL)
+SUMMARY_MAP_TEMPERATURE = 0.3
+# Stored section summaries are reused only while the template, the model and the
+# section size (which decides where sections start and end) all stay the same
+SECTION_TEMPLATE_HASH = template_hash(f"{TEMPLATE_SECTION_SUMMARY}\x00{SUMMARY_MAP_MODEL}\x00{SUMMARY_SECTION_CHARS}")
+
+class TranscriptSection:
+    def __init__(self, index: int, text: str, start: Optional[float], end: Optional[float]):
+        self.index = index
+        self.text = text
+        self.start = start # seconds, None when the transcript has no timestamps
+        self.end = end
+
+def _format_time(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def _section_label(section: TranscriptSection) -> str:
+    if section.start is None:
+        return f"Section {section.index + 1}"
+    return f"Section {section.index + 1}, {_format_time(section.start)} - {_format_time(section.end)}"
+
+def split_sections(transcript: str, segments: Optional[Sequence[Dict[str, Any]]], max_chars: int = SUMMARY_SECTION_CHARS) -> List[TranscriptSection]:
+    """
+    Splits a transcript into consecutive sections of at most about `max_chars`.
+
+    Sections follow segment boundaries (and carry start/end times) when the
+    timestamped segments are available, otherwise word boundaries of the text.
+    """
+    sections: List[TranscriptSection] = []
+    if segments:
+        group: List[Dict[str, Any]] = []
+        length = 0
+
+        def emit():
+            first, last = group[0], group[-1]
+            text = " ".join(seg["text"] for seg in group)
+            sections.append(TranscriptSection(len(sections), text, first["start"], last["start"] + last.get("duration", 0.0)))
+
+        for segment in segments:
+            if group and length + len(segment["text"]) + 1 > max_chars:
+                emit()
+                group, length = [], 0
+            group.append(segment)
+            length += len(segment["text"]) + 1
+        if group:
+            emit()
+        return sections
+
+    words = transcript.split()
+    current: List[str] = []
+    length = 0
+    for word in words:
+        if current and length + len(word) + 1 > max_chars:
+            sections.append(TranscriptSection(len(sections), " ".join(current), None, None))
+            current, length = [], 0
+        current.append(word)
+        length += len(word) + 1
+    if current:
+        sections.append(TranscriptSection(len(sections), " ".join(current), None, None))
+    return sections
+
+def needs_map_reduce(transcript: str) -> bool:
+    return len(transcript) > SUMMARY_SECTION_CHARS
+
+def _load_section_summaries(vid_id: str) -> Dict[int, SectionSummary]:
+    with Session(engine) as session:
+        rows = session.exec(select(SectionSummary).where(SectionSummary.vid_id == vid_id)).all()
+    return {row.section_index: row for row in rows}
+
+def _store_section_summaries(rows: List[Dict[str, Any]]) -> None:
+    table = SectionSummary.__table__
+    stmt = insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["vid_id", "section_index"],
+        set_={c: stmt.excluded[c] for c in ("start", "end", "summary", "template_hash", "model", "created_at")}
+    )
+    with Session(engine) as session:
+        session.exec(stmt)
+        session.commit()
+
+async def map_sections(
+    llm: LLMRegistry,
+    vid_id: Optional[str],
+    transcript: str,
+    segments: Optional[Sequence[Dict[str, Any]]],
+    force: bool = False,
+) -> List[str]:
+    """
+    Returns one summary per transcript section, in order.
+
+    Summaries stored for the video with the current section template and model
+    are reused; missing or outdated ones are generated concurrently (at most
+    SUMMARY_MAP_CONCURRENCY at a time) and stored. Nothing is stored when
+    `vid_id` is None.
+
+    Args:
+        llm: The shared LLM registry.
+        vid_id: The video the transcript belongs to.
+        transcript: The plain-text transcript.
+        segments: The timestamped segments, if available.
+        force: Regenerate every section even if a stored summary is usable.
+
+    Raises:
+        Exception: If a section could not be summarized.
+    """
+    sections = split_sections(transcript, segments)
+    stored = {} if force or vid_id is None else await asyncio.to_thread(_load_section_summaries, vid_id)
+    summaries: Dict[int, str] = {
+        s.index: stored[s.index].summary for s in sections
+        if s.index in stored
+        and stored[s.index].template_hash == SECTION_TEMPLATE_HASH
+    }
+    missing = [s for s in sections if s.index not in summaries]
+    if missing:
+        print(f"Summarizing {len(missing)} of {len(sections)} section(s) for '{vid_id}'.")
+        prompt_template = ChatPromptTemplate.from_template(TEMPLATE_SECTION_SUMMARY)
+        semaphore = asyncio.Semaphore(SUMMARY_MAP_CONCURRENCY)
+
+        async def summarize(section: TranscriptSection) -> str:
+            prompt = prompt_template.invoke({
+                "section_number": section.index + 1,
+                "section_count": len(sections),
+                "time_range": f"{_format_time(section.start)} - {_format_time(section.end)}" if section.start is not None else "untimed",
+                "transcript": section.text,
+            })
+            async with semaphore:
+                return await llm.ainvoke(SUMMARY_MAP_MODEL, SUMMARY_MAP_TEMPERATURE, prompt)
+
+        results = await asyncio.gather(*(summarize(s) for s in missing))
+        for section, summary in zip(missing, results):
+            summaries[section.index] = summary
+        if vid_id is not None:
+            await asyncio.to_thread(_store_section_summaries, [
+                {
+                    "vid_id": vid_id,
+                    "section_index": s.index,
+                    "start": s.start,
+                    "end": s.end,
+                    "summary": summaries[s.index],
+                    "template_hash": SECTION_TEMPLATE_HASH,
+                    "model": SUMMARY_MAP_MODEL,
+                    "created_at": datetime.now(),
+                } for s in missing
+            ])
+    return [f"[{_section_label(s)}]\n{summaries[s.index]}" for s in sections]
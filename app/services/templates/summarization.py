@@ -72,4 +72,45 @@ TEMPLATE_RAG_SUMMARY = """
     ---
 
     Response:
-"""
\ No newline at end of file
+"""
+TEMPLATE_SECTION_SUMMARY = """
+    You are an AI assistant writing study notes for one section of a longer YouTube video.
+
+    Section {section_number} of {section_count} ({time_range}):
+    {transcript}
+
+    Task:
+    Write dense notes on this section only. They will later be combined with the notes of the other sections, so:
+    1. Cover every main point, definition, example, number and conclusion in the order they appear.
+    2. Keep technical terms, names and acronyms exactly as spoken.
+    3. Do not add an introduction or conclusion, and do not refer to "this section".
+    4. Use only the section's content. Do not add external information.
+    5. Stay under 250 words.
+
+    Notes:
+"""
+
+TEMPLATE_REDUCE_SUMMARY = """
+    You are an AI assistant specializing in summarizing text based on specific user requests.
+
+    Section Notes (in video order, each covering one part of the video):
+    {section_summaries}
+
+    User's Summarization Request:
+    {user_query}
+
+    Task:
+    Generate a summary or response for the whole video, based on the "Section Notes", that directly addresses the "User's Summarization Request".
+
+    Guidelines:
+    1. Treat the notes together as the full content of the video.
+    2. Understand the specific focus or type of summary requested in the "User's Summarization Request" (e.g., key takeaways, specific reasons, highlights, TL;DR, general overview).
+    3. Combine information across sections instead of summarizing them one by one, unless the request asks for a section-by-section breakdown.
+    4. Ensure the response is concise, accurate, and based *only* on the notes. Do not add external information.
+    5. If the request is very general (like "summarize this"), provide a balanced summary of the main points.
+    6. Match the tone of the response to the request (e.g., a TL;DR should be very brief).
+
+    ---
+
+    Response:
+"""
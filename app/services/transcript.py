@@ -1,43 +1,65 @@
-import requests
-from bs4 import BeautifulSoup
-from typing import List
+from collections import deque
+from typing import List, Dict, Any, Tuple, Optional
 from youtube_transcript_api import YouTubeTranscriptApi
 from pytube import Playlist
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from app.services.video_metadata import fetch_video_metadata_sync
+from app.services.transcript_cache import transcript_cache
+from app.utils.yt_utils import is_valid_video_id
 
 VID_PREFIX = 'https://www.youtube.com/watch?v='
 LIST_PREFIX = 'https://www.youtube.com/playlist?list='
 MALFORMED_ERROR = "The provided URL is malformed."
 MISSING_ERROR = 'The provided URL is not present.'
+CHUNK_SIZE = 300 # characters
+CHUNK_OVERLAP = 30 # characters shared by consecutive chunks
 
 class Transcript:
-    def __init__(self, url: str, id: str, title: str, content: str, chunks: List[str]):
+    def __init__(
+        self,
+        url: str,
+        id: str,
+        title: str,
+        content: str,
+        chunks: List[str],
+        segments: List[Dict[str, Any]],
+        chunk_meta: Optional[List[Dict[str, Any]]] = None
+    ):
         self.url = url
         self.vid_id = id
         self.vid_title = title
         self.content = content
         self.chunks = chunks
+        self.segments = segments # Timestamped segments as returned by get_video_content
+        # Stored as TextChunk.meta; chunk_index is the chunk's position in the transcript
+        self.chunk_meta = chunk_meta or [{"chunk_index": i} for i in range(len(chunks))]
 
 def get_video_title(url: str):
     """Gets the video title from the given YouTube link."""
     assert url, MISSING_ERROR
-    assert url.startswith(VID_PREFIX), MALFORMED_ERROR
+    vid_id = get_video_id(url)
     try:
-        r = requests.get(url, timeout=10)
-        soup = BeautifulSoup(r.text, 'html.parser')
-        title_tag = soup.find('title')
-        return title_tag.text.split(' - YouTube')[0]
+        return fetch_video_metadata_sync(vid_id).title
     except Exception as e:
         print(f"Failed to fetch title for {url}: {e}")
         return ""
 
 def get_video_id(url: str):
-    """Gets the video id from the given YouTube link."""
+    """
+    Gets the video id from the given YouTube link.
+
+    Raises:
+        ValueError: If the id is not a well-formed YouTube video id. It ends up
+            in file paths and URLs, so nothing else may get through.
+    """
     assert url, MISSING_ERROR
     assert url.startswith(VID_PREFIX), MALFORMED_ERROR
-    return url.split(VID_PREFIX)[1].split('&')[0]
+    vid_id = url.split(VID_PREFIX)[1].split('&')[0]
+    if not is_valid_video_id(vid_id):
+        raise ValueError(MALFORMED_ERROR)
+    return vid_id
 
 def get_playlist_title(url: str):
     """Gets the playlist id from the given YouTube link."""
@@ -46,9 +68,16 @@ def get_playlist_title(url: str):
     return Playlist(url).title
 
 def get_video_content(vid_id: str):
-    """Gets the video transcript from the given YouTube link."""
+    """Gets the video transcript from the given YouTube link, reusing the on-disk cache when possible."""
+    cached = transcript_cache.get(vid_id)
+    if cached is not None:
+        return cached
     client = YouTubeTranscriptApi()
     t = client.get_transcript(vid_id)
+    try:
+        transcript_cache.put(vid_id, t)
+    except OSError as e:
+        print(f"Failed to cache transcript for {vid_id}: {e}")
     return t
 
 def chunk(text: str, chunk_size: int, chunk_overlap: int):
@@ -60,16 +89,91 @@ def chunk(text: str, chunk_size: int, chunk_overlap: int):
     )
     return list(map(lambda x: x.replace('\n', ' '), text_splitter.split_text(text)))
 
+def chunk_segments(segments: List[Dict[str, Any]], chunk_size: int, chunk_overlap: int) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Chunks timestamped transcript segments in a single pass over their words.
+
+    Chunks are at most `chunk_size` characters and split on word boundaries.
+    Each chunk after the first starts with the trailing words of the previous
+    one that fit in `chunk_overlap` characters. Words longer than `chunk_size`
+    are cut into pieces.
+
+    Returns:
+        The chunk texts and, per chunk, its meta: `chunk_index`, `start`/`end`
+        in seconds, and `segment_start`/`segment_end`, the inclusive range of
+        segment indices the chunk covers.
+    """
+    chunks: List[str] = []
+    metas: List[Dict[str, Any]] = []
+    window = deque() # (word, segment index) of the chunk being built
+    length = 0 # characters of the window's words joined by single spaces
+
+    def emit():
+        first, last = window[0][1], window[-1][1]
+        chunks.append(" ".join(w for w, _ in window))
+        metas.append({
+            "chunk_index": len(metas),
+            "start": segments[first]["start"],
+            "end": segments[last]["start"] + segments[last].get("duration", 0.0),
+            "segment_start": first,
+            "segment_end": last,
+        })
+
+    for seg_index, segment in enumerate(segments):
+        for word in segment["text"].split():
+            pieces = [word[i:i + chunk_size] for i in range(0, len(word), chunk_size)]
+            for piece in pieces:
+                added = len(piece) + (1 if window else 0)
+                if window and length + added > chunk_size:
+                    emit()
+                    # Keep the longest tail of words that fits in the overlap and leaves room for `piece`
+                    tail_budget = min(chunk_overlap, chunk_size - len(piece) - 1)
+                    while window and length > tail_budget:
+                        w, _ = window.popleft()
+                        length -= len(w) + (1 if window else 0)
+                    added = len(piece) + (1 if window else 0)
+                window.append((piece, seg_index))
+                length += added
+    if window:
+        emit()
+    return chunks, metas
+
 def build_transcript_from_url(url: str):
     assert url, MISSING_ERROR
     assert url.startswith(VID_PREFIX), MALFORMED_ERROR
     vid_id = get_video_id(url)
     vid_name = get_video_title(url)
-    vid_content = ' '.join(map(lambda x: x['text'], get_video_content(vid_id)))
-    chunks = chunk(vid_content, 300, 30)
-    return Transcript(url, vid_id, vid_name, vid_content, chunks)
+    segments = get_video_content(vid_id)
+    vid_content = ' '.join(map(lambda x: x['text'], segments))
+    chunks, chunk_meta = chunk_segments(segments, CHUNK_SIZE, CHUNK_OVERLAP)
+    return Transcript(url, vid_id, vid_name, vid_content, chunks, segments, chunk_meta)
 
-def load_pipeline(url: str, is_list: bool):
+def load_playlist(url: str, max_workers: int = 12) -> Tuple[List[Transcript], Dict[str, str]]:
+    """
+    Builds transcripts for every video of a playlist with at most `max_workers` concurrent fetches.
+
+    Returns:
+        The transcripts that were built, and a mapping of video URL to error for the ones that failed.
+    """
+    assert url, MISSING_ERROR
+    assert url.startswith(LIST_PREFIX) and len(url) > len(LIST_PREFIX), MALFORMED_ERROR
+    playlist = Playlist(url)
+    lst = list()
+    errors = dict()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(build_transcript_from_url, vid): vid for vid in playlist}
+        for future in as_completed(futures):
+            try:
+                transcript_data = future.result()
+            except Exception as e:
+                print(f"Failed to build transcript for {futures[future]}: {e}")
+                errors[futures[future]] = str(e)
+                continue
+            if transcript_data:
+                lst.append(transcript_data)
+    return lst, errors
+
+def load_pipeline(url: str, is_list: bool, max_workers: int = 12):
     """Loads the provided url through the pipeline to create actual transcript intstances."""
     assert url, MISSING_ERROR
     assert (
@@ -79,14 +183,7 @@ def load_pipeline(url: str, is_list: bool):
     ), MALFORMED_ERROR
 
     if is_list:
-        playlist = Playlist(url)
-        lst = list()
-        with ThreadPoolExecutor(max_workers=12) as executor:
-            futures = [executor.submit(build_transcript_from_url, vid) for vid in playlist]
-            for future in as_completed(futures):
-                transcript_data = future.result()
-                if transcript_data:
-                    lst.append(transcript_data)
+        lst, _ = load_playlist(url, max_workers)
         return lst
     transcript_data = build_transcript_from_url(url)
     return transcript_data
\ No newline at end of file
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from app.utils.yt_utils import is_valid_video_id
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Configuration of the transcript cache ---
+TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", ".cache/transcripts")
+TRANSCRIPT_CACHE_MAX_BYTES = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+DIGEST_RE = re.compile(r"[0-9a-f]{64}")
+
+class TranscriptCache:
+    """
+    Content-addressed on-disk cache of raw transcript segments.
+
+    Segment lists are stored once under the SHA-256 of their serialized form in
+    `objects/`, and `refs/<sha256(vid_id)>` points a video at its object. Only
+    well-formed video ids are accepted, and ref file names are hashes, so no
+    id can reach outside the cache directory. Objects are
+    evicted least-recently-used first (by mtime, refreshed on every read) once
+    the total size exceeds `max_bytes`.
+    """
+    def __init__(self, root: str | Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.objects_dir = self.root / "objects"
+        self.refs_dir = self.root / "refs"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.refs_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / f"{digest}.json"
+
+    def _ref_path(self, vid_id: str) -> Path:
+        if not is_valid_video_id(vid_id):
+            raise ValueError(f"Invalid video id: {vid_id!r}")
+        return self.refs_dir / hashlib.sha256(vid_id.encode("ascii")).hexdigest()
+
+    def get(self, vid_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns the cached segments for a video, or None on a miss.
+
+        Raises:
+            ValueError: If `vid_id` is not a well-formed video id.
+        """
+        ref = self._ref_path(vid_id)
+        try:
+            digest = ref.read_text().strip()
+            if not DIGEST_RE.fullmatch(digest):
+                raise FileNotFoundError(ref)
+            path = self._object_path(digest)
+            data = path.read_bytes()
+            os.utime(path) # Mark as recently used for eviction
+        except FileNotFoundError:
+            # Either never cached, or the object was evicted under the ref; a
+            # dangling ref is simply overwritten by the next put
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(data)
+
+    def put(self, vid_id: str, segments: List[Dict[str, Any]]) -> None:
+        """
+        Stores the segments for a video and evicts old objects if over budget.
+
+        Raises:
+            ValueError: If `vid_id` is not a well-formed video id.
+        """
+        ref = self._ref_path(vid_id)
+        data = json.dumps(segments, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if path.exists():
+            os.utime(path)
+        else:
+            self._write_atomic(path, data)
+        self._write_atomic(ref, digest.encode("ascii"))
+        self.evict()
+
+    def evict(self) -> None:
+        """Deletes least recently used objects until the cache fits in `max_bytes`."""
+        with self._lock:
+            entries = []
+            total = 0
+            for path in self.objects_dir.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+transcript_cache = TranscriptCache(TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_MAX_BYTES)
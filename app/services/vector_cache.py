@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Configuration of the per-video vector cache ---
+VECTOR_CACHE_MAX_BYTES = int(os.getenv("VECTOR_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Larger videos stay in Postgres. VectorStore never caches more than its
+# EXACT_SCAN_MAX_CHUNKS, so videos the planner sends to HNSW are not held in memory.
+VECTOR_CACHE_MAX_CHUNKS = int(os.getenv("VECTOR_CACHE_MAX_CHUNKS", "10000"))
+VECTOR_CACHE_TTL = float(os.getenv("VECTOR_CACHE_TTL", "300")) # seconds
+
+class VideoMatrix:
+    """All chunks of one video: a contiguous float32 (n, dim) matrix plus row-aligned ids, texts and meta."""
+    def __init__(self, ids: List[Any], texts: List[str], meta: List[Optional[Dict[str, Any]]], matrix: np.ndarray):
+        self.ids = ids
+        self.texts = texts
+        self.meta = meta
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.nbytes = self.matrix.nbytes + sum(len(t) for t in texts) + 64 * len(ids)
+        self.loaded_at = time.monotonic()
+
+    def top_k(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-k by dot product (embeddings are normalized, so this is cosine similarity).
+
+        Returns:
+            Row indices and their similarities, most similar first.
+        """
+        n = self.matrix.shape[0]
+        if n == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = self.matrix @ np.asarray(query, dtype=np.float32)
+        k = min(k, n)
+        if k < n:
+            idx = np.argpartition(-scores, k - 1)[:k]
+        else:
+            idx = np.arange(n)
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+        return idx, scores[idx]
+
+class VideoMatrixCache:
+    """
+    LRU cache of VideoMatrix entries keyed by vid_id, bounded by a memory budget.
+
+    Every invalidation bumps a per-video generation; a load that started before
+    the invalidation is discarded by `put` instead of caching stale rows.
+
+    Invalidation is process-local: inserts and deletes made by another process
+    (another uvicorn worker, a script) are not seen here. Entries therefore
+    expire after `ttl` seconds, which bounds how stale a matrix can get when
+    several processes write to the same database.
+    """
+    def __init__(self, max_bytes: int = VECTOR_CACHE_MAX_BYTES, ttl: float = VECTOR_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._data: "OrderedDict[str, VideoMatrix]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0 # Bumped by clear()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.expirations = 0
+
+    def get(self, vid_id: str) -> Optional[VideoMatrix]:
+        with self._lock:
+            entry = self._data.get(vid_id)
+            if entry is not None and time.monotonic() - entry.loaded_at > self.ttl:
+                del self._data[vid_id]
+                self.bytes -= entry.nbytes
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(vid_id)
+            self.hits += 1
+            return entry
+
+    def generation(self, vid_id: str) -> Tuple[int, int]:
+        with self._lock:
+            return self._epoch, self._generations.get(vid_id, 0)
+
+    def put(self, vid_id: str, entry: VideoMatrix, generation: Tuple[int, int]) -> bool:
+        """Caches `entry` if the video wasn't invalidated since `generation` was read and it fits the budget."""
+        if entry.nbytes > self.max_bytes:
+            return False
+        with self._lock:
+            if (self._epoch, self._generations.get(vid_id, 0)) != generation:
+                return False
+            old = self._data.pop(vid_id, None)
+            if old is not None:
+                self.bytes -= old.nbytes
+            self._data[vid_id] = entry
+            self.bytes += entry.nbytes
+            self.loads += 1
+            while self.bytes > self.max_bytes and self._data:
+                _, evicted = self._data.popitem(last=False)
+                self.bytes -= evicted.nbytes
+                self.evictions += 1
+            return True
+
+    def invalidate(self, vid_id: str) -> None:
+        with self._lock:
+            self._generations[vid_id] = self._generations.get(vid_id, 0) + 1
+            old = self._data.pop(vid_id, None)
+            if old is not None:
+                self.bytes -= old.nbytes
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "expirations": self.expirations,
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
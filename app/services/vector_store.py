@@ -1,9 +1,21 @@
+import asyncio
 import uuid
-from typing import List, Dict, Any, Optional
-from app.services.embeddings import SentenceTransformerEmbedding
-from sqlalchemy.dialects.postgresql import JSONB
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from app.services.embeddings import create_embedding_backend
+from app.services.embedding_cache import CachedEmbedding
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlmodel import SQLModel, Field, Column, Session, text, create_engine
+from sqlalchemy import insert, event, Computed, Index
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from pgvector.sqlalchemy import Vector
+from pgvector.asyncpg import register_vector
+from app.db.session import to_async_url
+from app.services.bulk_loader import build_chunk_records, copy_chunk_records
+from app.utils.cache import TTLCache
+from app.services.vector_cache import VideoMatrix, VideoMatrixCache, VECTOR_CACHE_MAX_CHUNKS
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,20 +24,157 @@ load_dotenv()
 EMBEDDING_DIMENSION = 768
 DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
 DEFAULT_INDEX_NAME = "embeddings_index_basic" 
+# HNSW index settings. The index itself is built by the Alembic migrations from
+# the same environment variables; the opclass decides the distance operator.
+# Embeddings are normalized, so inner product ranks exactly like cosine/L2 and is cheapest.
+HNSW_OPCLASS = os.getenv("HNSW_OPCLASS", "vector_ip_ops")
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "64"))
+DISTANCE_OPERATORS = {
+    "vector_l2_ops": "<->",
+    "vector_ip_ops": "<#>", # negative inner product, so ascending order still means most similar first
+    "vector_cosine_ops": "<=>",
+}
+if HNSW_OPCLASS not in DISTANCE_OPERATORS:
+    raise ValueError(f"Unsupported HNSW_OPCLASS '{HNSW_OPCLASS}'. Expected one of {list(DISTANCE_OPERATORS)}.")
+DISTANCE_OPERATOR = DISTANCE_OPERATORS[HNSW_OPCLASS]
+# Full-text search used by the lexical half of hybrid retrieval
+TEXT_SEARCH_CONFIG = "english"
+TEXT_SEARCH_INDEX_NAME = "ix_chunk_text_tsv"
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "30")) # Results taken from each retriever before fusion
+RRF_K = int(os.getenv("RRF_K", "60"))
+# Search planning: videos with at most this many chunks are scanned exactly
+# through the vid_id index; larger ones go through HNSW with iterative scans
+# (pgvector >= 0.8, set HNSW_ITERATIVE_SCAN=off on older servers).
+EXACT_SCAN_MAX_CHUNKS = int(os.getenv("EXACT_SCAN_MAX_CHUNKS", "10000"))
+# Only videos the planner would scan exactly are kept as in-memory matrices
+MATRIX_CACHE_MAX_CHUNKS = min(VECTOR_CACHE_MAX_CHUNKS, EXACT_SCAN_MAX_CHUNKS)
+HNSW_ITERATIVE_SCAN = os.getenv("HNSW_ITERATIVE_SCAN", "relaxed_order")
+CHUNK_COUNT_CACHE_TTL = float(os.getenv("CHUNK_COUNT_CACHE_TTL", "600")) # seconds
+# Batch size used when embedding chunks of many videos together (bulk ingestion)
+BULK_EMBEDDING_BATCH_SIZE = int(os.getenv("BULK_EMBEDDING_BATCH_SIZE", "256"))
+# Async connection pool and the executor that runs encoding off the event loop
+VECTOR_DB_POOL_SIZE = int(os.getenv("VECTOR_DB_POOL_SIZE", "10"))
+VECTOR_DB_MAX_OVERFLOW = int(os.getenv("VECTOR_DB_MAX_OVERFLOW", "10"))
+EMBEDDING_EXECUTOR_WORKERS = int(os.getenv("EMBEDDING_EXECUTOR_WORKERS", "2"))
 
 # --- SQLModel Definition ---
 class TextChunk(SQLModel, table=True):
     __tablename__ = "chunk"
     # Add table_args for the new index
-    __table_args__ = {
-        'extend_existing': True,
-
-    }
+    __table_args__ = (
+        Index(TEXT_SEARCH_INDEX_NAME, "text_tsv", postgresql_using="gin"),
+        {'extend_existing': True},
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     text: str
     vid_id: str = Field(index=True, nullable=False)
     embedding: Optional[List[float]] = Field(default=None, sa_column=Column(Vector(EMBEDDING_DIMENSION)))
     meta: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONB))
+    # Generated by Postgres on every insert (COPY included), never written by the app
+    text_tsv: Optional[str] = Field(
+        default=None,
+        sa_column=Column(TSVECTOR, Computed(f"to_tsvector('{TEXT_SEARCH_CONFIG}', text)", persisted=True))
+    )
+
+def _ef_search_stmt(ef_search: int) -> str:
+    # SET does not accept bind parameters; LOCAL scopes it to the current transaction
+    return f"SET LOCAL hnsw.ef_search = {int(ef_search)}"
+
+PLAN_EXACT = "exact"
+PLAN_HNSW = "hnsw"
+
+# Exact scan: the MATERIALIZED CTE forces the vid_id filter to run first, so the
+# HNSW index (which knows nothing about vid_id) can't be picked for the ORDER BY.
+EXACT_SEARCH_SQL = f"""
+    WITH candidates AS MATERIALIZED (
+        SELECT id, text, meta, embedding
+        FROM {TextChunk.__tablename__}
+        WHERE vid_id = :vid_id
+    )
+    SELECT
+        id,
+        text,
+        meta,
+        embedding {DISTANCE_OPERATOR} CAST(:embedding AS vector) AS distance
+    FROM candidates
+    ORDER BY distance ASC
+    LIMIT :limit
+"""
+
+# Approximate scan through HNSW. With iterative scans results can come back
+# slightly out of order, hence the outer re-sort.
+HNSW_SEARCH_SQL = f"""
+    SELECT * FROM (
+        SELECT
+            id,
+            text,
+            meta,
+            embedding {DISTANCE_OPERATOR} CAST(:embedding AS vector) AS distance
+        FROM {TextChunk.__tablename__}
+        WHERE vid_id = :vid_id
+        ORDER BY distance ASC
+        LIMIT :limit
+    ) AS nearest
+    ORDER BY distance ASC
+"""
+
+LEXICAL_SEARCH_SQL = f"""
+    SELECT
+        id,
+        text,
+        meta,
+        ts_rank_cd(text_tsv, query) AS rank
+    FROM {TextChunk.__tablename__}, websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', :query) AS query
+    WHERE vid_id = :vid_id AND text_tsv @@ query
+    ORDER BY rank DESC
+    LIMIT :limit
+"""
+
+CHUNK_COUNT_SQL = f"SELECT count(*) FROM {TextChunk.__tablename__} WHERE vid_id = :vid_id"
+
+def _distance_from_similarity(similarity: np.ndarray) -> np.ndarray:
+    """Converts dot-product similarities of normalized vectors into the configured operator's distance."""
+    if DISTANCE_OPERATOR == "<#>":
+        return -similarity
+    if DISTANCE_OPERATOR == "<=>":
+        return 1.0 - similarity
+    return np.sqrt(np.clip(2.0 - 2.0 * similarity, 0.0, None))
+
+def _as_array(embedding) -> np.ndarray:
+    # Depending on the pgvector version the asyncpg codec yields ndarrays or Vector objects
+    if hasattr(embedding, "to_numpy"):
+        embedding = embedding.to_numpy()
+    return np.asarray(embedding, dtype=np.float32)
+
+def _plan_sql(plan: str) -> str:
+    return HNSW_SEARCH_SQL if plan == PLAN_HNSW else EXACT_SEARCH_SQL
+
+def _plan_setup_stmts(plan: str, limit: int, ef_search: Optional[int]) -> List[str]:
+    """Session settings to apply (with SET LOCAL) before running `plan`."""
+    if plan != PLAN_HNSW:
+        return []
+    # ef_search below limit would cap the number of rows HNSW can return
+    stmts = [_ef_search_stmt(max(ef_search or 40, limit))]
+    if HNSW_ITERATIVE_SCAN != "off":
+        stmts.append(f"SET LOCAL hnsw.iterative_scan = {HNSW_ITERATIVE_SCAN}")
+    return stmts
+
+def reciprocal_rank_fusion(rankings: List[List[Dict[str, Any]]], limit: int, k: int = RRF_K) -> List[Dict[str, Any]]:
+    """
+    Merges ranked result lists: each result scores sum(1 / (k + rank)) over the lists it appears in.
+
+    Args:
+        rankings: Result lists, each best-first, whose rows carry an 'id'.
+        limit: Number of fused results to return.
+        k: Damping constant; larger values flatten the advantage of top ranks.
+    """
+    fused: Dict[Any, Dict[str, Any]] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, start=1):
+            entry = fused.setdefault(row["id"], {**row, "score": 0.0})
+            entry["score"] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda r: r["score"], reverse=True)[:limit]
 
 # --- Vector Store Implementation ---
 class VectorStore:
@@ -38,7 +187,28 @@ class VectorStore:
             embedding_model_name: Name of the Sentence Transformer model to use.
         """
         self.engine = create_engine(connection_string)
-        self.embedding_model = SentenceTransformerEmbedding(model_name=embedding_model_name)
+        self.async_engine: AsyncEngine = create_async_engine(
+            to_async_url(connection_string),
+            pool_size=VECTOR_DB_POOL_SIZE,
+            max_overflow=VECTOR_DB_MAX_OVERFLOW,
+            pool_pre_ping=True,
+        )
+
+        @event.listens_for(self.async_engine.sync_engine, "connect")
+        def _register_vector(dbapi_connection, connection_record):
+            # Lets asyncpg send and receive vectors in binary form
+            dbapi_connection.run_async(register_vector)
+
+        self._executor = ThreadPoolExecutor(max_workers=EMBEDDING_EXECUTOR_WORKERS, thread_name_prefix="vector-store")
+        # Per-video chunk counts used by the search planner
+        self._chunk_counts = TTLCache(maxsize=100_000, ttl=CHUNK_COUNT_CACHE_TTL)
+        # Per-video embedding matrices for exact in-memory search
+        self.matrix_cache = VideoMatrixCache()
+        # Queries hit an in-memory LRU, chunks a persistent store, before reaching the model
+        self.embedding_model: CachedEmbedding = CachedEmbedding(
+            create_embedding_backend(embedding_model_name),
+            engine=self.engine
+        )
         # Verify model dimension matches hardcoded dimension
         actual_dim = self.embedding_model.get_embedding_dimension()
         if actual_dim != EMBEDDING_DIMENSION:
@@ -60,20 +230,17 @@ class VectorStore:
                 # Create table and regular indexes (like on vid_id) based on model definition
                 SQLModel.metadata.create_all(self.engine)
 
-                # --- Only check/create the VECTOR index here ---
-                vector_index_check_stmt = text(f"SELECT 1 FROM pg_indexes WHERE indexname = '{DEFAULT_INDEX_NAME}'")
-                vector_index_exists = session.exec(vector_index_check_stmt).scalar_one_or_none()
-
-                if not vector_index_exists:
-                    print(f"Attempting to create vector index '{DEFAULT_INDEX_NAME}'...")
-                    create_vector_index_stmt = text(f"""
-                        CREATE INDEX {DEFAULT_INDEX_NAME}
-                        ON {TextChunk.__tablename__}
-                        USING hnsw (embedding vector_l2_ops);
-                    """)
-                    session.exec(create_vector_index_stmt)
-                    session.commit()
-                    print(f"Vector index '{DEFAULT_INDEX_NAME}' created successfully.")
+                # --- Only check the VECTOR index here; it is created by the Alembic migrations ---
+                vector_index_check_stmt = text(f"SELECT indexdef FROM pg_indexes WHERE indexname = '{DEFAULT_INDEX_NAME}'")
+                vector_index_def = session.exec(vector_index_check_stmt).scalar_one_or_none()
+
+                if not vector_index_def:
+                    print(f"WARNING: Vector index '{DEFAULT_INDEX_NAME}' is missing. Run `alembic upgrade head`.")
+                elif HNSW_OPCLASS not in vector_index_def:
+                    print(
+                        f"WARNING: Vector index '{DEFAULT_INDEX_NAME}' does not use {HNSW_OPCLASS}; "
+                        f"searches with '{DISTANCE_OPERATOR}' will not use it. Rebuild it with the migrations."
+                    )
                 else:
                     print(f"Vector index '{DEFAULT_INDEX_NAME}' already exists.")
                 # --- End Vector Index Check ---
@@ -133,52 +300,95 @@ class VectorStore:
             with Session(self.engine) as session:
                 session.add_all(chunks_to_insert)
                 session.commit()
+                self._invalidate_video(vid_id)
                 print(f"Inserted {len(chunks_to_insert)} chunks into the database...")
         except Exception as db_err:
             print(f"Database error during bulk insertion: {db_err}")
 
-    def similarity_search(self, query: str, vid_id: str, limit: int = 15) -> List[Dict[str, Any]]:
+    def similarity_search(
+        self,
+        query: str,
+        vid_id: str,
+        limit: int = 15,
+        query_embedding: Optional[np.ndarray] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Perform a similarity search using a query string.
 
         Args:
             query: The query text.
             limit: Maximum number of results to return.
+            query_embedding: Precomputed embedding of `query` (e.g. from the EmbeddingBatcher).
+            ef_search: HNSW candidate list size for this query; higher trades latency for recall.
+                       Uses the server default when None.
 
         Returns:
             List of dictionaries, each containing 'id', 'text', 'meta', and 'distance'.
             Sorted by distance (ascending - lower is more similar).
         """
-        q_emb = self.embedding_model.create_embeddings(query)
+        q_emb = query_embedding if query_embedding is not None else self.embedding_model.create_embeddings(query)
         if q_emb.size == 0:
             print("Failed to generate embedding for the query.")
             return []
-        # 2. Perform the search using parameter binding and L2 distance (<->)
-        embedding_str = str(q_emb.tolist())
-
-        stmt = text(f"""
-            SELECT
-                id,
-                text,
-                embedding <-> CAST(:embedding AS vector) AS distance
-            FROM {TextChunk.__tablename__}
-            WHERE vid_id = :vid_id
-            ORDER BY distance ASC
-            LIMIT :limit
-        """)
-
+        entry = self.matrix_cache.get(vid_id)
+        if entry is not None:
+            return self._search_matrix(entry, q_emb, limit)
+        # 2. Perform the search using parameter binding and the index's distance operator
+        params = {"embedding": str(q_emb.tolist()), "limit": limit, "vid_id": vid_id}
         results = []
         try:
             with Session(self.engine) as session:
-                results = session.exec(
-                    statement=stmt,
-                    params={"embedding": embedding_str, "limit": limit, "vid_id": vid_id}
-                ).mappings().all()
-            # .mappings().all() returns a list of dictionary-like RowMapping objects
+                chunk_count = self._chunk_counts.get(vid_id)
+                if chunk_count is None:
+                    chunk_count = session.exec(statement=text(CHUNK_COUNT_SQL), params={"vid_id": vid_id}).scalar_one()
+                    self._chunk_counts.set(vid_id, chunk_count)
+                plan = self._choose_plan(chunk_count)
+                for stmt in _plan_setup_stmts(plan, limit, ef_search):
+                    session.exec(text(stmt))
+                results = session.exec(statement=text(_plan_sql(plan)), params=params).mappings().all()
+                # .mappings().all() returns a list of dictionary-like RowMapping objects
+                if plan == PLAN_HNSW and len(results) < min(limit, chunk_count):
+                    plan = "hnsw->exact"
+                    results = session.exec(statement=text(EXACT_SEARCH_SQL), params=params).mappings().all()
+            self._log_plan(vid_id, plan, chunk_count, len(results))
         except Exception as e:
             print(f"Error during similarity search: {e}")
 
         return [dict(row) for row in results]
+
+    def _choose_plan(self, chunk_count: int) -> str:
+        return PLAN_EXACT if chunk_count <= EXACT_SCAN_MAX_CHUNKS else PLAN_HNSW
+
+    @staticmethod
+    def _log_plan(vid_id: str, plan: str, chunk_count: int, returned: int):
+        print(f"Search plan for '{vid_id}': {plan} ({chunk_count} chunks, {returned} results)")
+
+    def _invalidate_video(self, vid_id: str):
+        """Drops the cached chunk count and embedding matrix of a video whose chunks changed."""
+        self._chunk_counts.pop(vid_id)
+        self.matrix_cache.invalidate(vid_id)
+
+    def _search_matrix(self, entry: VideoMatrix, q_emb: np.ndarray, limit: int) -> List[Dict[str, Any]]:
+        idx, scores = entry.top_k(q_emb, limit)
+        distances = _distance_from_similarity(scores)
+        return [
+            {"id": entry.ids[i], "text": entry.texts[i], "meta": entry.meta[i], "distance": float(d)}
+            for i, d in zip(idx, distances)
+        ]
+
+    async def _aload_matrix(self, conn, vid_id: str) -> VideoMatrix:
+        generation = self.matrix_cache.generation(vid_id)
+        rows = (await conn.execute(
+            text(f"SELECT id, text, meta, embedding FROM {TextChunk.__tablename__} WHERE vid_id = :vid_id"),
+            {"vid_id": vid_id}
+        )).all()
+        matrix = np.empty((len(rows), self.embedding_dim), dtype=np.float32)
+        for i, row in enumerate(rows):
+            matrix[i] = _as_array(row.embedding)
+        entry = VideoMatrix([r.id for r in rows], [r.text for r in rows], [r.meta for r in rows], matrix)
+        self.matrix_cache.put(vid_id, entry, generation)
+        return entry
     
     def delete_chunks(self, vid_id: str):
         """
@@ -204,6 +414,7 @@ class VectorStore:
             # Execute the statement, passing only the value parameter
             result = session.exec(statement=stmt, params={"value_param": vid_id})
             session.commit()
+            self._invalidate_video(vid_id)
             deleted_count = result.rowcount
             if deleted_count > 0:
                 print(f"Successfully deleted {deleted_count} chunk(s) with vid_id = '{vid_id}'.")
@@ -218,6 +429,229 @@ class VectorStore:
 
         return deleted_count
 
+    # --- Async API ---
+    # Same behaviour as the sync methods, but database work goes through the
+    # pooled asyncpg engine and encoding runs on the executor, so callers on
+    # the event loop are never blocked.
+
+    async def _aembed(self, texts, batch_size: int = 32) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: self.embedding_model.create_embeddings(texts, batch_size=batch_size))
+
+    async def aembed_chunks(self, texts: List[str], batch_size: int = BULK_EMBEDDING_BATCH_SIZE) -> np.ndarray:
+        """Embeds chunk texts on the executor, e.g. ahead of `ainsert_chunk_groups`."""
+        return await self._aembed(texts, batch_size=batch_size)
+
+    async def asearch(
+        self,
+        query: str,
+        vid_id: str,
+        limit: int = 15,
+        query_embedding: Optional[np.ndarray] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Async counterpart of `similarity_search`.
+
+        Args:
+            query: The query text.
+            vid_id: The video whose chunks are searched.
+            limit: Maximum number of results to return.
+            query_embedding: Precomputed embedding of `query` (e.g. from the EmbeddingBatcher).
+            ef_search: HNSW candidate list size for this query; uses the server default when None.
+
+        Returns:
+            List of dictionaries, each containing 'id', 'text', 'meta' and 'distance'.
+            Sorted by distance (ascending - lower is more similar).
+        """
+        q_emb = query_embedding if query_embedding is not None else await self._aembed(query)
+        if q_emb.size == 0:
+            print("Failed to generate embedding for the query.")
+            return []
+
+        entry = self.matrix_cache.get(vid_id)
+        if entry is not None:
+            # Hot chatroom: no database round trip at all
+            return self._search_matrix(entry, q_emb, limit)
+
+        params = {"embedding": np.asarray(q_emb, dtype=np.float32), "limit": limit, "vid_id": vid_id}
+        try:
+            async with self.async_engine.begin() as conn:
+                chunk_count = self._chunk_counts.get(vid_id)
+                if chunk_count is None:
+                    chunk_count = (await conn.execute(text(CHUNK_COUNT_SQL), {"vid_id": vid_id})).scalar_one()
+                    self._chunk_counts.set(vid_id, chunk_count)
+                if 0 < chunk_count <= MATRIX_CACHE_MAX_CHUNKS:
+                    entry = await self._aload_matrix(conn, vid_id)
+                    results = self._search_matrix(entry, q_emb, limit)
+                    self._log_plan(vid_id, "memory", chunk_count, len(results))
+                    return results
+                plan = self._choose_plan(chunk_count)
+                for stmt in _plan_setup_stmts(plan, limit, ef_search):
+                    await conn.execute(text(stmt))
+                rows = (await conn.execute(text(_plan_sql(plan)), params)).mappings().all()
+                if plan == PLAN_HNSW and len(rows) < min(limit, chunk_count):
+                    # The filtered graph walk came up short; exact scan guarantees `limit` rows
+                    plan = "hnsw->exact"
+                    rows = (await conn.execute(text(EXACT_SEARCH_SQL), params)).mappings().all()
+            self._log_plan(vid_id, plan, chunk_count, len(rows))
+            return [dict(row) for row in rows]
+        except Exception as e:
+            print(f"Error during similarity search: {e}")
+            return []
+
+    async def alexical_search(self, query: str, vid_id: str, limit: int = HYBRID_CANDIDATES) -> List[Dict[str, Any]]:
+        """
+        Full-text search over a video's chunks with `websearch_to_tsquery`, ranked by `ts_rank_cd`.
+
+        Returns:
+            List of dictionaries with 'id', 'text', 'meta' and 'rank' (descending - higher is more relevant).
+        """
+        try:
+            async with self.async_engine.connect() as conn:
+                result = await conn.execute(text(LEXICAL_SEARCH_SQL), {"query": query, "vid_id": vid_id, "limit": limit})
+                return [dict(row) for row in result.mappings().all()]
+        except Exception as e:
+            print(f"Error during lexical search: {e}")
+            return []
+
+    async def ahybrid_search(
+        self,
+        query: str,
+        vid_id: str,
+        limit: int = 5,
+        query_embedding: Optional[np.ndarray] = None,
+        ef_search: Optional[int] = None,
+        candidates: int = HYBRID_CANDIDATES,
+    ) -> List[Dict[str, Any]]:
+        """
+        Runs vector and lexical search concurrently and merges them with reciprocal rank fusion.
+
+        Exact terms, acronyms and formulas that embeddings blur are caught by the
+        lexical side, so a handful of fused results covers what used to need
+        a much larger vector-only `limit`.
+
+        Args:
+            query: The query text.
+            vid_id: The video whose chunks are searched.
+            limit: Number of fused results to return.
+            query_embedding: Precomputed embedding of `query`.
+            ef_search: HNSW candidate list size for the vector side.
+            candidates: Results taken from each retriever before fusion.
+
+        Returns:
+            List of dictionaries with 'id', 'text', 'meta' and 'score' (descending - higher is better).
+        """
+        vector_results, lexical_results = await asyncio.gather(
+            self.asearch(query, vid_id, limit=candidates, query_embedding=query_embedding, ef_search=ef_search),
+            self.alexical_search(query, vid_id, limit=candidates),
+        )
+        return reciprocal_rank_fusion([vector_results, lexical_results], limit=limit)
+
+    async def ainsert_chunks(self, texts: List[str], vid_id: str, meta: Optional[List[Dict[str, Any]]] = None) -> int:
+        """
+        Async counterpart of `insert_chunks`, loading the chunks with binary COPY.
+        Unlike the sync method, errors are raised.
+
+        Returns:
+            Number of chunks inserted.
+        """
+        if not texts:
+            print("No texts provided for insertion.")
+            return 0
+        if not vid_id:
+            raise ValueError("vid_id must be provided.")
+        return await self.ainsert_chunk_groups([(vid_id, texts, meta)])
+
+    async def ainsert_chunk_groups(
+        self,
+        groups: Sequence[Tuple[str, List[str], Optional[List[Dict[str, Any]]]]],
+        rows: Sequence[SQLModel] = (),
+        batch_size: int = BULK_EMBEDDING_BATCH_SIZE,
+        embeddings: Optional[Sequence[np.ndarray]] = None,
+    ) -> int:
+        """
+        Embeds and inserts the chunks of many videos at once.
+
+        The chunks of all groups go through the embedding model together in large
+        batches. The extra `rows` (e.g. VidChat records) are inserted first, then all
+        chunks are streamed in with binary `COPY ... FROM STDIN`, all in one
+        transaction. Unlike `insert_chunks`, errors are raised so callers can retry.
+
+        Args:
+            groups: (vid_id, texts, meta) per video; meta may be None.
+            rows: Additional SQLModel rows to insert in the same transaction.
+            batch_size: Number of chunks per embedding forward pass.
+            embeddings: Precomputed embeddings, one 2D array per group (see
+                `aembed_chunks`). The texts are embedded here when omitted.
+
+        Returns:
+            Number of chunks inserted.
+
+        Raises:
+            ValueError: If metadata or precomputed embeddings do not match a group's texts.
+        """
+        all_texts: List[str] = []
+        owners: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+        for vid_id, texts, meta in groups:
+            if meta and len(meta) != len(texts):
+                raise ValueError(f"Number of metadata entries does not match number of texts for '{vid_id}'.")
+            for i, t in enumerate(texts):
+                all_texts.append(t)
+                owners.append((vid_id, meta[i] if meta else None))
+
+        records = []
+        if all_texts:
+            if embeddings is None:
+                print(f"Generating embeddings for {len(all_texts)} chunks across {len(groups)} videos...")
+                all_embeddings = await self._aembed(all_texts, batch_size=batch_size)
+            else:
+                if len(embeddings) != len(groups):
+                    raise ValueError("Number of embedding arrays does not match number of groups.")
+                arrays = []
+                for (vid_id, texts, _), e in zip(groups, embeddings):
+                    e = np.asarray(e, dtype=np.float32)
+                    if not texts:
+                        continue
+                    if e.shape != (len(texts), EMBEDDING_DIMENSION):
+                        raise ValueError(
+                            f"Embeddings for '{vid_id}' have shape {e.shape}, "
+                            f"expected ({len(texts)}, {EMBEDDING_DIMENSION})."
+                        )
+                    arrays.append(e)
+                all_embeddings = np.concatenate(arrays)
+            records = build_chunk_records(owners, all_texts, all_embeddings)
+
+        async with self.async_engine.begin() as conn:
+            for row in rows:
+                await conn.execute(insert(type(row).__table__).values(**row.model_dump()))
+            copied = await copy_chunk_records(conn, TextChunk.__tablename__, records) if records else 0
+        for vid_id, _, _ in groups:
+            self._invalidate_video(vid_id)
+        print(f"Inserted {len(rows)} rows and {copied} chunks into the database.")
+        return copied
+
+    async def adelete_chunks(self, vid_id: str) -> int:
+        """Async counterpart of `delete_chunks`. Returns the number of deleted chunks."""
+        if not vid_id:
+            print("Error: No vid_id provided for deletion.")
+            return 0
+        stmt = text(f"DELETE FROM {TextChunk.__tablename__} WHERE vid_id = :vid_id")
+        async with self.async_engine.begin() as conn:
+            result = await conn.execute(stmt, {"vid_id": vid_id})
+        self._invalidate_video(vid_id)
+        deleted_count = result.rowcount
+        if deleted_count > 0:
+            print(f"Successfully deleted {deleted_count} chunk(s) with vid_id = '{vid_id}'.")
+        else:
+            print(f"No chunks found with vid_id = '{vid_id}' to delete.")
+        return deleted_count
+
+    async def aclose(self):
+        """Disposes the async connection pool and stops the executor."""
+        await self.async_engine.dispose()
+        self._executor.shutdown(wait=False)
+
     def clear_database(self):
         """
         Removes ALL data from the vector store table ('chunk').
@@ -237,6 +671,8 @@ class VectorStore:
                 stmt = text(f"TRUNCATE TABLE {table_name};")
                 session.exec(stmt)
                 session.commit()
+                self._chunk_counts.clear()
+                self.matrix_cache.clear()
                 print(f"Successfully cleared all data from table '{table_name}'.")
         except Exception as e:
             print(f"Error clearing table '{table_name}': {e}")
\ No newline at end of file
@@ -0,0 +1,149 @@
+import asyncio
+import functools
+import html
+import json
+import os
+import re
+from typing import Any, Dict, Optional
+import httpx
+from app.utils.cache import TTLCache
+from app.utils.yt_utils import is_valid_video_id
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Configuration of the metadata service ---
+METADATA_CACHE_TTL = float(os.getenv("VIDEO_METADATA_TTL", "3600")) # seconds
+METADATA_CACHE_SIZE = int(os.getenv("VIDEO_METADATA_CACHE_SIZE", "2048"))
+METADATA_TIMEOUT = float(os.getenv("VIDEO_METADATA_TIMEOUT", "10")) # seconds
+METADATA_MAX_CONNECTIONS = int(os.getenv("VIDEO_METADATA_MAX_CONNECTIONS", "20"))
+
+WATCH_URL = "https://www.youtube.com/watch?v={vid_id}"
+PLAYER_RESPONSE_MARKER = "ytInitialPlayerResponse = "
+TITLE_TAG_RE = re.compile(r"<title>(.*?)</title>", re.DOTALL)
+
+class VideoMetadata:
+    def __init__(self, vid_id: str, title: str, description: str, duration: Optional[int], channel: str):
+        self.vid_id = vid_id
+        self.title = title
+        self.description = description
+        self.duration = duration # seconds
+        self.channel = channel
+
+_cache = TTLCache(maxsize=METADATA_CACHE_SIZE, ttl=METADATA_CACHE_TTL)
+_in_flight: Dict[str, asyncio.Task] = {}
+_limits = httpx.Limits(max_connections=METADATA_MAX_CONNECTIONS, max_keepalive_connections=METADATA_MAX_CONNECTIONS)
+_async_client: Optional[httpx.AsyncClient] = None
+_sync_client: Optional[httpx.Client] = None
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(timeout=METADATA_TIMEOUT, limits=_limits, follow_redirects=True)
+    return _async_client
+
+def _get_sync_client() -> httpx.Client:
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        _sync_client = httpx.Client(timeout=METADATA_TIMEOUT, limits=_limits, follow_redirects=True)
+    return _sync_client
+
+def parse_watch_page(vid_id: str, page: str) -> VideoMetadata:
+    """
+    Extracts title, description, duration and channel from a watch page in one pass.
+
+    The data comes from the embedded `ytInitialPlayerResponse` JSON; the <title>
+    tag is only used as a fallback when that blob is missing.
+    """
+    details: Dict[str, Any] = {}
+    start = page.find(PLAYER_RESPONSE_MARKER)
+    if start != -1:
+        try:
+            player_response, _ = json.JSONDecoder().raw_decode(page, start + len(PLAYER_RESPONSE_MARKER))
+            details = player_response.get("videoDetails", {})
+        except ValueError as e:
+            print(f"Could not decode player response for {vid_id}: {e}")
+
+    title = details.get("title", "")
+    if not title:
+        match = TITLE_TAG_RE.search(page)
+        if match:
+            title = html.unescape(match.group(1)).split(' - YouTube')[0].strip()
+    length = details.get("lengthSeconds")
+    return VideoMetadata(
+        vid_id=vid_id,
+        title=title,
+        description=details.get("shortDescription", ""),
+        duration=int(length) if length else None,
+        channel=details.get("author", "")
+    )
+
+def watch_url(vid_id: str) -> str:
+    """
+    The canonical watch page of a video, the only URL metadata is fetched from.
+
+    Raises:
+        ValueError: If `vid_id` is not a well-formed YouTube video id.
+    """
+    if not is_valid_video_id(vid_id):
+        raise ValueError(f"Invalid YouTube video id: {vid_id!r}")
+    return WATCH_URL.format(vid_id=vid_id)
+
+async def fetch_video_metadata(vid_id: str) -> VideoMetadata:
+    """
+    Fetches a video's metadata, downloading the watch page at most once per TTL.
+
+    Concurrent calls for the same video share a single in-flight request.
+
+    Raises:
+        ValueError: If `vid_id` is not a well-formed YouTube video id.
+        httpx.HTTPError: If the page could not be fetched.
+    """
+    url = watch_url(vid_id)
+    cached = _cache.get(vid_id)
+    if cached:
+        return cached
+    task = _in_flight.get(vid_id)
+    if task is None:
+        # The fetch runs as its own task, so a caller that is cancelled (e.g. its
+        # request disconnected) leaves it running for every other caller.
+        task = asyncio.create_task(_fetch(vid_id, url))
+        _in_flight[vid_id] = task
+        task.add_done_callback(functools.partial(_fetch_done, vid_id))
+    return await asyncio.shield(task)
+
+def _fetch_done(vid_id: str, task: asyncio.Task):
+    if _in_flight.get(vid_id) is task:
+        del _in_flight[vid_id]
+    if not task.cancelled():
+        # Retrieve it here so a fetch every caller left doesn't log 'exception was never retrieved'
+        task.exception()
+
+async def _fetch(vid_id: str, url: str) -> VideoMetadata:
+    r = await _get_async_client().get(url)
+    r.raise_for_status()
+    metadata = parse_watch_page(vid_id, r.text)
+    _cache.set(vid_id, metadata)
+    return metadata
+
+def fetch_video_metadata_sync(vid_id: str) -> VideoMetadata:
+    """Blocking variant of `fetch_video_metadata` for worker threads; shares the same cache."""
+    url = watch_url(vid_id)
+    cached = _cache.get(vid_id)
+    if cached:
+        return cached
+    r = _get_sync_client().get(url)
+    r.raise_for_status()
+    metadata = parse_watch_page(vid_id, r.text)
+    _cache.set(vid_id, metadata)
+    return metadata
+
+async def close_clients():
+    """Closes the pooled HTTP clients. Called on application shutdown."""
+    global _async_client, _sync_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
@@ -0,0 +1,64 @@
+import base64
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson # noqa: F401
+    from fastapi.responses import ORJSONResponse
+except ImportError:
+    # orjson is optional; without it responses use the stdlib encoder
+    ORJSONResponse = None
+
+def json_response(payload: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Serializes plain dicts/lists with orjson when it is installed. orjson handles
+    datetimes, UUIDs and enums natively, so no jsonable_encoder pass is needed.
+    """
+    if ORJSONResponse is not None:
+        return ORJSONResponse(content=payload, headers=headers)
+    return JSONResponse(content=jsonable_encoder(payload), headers=headers)
+
+def make_etag(*parts: Any) -> str:
+    """A weak ETag derived from the values that determine a response's content."""
+    digest = hashlib.blake2b("\x00".join(map(str, parts)).encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match header names `etag` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in header.split(","))
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    # no-cache: clients may keep the response but must revalidate it on every use
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
+
+def encode_cursor(created_at: datetime, id: Any) -> str:
+    """Opaque keyset cursor for rows ordered by (timestamp, id)."""
+    raw = f"{created_at.isoformat()}|{id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Returns the timestamp and the id (as a string) encoded by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), id
+    except Exception as e:
+        raise ValueError(f"Malformed cursor: {cursor!r}") from e
@@ -0,0 +1,40 @@
+import bisect
+import threading
+from typing import Any, Dict, Sequence
+
+class Histogram:
+    """
+    A fixed-bucket histogram. `observe` is cheap and thread-safe; `snapshot`
+    returns the (non-cumulative) count per bucket for reporting.
+    """
+    def __init__(self, buckets: Sequence[float]):
+        """
+        Args:
+            buckets (Sequence[float]): Ascending upper bounds. Values above the last
+                                       bound land in an overflow bucket.
+        """
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"<={b:g}" for b in self.buckets] + [f">{self.buckets[-1]:g}"]
+            return {
+                "buckets": dict(zip(labels, self.counts)),
+                "count": self.count,
+                "mean": self.sum / self.count if self.count else 0.0,
+                "max": self.max,
+            }
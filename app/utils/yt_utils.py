@@ -1,38 +1,41 @@
 import re
-import requests
-from bs4 import BeautifulSoup
+import httpx
+
+# YouTube video ids: 11 characters of the URL-safe base64 alphabet
+VIDEO_ID_RE = re.compile(r"[A-Za-z0-9_-]{11}")
+WATCH_URL_RE = re.compile(r"https://www\.youtube\.com/watch\?v=([A-Za-z0-9_-]{11})(?:&.*)?")
+
+def is_valid_video_id(vid_id: str) -> bool:
+    return isinstance(vid_id, str) and VIDEO_ID_RE.fullmatch(vid_id) is not None
 
 def validate_url(url: str):
     # Basic validation, HttpUrl does more
     return url.startswith("https://www.youtube.com/watch?v=")
 
 def get_title(url: str):
+    # Imported lazily: the metadata service depends on this module for is_valid_video_id
+    from app.services.video_metadata import fetch_video_metadata_sync
+    vid_id = get_video_id(url)
+    if vid_id is None:
+        return "Unknown Title"
     try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status() # Raise error for bad responses
-        soup = BeautifulSoup(r.text, 'html.parser')
-        title_tag = soup.find('title')
-        if title_tag:
-            return title_tag.text.split(' - YouTube')[0].strip()
-    except requests.RequestException as e:
+        title = fetch_video_metadata_sync(vid_id).title
+        if title:
+            return title
+    except httpx.HTTPError as e:
         print(f"Error fetching title for {url}: {e}")
     except Exception as e:
         print(f"Error parsing title for {url}: {e}")
     return "Unknown Title" # Fallback
 
 def get_description(url: str) -> str:
-    # This regex method is brittle; YouTube's structure changes.
-    # Consider library alternatives or more robust scraping if needed.
+    from app.services.video_metadata import fetch_video_metadata_sync
+    vid_id = get_video_id(url)
+    if vid_id is None:
+        return ""
     try:
-        full_html = requests.get(url, timeout=10).text
-        match = re.search(r'shortDescription":"(.*?)(?<!\\)"', full_html, re.DOTALL)
-        if match:
-            # Handle escaped sequences like \n, \" etc.
-            return match.group(1).encode('utf-8').decode('unicode_escape')
-        else:
-             print(f"Could not find shortDescription for {url}")
-             return ""
-    except requests.RequestException as e:
+        return fetch_video_metadata_sync(vid_id).description
+    except httpx.HTTPError as e:
         print(f"Error fetching description for {url}: {e}")
         return ""
     except Exception as e:
@@ -40,6 +43,6 @@ def get_description(url: str) -> str:
          return ""
 
 def get_video_id(url: str) -> str | None:
-    # Use regex for more robust extraction
-    match = re.search(r"youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})", url)
+    # Anchored, so a YouTube-looking fragment inside another URL is not mistaken for a video
+    match = WATCH_URL_RE.fullmatch(url)
     return match.group(1) if match else None
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Compares chunk insertion throughput of the ORM path (`session.add_all` of
+TextChunk objects) against the binary COPY loader.
+
+Rows are written under a throwaway vid_id and deleted afterwards. Requires
+DATABASE_URL to point at a database with the `chunk` table.
+
+Usage (from the repository root):
+    python -m benchmarks.chunk_insert [--rows 5000] [--repeat 3]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, create_engine, text
+from pgvector.asyncpg import register_vector
+from app.db.session import DATABASE_URL, to_async_url
+from app.services.bulk_loader import build_chunk_records, copy_chunk_records
+from app.services.vector_store import EMBEDDING_DIMENSION, TextChunk
+
+def make_data(n: int):
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((n, EMBEDDING_DIMENSION)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    texts = [f"benchmark chunk {i} " + "lorem ipsum dolor sit amet " * 10 for i in range(n)]
+    return texts, embeddings
+
+def bench_orm(engine, vid_id: str, texts, embeddings) -> float:
+    start = time.perf_counter()
+    with Session(engine) as session:
+        session.add_all([
+            TextChunk(text=texts[i], vid_id=vid_id, embedding=embeddings[i], meta={})
+            for i in range(len(texts))
+        ])
+        session.commit()
+    return time.perf_counter() - start
+
+async def bench_copy(async_engine, vid_id: str, texts, embeddings) -> float:
+    start = time.perf_counter()
+    records = build_chunk_records([(vid_id, {})] * len(texts), texts, embeddings)
+    async with async_engine.begin() as conn:
+        await copy_chunk_records(conn, TextChunk.__tablename__, records)
+    return time.perf_counter() - start
+
+def cleanup(engine, vid_id: str):
+    with Session(engine) as session:
+        session.exec(statement=text(f"DELETE FROM {TextChunk.__tablename__} WHERE vid_id = :vid_id"), params={"vid_id": vid_id})
+        session.commit()
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL)
+    async_engine = create_async_engine(to_async_url(DATABASE_URL))
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _register_vector(dbapi_connection, connection_record):
+        dbapi_connection.run_async(register_vector)
+
+    texts, embeddings = make_data(args.rows)
+    vid_id = f"bench-{uuid.uuid4().hex[:8]}"
+    results = {"orm": [], "copy": []}
+    try:
+        for _ in range(args.repeat):
+            results["orm"].append(bench_orm(engine, vid_id, texts, embeddings))
+            cleanup(engine, vid_id)
+            results["copy"].append(await bench_copy(async_engine, vid_id, texts, embeddings))
+            cleanup(engine, vid_id)
+    finally:
+        cleanup(engine, vid_id)
+        await async_engine.dispose()
+
+    print(f"{'path':<6} {'best s':>8} {'rows/s':>10}")
+    for name, timings in results.items():
+        best = min(timings)
+        print(f"{name:<6} {best:>8.3f} {args.rows / best:>10.0f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""
+Compares the single-pass segment chunker (`chunk_segments`) against the
+previous pipeline (join all segments, then `RecursiveCharacterTextSplitter`)
+on synthetic multi-hour transcripts.
+
+Transcripts are generated at roughly one caption segment every 3 seconds.
+
+Usage (from the repository root):
+    python -m benchmarks.chunking [--hours 1,3,6] [--repeat 3]
+"""
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+from app.services.transcript import CHUNK_OVERLAP, CHUNK_SIZE, chunk, chunk_segments
+
+VOCABULARY = (
+    "so today we are going to talk about how gradient descent actually finds a minimum "
+    "the learning rate controls how big each step is and if you pick it too large you overshoot. "
+    "remember that the derivative tells us the slope at a single point, now let's look at an example"
+).split()
+
+def make_segments(hours: float, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    segments = []
+    t = 0.0
+    while t < hours * 3600:
+        duration = rng.uniform(1.5, 4.5)
+        text = " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(4, 14)))
+        segments.append({"text": text, "start": round(t, 2), "duration": round(duration, 2)})
+        t += duration
+    return segments
+
+def bench_splitter(segments) -> float:
+    start = time.perf_counter()
+    content = ' '.join(map(lambda x: x['text'], segments))
+    chunk(content, CHUNK_SIZE, CHUNK_OVERLAP)
+    return time.perf_counter() - start
+
+def bench_streaming(segments) -> float:
+    start = time.perf_counter()
+    chunk_segments(segments, CHUNK_SIZE, CHUNK_OVERLAP)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", default="1,3,6")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'hours':>5} {'segments':>9} {'splitter s':>11} {'streaming s':>12} {'speedup':>8} {'chunks (old/new)':>17}")
+    for hours in (float(h) for h in args.hours.split(",")):
+        segments = make_segments(hours)
+        splitter = min(bench_splitter(segments) for _ in range(args.repeat))
+        streaming = min(bench_streaming(segments) for _ in range(args.repeat))
+        old_chunks = len(chunk(' '.join(s['text'] for s in segments), CHUNK_SIZE, CHUNK_OVERLAP))
+        new_chunks = len(chunk_segments(segments, CHUNK_SIZE, CHUNK_OVERLAP)[0])
+        print(
+            f"{hours:>5g} {len(segments):>9} {splitter:>11.3f} {streaming:>12.3f} "
+            f"{splitter / streaming:>7.1f}x {f'{old_chunks}/{new_chunks}':>17}"
+        )
+
+if __name__ == "__main__":
+    main()
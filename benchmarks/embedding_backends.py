@@ -0,0 +1,96 @@
+"""
+Compares the embedding backends on chunk throughput, single-query latency and
+parity with the reference torch backend.
+
+Usage (from the repository root):
+    python -m benchmarks.embedding_backends [--chunks 512] [--queries 50] [--backends torch,onnx,onnx-fp32]
+"""
+import argparse
+import statistics
+import time
+from typing import Dict, List
+from app.services.embeddings import (
+    EmbeddingBackend,
+    OnnxEmbedding,
+    SentenceTransformerEmbedding,
+    embedding_parity,
+)
+from app.services.vector_store import DEFAULT_EMBEDDING_MODEL
+
+SAMPLE_SENTENCES = [
+    "so today we're going to talk about how gradient descent actually finds a minimum",
+    "the key idea is that the learning rate controls how big each step is",
+    "if you pick it too large you overshoot and the loss starts to oscillate",
+    "remember that the derivative tells us the slope at a single point",
+    "now let's look at an example with a simple quadratic function",
+    "this is exactly why we normalize the inputs before training",
+]
+
+def make_chunks(n: int, chunk_chars: int = 300) -> List[str]:
+    """Builds n transcript-like chunks of roughly `chunk_chars` characters."""
+    chunks = []
+    i = 0
+    while len(chunks) < n:
+        words = []
+        while sum(len(w) + 1 for w in words) < chunk_chars:
+            words.append(SAMPLE_SENTENCES[i % len(SAMPLE_SENTENCES)])
+            i += 1
+        chunks.append(" ".join(words)[:chunk_chars])
+    return chunks
+
+def build_backend(name: str, model_name: str) -> EmbeddingBackend:
+    if name == "torch":
+        return SentenceTransformerEmbedding(model_name)
+    if name == "torch-cpu":
+        return SentenceTransformerEmbedding(model_name, device="cpu")
+    if name == "onnx":
+        return OnnxEmbedding(model_name, quantize=True)
+    if name == "onnx-fp32":
+        return OnnxEmbedding(model_name, quantize=False)
+    raise ValueError(f"Unknown backend '{name}'")
+
+def bench(backend: EmbeddingBackend, chunks: List[str], queries: int, batch_size: int) -> Dict[str, float]:
+    backend.create_embeddings(chunks[:batch_size], batch_size=batch_size) # warm-up
+    start = time.perf_counter()
+    backend.create_embeddings(chunks, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    latencies = []
+    for i in range(queries):
+        q = f"what does the lecture say about point {i}?"
+        t0 = time.perf_counter()
+        backend.create_embeddings(q)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+    return {
+        "chunks_per_s": len(chunks) / elapsed,
+        "query_p50_ms": statistics.median(latencies),
+        "query_p95_ms": latencies[int(0.95 * (len(latencies) - 1))],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument("--chunks", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--backends", default="torch-cpu,onnx-fp32,onnx")
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    names = [b.strip() for b in args.backends.split(",") if b.strip()]
+    reference = None
+    print(f"{'backend':<12} {'chunks/s':>10} {'q p50 ms':>10} {'q p95 ms':>10} {'min cos':>9}")
+    for name in names:
+        backend = build_backend(name, args.model)
+        result = bench(backend, chunks, args.queries, args.batch_size)
+        if reference is None:
+            reference = backend
+        parity = embedding_parity(reference, backend)
+        print(
+            f"{name:<12} {result['chunks_per_s']:>10.1f} {result['query_p50_ms']:>10.2f} "
+            f"{result['query_p95_ms']:>10.2f} {parity:>9.4f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Offline accuracy and latency report of the local intent classifier against
+the LLM classifier.
+
+The eval set is a JSONL file of labelled queries:
+    {"query": "...", "intent": "qa_specific"}
+Without one, the examples in INTENT_EXAMPLES are evaluated leave-one-out
+(each query is classified by an index built from all the other examples).
+
+Reported per classifier: accuracy, p50/p95 latency, and for the local one
+its coverage (share of queries decided without the LLM) and accuracy on those.
+
+Usage (from the repository root):
+    python -m benchmarks.intent_classifier [eval.jsonl] [--no-llm]
+"""
+import argparse
+import copy
+import json
+import statistics
+import time
+from typing import List, Optional, Tuple
+import numpy as np
+from app.services.embeddings import create_embedding_backend
+from app.services.intent_classifier import LocalIntentClassifier, classify_intent
+from app.services.intent_examples import INTENT_EXAMPLES
+from app.services.vector_store import DEFAULT_EMBEDDING_MODEL
+
+def load_cases(path: Optional[str]) -> List[Tuple[str, str]]:
+    if path is None:
+        return [(q, intent) for intent, queries in INTENT_EXAMPLES.items() for q in queries]
+    with open(path, encoding="utf-8") as f:
+        return [(c["query"], c["intent"]) for c in map(json.loads, f) if c]
+
+def without_example(classifier: LocalIntentClassifier, i: int) -> LocalIntentClassifier:
+    """A copy of the classifier with example `i` removed from its index."""
+    held_out = copy.copy(classifier)
+    held_out.matrix = np.delete(classifier.matrix, i, axis=0)
+    held_out.labels = classifier.labels[:i] + classifier.labels[i + 1:]
+    return held_out
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("eval_file", nargs="?")
+    parser.add_argument("--no-llm", action="store_true", help="Skip the LLM classifier (no API calls)")
+    args = parser.parse_args()
+
+    cases = load_cases(args.eval_file)
+    model = create_embedding_backend(DEFAULT_EMBEDDING_MODEL)
+    full = LocalIntentClassifier(model)
+    classifier = full
+
+    local_ms, llm_ms = [], []
+    decided = decided_correct = 0
+    llm_correct = 0
+    for i, (query, expected) in enumerate(cases):
+        if args.eval_file is None:
+            # Cases are INTENT_EXAMPLES in index order, so row i is this query
+            classifier = without_example(full, i)
+        start = time.perf_counter()
+        intent = classifier.classify_local(model.create_embeddings(query))
+        local_ms.append((time.perf_counter() - start) * 1000)
+        if intent is not None:
+            decided += 1
+            decided_correct += intent == expected
+        if not args.no_llm:
+            start = time.perf_counter()
+            llm_intent = classify_intent(query)
+            llm_ms.append((time.perf_counter() - start) * 1000)
+            llm_correct += llm_intent == expected
+
+    n = max(len(cases), 1)
+    print(f"{len(cases)} queries")
+    print(f"{'classifier':<10} {'accuracy':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    print(
+        f"{'local':<10} {decided_correct / max(decided, 1):>9.3f} "
+        f"{statistics.median(local_ms) if local_ms else 0.0:>8.1f} {percentile(local_ms, 0.95):>8.1f}"
+        f"   (coverage {decided / n:.1%})"
+    )
+    if llm_ms:
+        print(f"{'llm':<10} {llm_correct / n:>9.3f} {statistics.median(llm_ms):>8.1f} {percentile(llm_ms, 0.95):>8.1f}")
+
+if __name__ == "__main__":
+    main()
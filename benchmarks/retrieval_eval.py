@@ -0,0 +1,62 @@
+"""
+Compares vector-only retrieval against hybrid (lexical + vector, RRF-fused)
+retrieval on a labelled eval set.
+
+The eval set is a JSONL file with one case per line:
+    {"vid_id": "...", "query": "...", "expected": ["substring", ...]}
+A case counts as a hit at k when any of the top-k chunks contains one of the
+`expected` substrings (case-insensitive). The videos must already be ingested.
+
+Usage (from the repository root):
+    python -m benchmarks.retrieval_eval eval.jsonl [--vector-k 15] [--hybrid-k 5]
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+from app.services.vector_store import VectorStore
+
+def is_hit(results: List[Dict[str, Any]], expected: List[str]) -> bool:
+    texts = [str(r["text"]).lower() for r in results]
+    return any(e.lower() in t for e in expected for t in texts)
+
+def load_cases(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("eval_file")
+    parser.add_argument("--vector-k", type=int, default=15)
+    parser.add_argument("--hybrid-k", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = load_cases(args.eval_file)
+    store = VectorStore()
+    hits = {"vector": 0, "hybrid": 0}
+    latency = {"vector": 0.0, "hybrid": 0.0}
+    try:
+        for case in cases:
+            embedding = store.embedding_model.create_embeddings(case["query"])
+
+            start = time.perf_counter()
+            vector = await store.asearch(case["query"], case["vid_id"], limit=args.vector_k, query_embedding=embedding)
+            latency["vector"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            hybrid = await store.ahybrid_search(case["query"], case["vid_id"], limit=args.hybrid_k, query_embedding=embedding)
+            latency["hybrid"] += time.perf_counter() - start
+
+            hits["vector"] += is_hit(vector, case["expected"])
+            hits["hybrid"] += is_hit(hybrid, case["expected"])
+    finally:
+        await store.aclose()
+
+    n = max(len(cases), 1)
+    print(f"{'retriever':<10} {'k':>4} {'hit rate':>9} {'avg ms':>8}")
+    for name, k in (("vector", args.vector_k), ("hybrid", args.hybrid_k)):
+        print(f"{name:<10} {k:>4} {hits[name] / n:>9.3f} {latency[name] / n * 1000:>8.1f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
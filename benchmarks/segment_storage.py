@@ -0,0 +1,81 @@
+"""
+Compares storing timestamped transcript segments as a JSON list (the former
+vid_chat.transcript_wts JSONB column) against the compact encoding of
+app.services.segment_codec (vid_chat.segments_blob), on synthetic multi-hour
+transcripts.
+
+Reported per transcript length:
+- size: JSON text (an approximation of the JSONB datum; Postgres may TOAST-
+  compress it further) against the compressed blob;
+- load: json.loads of the whole list against decode_segments alone (lazy view),
+  decode + a 5-minute slice_time, and decode + to_list (full materialization).
+
+With --database, the actual on-disk sizes of the stored columns are summed
+with pg_column_size instead (requires DATABASE_URL; run before and after the
+migration).
+
+Usage (from the repository root):
+    python -m benchmarks.segment_storage [--hours 1,3,6] [--repeat 5] [--database]
+"""
+import argparse
+import json
+import time
+from benchmarks.chunking import make_segments
+from app.services.segment_codec import decode_segments, encode_segments
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def report_database():
+    from sqlalchemy import text
+    from app.db.session import engine
+    with engine.connect() as conn:
+        columns = {
+            row[0] for row in conn.execute(text(
+                "SELECT column_name FROM information_schema.columns WHERE table_name = 'vid_chat'"
+            ))
+        }
+        for column in ("transcript_wts", "segments_blob", "transcript"):
+            if column not in columns:
+                continue
+            rows, size = conn.execute(text(
+                f"SELECT COUNT({column}), COALESCE(SUM(pg_column_size({column})), 0) FROM vid_chat"
+            )).one()
+            print(f"{column:<15} {rows:>6} rows {size / 1024:>12.1f} KiB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", default="1,3,6")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database", action="store_true", help="Report stored column sizes instead")
+    args = parser.parse_args()
+
+    if args.database:
+        report_database()
+        return
+
+    print(
+        f"{'hours':>5} {'segments':>9} {'json KiB':>9} {'blob KiB':>9} {'ratio':>6} "
+        f"{'json ms':>8} {'view ms':>8} {'slice ms':>9} {'list ms':>8}"
+    )
+    for hours in (float(h) for h in args.hours.split(",")):
+        segments = make_segments(hours)
+        as_json = json.dumps(segments)
+        blob = encode_segments(segments)
+        middle = hours * 1800
+        json_ms = best_of(args.repeat, lambda: json.loads(as_json)) * 1000
+        view_ms = best_of(args.repeat, lambda: decode_segments(blob)) * 1000
+        slice_ms = best_of(args.repeat, lambda: decode_segments(blob).slice_time(middle, middle + 300).to_list()) * 1000
+        list_ms = best_of(args.repeat, lambda: decode_segments(blob).to_list()) * 1000
+        print(
+            f"{hours:>5g} {len(segments):>9} {len(as_json) / 1024:>9.1f} {len(blob) / 1024:>9.1f} "
+            f"{len(as_json) / len(blob):>5.1f}x {json_ms:>8.2f} {view_ms:>8.2f} {slice_ms:>9.2f} {list_ms:>8.2f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compares full-video summarization latency of the single-prompt path against
+map-reduce over section summaries, on an ingested chatroom.
+
+Three runs are timed (time to first token and total):
+- single: the whole transcript in one TEMPLATE_FULL_SUMMARY prompt;
+- map-reduce cold: every section summarized again, then reduced;
+- map-reduce warm: reduce over the stored section summaries only.
+
+Calls the Gemini API (GOOGLE_API_KEY) and requires DATABASE_URL. The cold run
+overwrites the video's stored section summaries with fresh ones.
+
+Usage (from the repository root):
+    python -m benchmarks.summarization <vid_id> [--query "Summarize this video"]
+"""
+import argparse
+import asyncio
+import time
+from langchain_core.prompts import ChatPromptTemplate
+from sqlmodel import Session
+from app.db.session import engine
+from app.models.vid_chat import VidChat
+from app.services.llm_registry import LLMRegistry, PRO_MODEL
+from app.services.segment_codec import decode_segments
+from app.services.summarizer import map_sections, split_sections
+from app.services.templates.summarization import TEMPLATE_FULL_SUMMARY, TEMPLATE_REDUCE_SUMMARY
+
+def segments_of(vid_chat: VidChat):
+    return decode_segments(vid_chat.segments_blob) if vid_chat.segments_blob else None
+
+async def timed_stream(llm: LLMRegistry, prompt):
+    start = time.perf_counter()
+    first = None
+    async for _ in llm.astream(PRO_MODEL, 0.5, prompt):
+        if first is None:
+            first = time.perf_counter() - start
+    return first or 0.0, time.perf_counter() - start
+
+async def run_single(llm: LLMRegistry, vid_chat: VidChat, query: str):
+    prompt = ChatPromptTemplate.from_template(TEMPLATE_FULL_SUMMARY).invoke({
+        "transcript": vid_chat.transcript, "user_query": query
+    })
+    return await timed_stream(llm, prompt)
+
+async def run_map_reduce(llm: LLMRegistry, vid_chat: VidChat, query: str, force: bool):
+    start = time.perf_counter()
+    section_summaries = await map_sections(llm, vid_chat.id, vid_chat.transcript, segments_of(vid_chat), force=force)
+    mapped = time.perf_counter() - start
+    prompt = ChatPromptTemplate.from_template(TEMPLATE_REDUCE_SUMMARY).invoke({
+        "section_summaries": "\n\n".join(section_summaries), "user_query": query
+    })
+    first, total = await timed_stream(llm, prompt)
+    return mapped + first, mapped + total
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("vid_id")
+    parser.add_argument("--query", default="Summarize this video")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        vid_chat = session.get(VidChat, args.vid_id)
+    if vid_chat is None:
+        raise SystemExit(f"No chatroom for '{args.vid_id}'.")
+    sections = split_sections(vid_chat.transcript, segments_of(vid_chat))
+    print(f"{len(vid_chat.transcript)} characters, {len(sections)} section(s)")
+
+    llm = LLMRegistry()
+    results = {}
+    try:
+        results["single"] = await run_single(llm, vid_chat, args.query)
+    except Exception as e:
+        print(f"single-prompt path failed: {e!r}")
+    results["map-reduce cold"] = await run_map_reduce(llm, vid_chat, args.query, force=True)
+    results["map-reduce warm"] = await run_map_reduce(llm, vid_chat, args.query, force=False)
+
+    print(f"{'path':<16} {'first token s':>14} {'total s':>8}")
+    for name, (first, total) in results.items():
+        print(f"{name:<16} {first:>14.2f} {total:>8.2f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())